@@ -0,0 +1,269 @@
+"""
+Offline convert/revert benchmarks for sim4_xmirror_renamer.
+
+Runs against benchmarks/fake_bpy.py, so no Blender is needed:
+
+    python benchmarks/bench_renamer.py                  # default scaling curve
+    python benchmarks/bench_renamer.py --sizes 1 10 100 --json bench_output.json
+    python benchmarks/bench_renamer.py --no-check       # timings only
+
+Each size is a synthetic scene of N Sims-style rigs, each deforming
+MESHES_PER_RIG meshes (outfit parts / LODs) next to PROPS_PER_RIG unrelated
+objects. Every phase is timed on its own scene so one phase's renames can't
+make the next one cheaper. The plan/bones/vgroups phases are the ones
+Convert runs (plan_conversion + RenameTransaction). Per-unit costs
+(microseconds per bone or per vertex group) at the largest size are compared
+with THRESHOLDS, and every scene is checked to come back with its original
+names after convert + revert; the script exits with status 1 when either
+fails.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import fake_bpy  # noqa: E402
+import fake_mathutils  # noqa: E402
+
+sys.modules["bpy"] = fake_bpy
+fake_mathutils.install()
+
+import sim4_xmirror_renamer as renamer  # noqa: E402
+
+MESHES_PER_RIG = 8
+PROPS_PER_RIG = 20
+DEFAULT_SIZES = (1, 5, 20, 50)
+
+# Upper bounds in microseconds per unit, checked at the largest size
+THRESHOLDS = {
+    "build_conversion_map_cold": 10.0,   # per bone
+    "build_conversion_map_warm": 4.0,    # per bone
+    "plan": 1.0,                         # per vertex group
+    "txn_bones": 60.0,                   # per bone
+    "txn_vgroups": 1.5,                  # per vertex group
+    "store_mapping": 2.0,                # per bone
+    "load_mapping_cold": 3.0,            # per bone
+    "load_mapping_warm": 1.0,            # per bone
+    "convert_revert": 40.0,              # per bone + vertex group
+}
+
+# Column headers for the printed tables
+LABELS = {
+    "build_conversion_map_cold": "map cold",
+    "build_conversion_map_warm": "map warm",
+    "plan": "plan",
+    "txn_bones": "bones",
+    "txn_vgroups": "vgroups",
+    "store_mapping": "store",
+    "load_mapping_cold": "load cold",
+    "load_mapping_warm": "load warm",
+    "convert_revert": "conv+rev",
+}
+
+_CENTER = [
+    "ROOT", "ROOT_bind", "Pelvis", "Spine0", "Spine1", "Spine2", "Neck", "Head",
+    "Jaw", "Chin", "Tongue0", "Tongue1", "Tongue2", "Nose", "Nose_tip", "Forehead",
+    "UpperLip", "LowerLip", "CAS_Neck", "CAS_Chest", "CAS_Spine1", "CAS_Spine2",
+    "CAS_Stomach", "CAS_Belly", "CAS_Butt", "CAS_Head", "slot_Head", "slot_Chest",
+]
+_SIDED = [
+    "Thigh", "Calf", "Foot", "Toe", "Clavicle", "UpperArm", "Forearm", "Hand",
+    "ThumbA", "ThumbB", "ThumbC", "IndexA", "IndexB", "IndexC", "MidA", "MidB",
+    "MidC", "RingA", "RingB", "RingC", "PinkyA", "PinkyB", "PinkyC", "Breast",
+    "Butt", "ThighTwist", "CalfTwist", "UpperArmTwist", "ForearmTwist", "Shoulder",
+    "Eye", "Eyelid_up", "Eyelid_lo", "Brow_in", "Brow_mid", "Brow_out", "Cheek",
+    "Mouth", "Lip_up", "Lip_lo", "Ear", "Squint", "CAS_Thigh", "CAS_Calf",
+    "CAS_UpperArm", "CAS_Forearm", "CAS_Hand", "CAS_Foot", "CAS_Hip", "CAS_Breast",
+    "Hand_slot", "Foot_slot",
+]
+SIMS_BONE_NAMES = (
+    [f"b__{n}__" for n in _CENTER]
+    + [f"b__{side}_{n}__" for side in "LR" for n in _SIDED]
+)
+
+
+def reset_scene():
+    fake_bpy.data.reset()
+    fake_bpy.context.view_layer.objects.active = None
+    fake_bpy.context.collection.all_objects = fake_bpy.data.objects
+    renamer._MESH_INDEX.invalidate()
+    renamer.invalidate_mapping_cache()
+    renamer._APPLIED_PLANS.clear()
+
+
+def build_scene(rigs, meshes_per_rig=MESHES_PER_RIG, props_per_rig=PROPS_PER_RIG):
+    """Returns [(armature object, [mesh objects])] for a freshly built scene."""
+    reset_scene()
+    data = fake_bpy.data
+    scene = []
+    for r in range(rigs):
+        arm = data.armatures.new(f"rig{r}")
+        for name in SIMS_BONE_NAMES:
+            arm.bones.new(name)
+        arm_obj = data.objects.new(f"rig{r}", arm)
+        meshes = []
+        for m in range(meshes_per_rig):
+            obj = data.objects.new(f"rig{r}_part{m}", data.meshes.new(f"rig{r}_part{m}"))
+            mod = obj.modifiers.new("Armature", 'ARMATURE')
+            mod.object = arm_obj
+            for name in SIMS_BONE_NAMES:
+                obj.vertex_groups.new(name)
+            meshes.append(obj)
+        for p in range(props_per_rig):
+            data.objects.new(f"rig{r}_prop{p}", data.meshes.new(f"rig{r}_prop{p}"))
+        scene.append((arm_obj, meshes))
+    return scene
+
+
+def scene_names(scene):
+    """Bone and vertex group names of every rig, to compare before and after a round trip."""
+    return [
+        (arm_obj.data.bones.keys(), [obj.vertex_groups.keys() for obj in meshes])
+        for arm_obj, meshes in scene
+    ]
+
+
+def check_round_trip(scene, names):
+    failures = []
+    for (arm_obj, _meshes), expected, actual in zip(scene, names, scene_names(scene)):
+        if actual != expected:
+            failures.append(f"{arm_obj.name}: names differ after convert + revert")
+        elif renamer.MAP_PROP in arm_obj:
+            failures.append(f"{arm_obj.name}: mapping left on the armature after revert")
+    return failures
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_size(rigs):
+    bones = rigs * len(SIMS_BONE_NAMES)
+    groups = bones * MESHES_PER_RIG
+    result = {"rigs": rigs, "bones": bones, "vertex_groups": groups, "objects": 0, "seconds": {}}
+    sec = result["seconds"]
+
+    scene = build_scene(rigs)
+    result["objects"] = len(fake_bpy.data.objects)
+    for engine in renamer._NAMING_ENGINES.values():
+        engine.clear_cache()
+    mappings = []
+    sec["build_conversion_map_cold"] = _timed(
+        lambda: mappings.extend(renamer.build_conversion_map(a.data.bones) for a, _m in scene))
+    sec["build_conversion_map_warm"] = _timed(
+        lambda: [renamer.build_conversion_map(a.data.bones) for a, _m in scene])
+
+    # The phases Convert runs, summed over every rig
+    scene = build_scene(rigs)
+    timer = renamer.PhaseTimer("bench")
+    for (arm_obj, _meshes), mapping in zip(scene, mappings):
+        plan = renamer.plan_conversion(arm_obj, mapping, timer=timer)
+        renamer.apply_rename_plan(plan, timer)
+    phase_seconds = {}
+    for name, seconds, _counts in timer.phases:
+        phase_seconds[name] = phase_seconds.get(name, 0.0) + seconds
+    sec["plan"] = phase_seconds.get("plan", 0.0)
+    sec["txn_bones"] = phase_seconds.get("bones", 0.0)
+    sec["txn_vgroups"] = phase_seconds.get("vgroups", 0.0)
+
+    sec["store_mapping"] = _timed(
+        lambda: [renamer.store_mapping_on_armature(a, mp) for (a, _m), mp in zip(scene, mappings)])
+    renamer.invalidate_mapping_cache()
+    sec["load_mapping_cold"] = _timed(lambda: [renamer.load_mapping_from_armature(a) for a, _m in scene])
+    sec["load_mapping_warm"] = _timed(lambda: [renamer.load_mapping_from_armature(a) for a, _m in scene])
+
+    scene = build_scene(rigs)
+    names = scene_names(scene)
+
+    def convert_revert():
+        for arm_obj, _meshes in scene:
+            mapping, stored = renamer.plan_conversion_map(arm_obj)
+            renamer.convert_armature(arm_obj, mapping, stored=stored)
+        for arm_obj, _meshes in scene:
+            renamer.revert_armature(arm_obj, renamer.load_mapping_from_armature(arm_obj))
+    sec["convert_revert"] = _timed(convert_revert)
+    result["round_trip_failures"] = check_round_trip(scene, names)
+
+    per_unit = {
+        "build_conversion_map_cold": bones,
+        "build_conversion_map_warm": bones,
+        "plan": groups,
+        "txn_bones": bones,
+        "txn_vgroups": groups,
+        "store_mapping": bones,
+        "load_mapping_cold": bones,
+        "load_mapping_warm": bones,
+        "convert_revert": bones + groups,
+    }
+    result["us_per_unit"] = {k: sec[k] * 1e6 / max(1, per_unit[k]) for k in sec}
+    return result
+
+
+def check_thresholds(result):
+    failures = []
+    for key, limit in THRESHOLDS.items():
+        value = result["us_per_unit"].get(key)
+        if value is not None and value > limit:
+            failures.append(f"{key}: {value:.2f} us/unit > {limit:.2f}")
+    return failures
+
+
+def print_table(results):
+    keys = list(THRESHOLDS)
+    header = f"{'rigs':>5} {'objects':>8} {'bones':>7} {'groups':>8}  " + " ".join(f"{LABELS[k]:>10}" for k in keys)
+    print("Seconds per phase")
+    print(header)
+    for r in results:
+        print(f"{r['rigs']:>5} {r['objects']:>8} {r['bones']:>7} {r['vertex_groups']:>8}  "
+              + " ".join(f"{r['seconds'][k]:>10.4f}" for k in keys))
+    print()
+    print("Microseconds per unit (bone; vertex group for plan and vgroups; both for conv+rev)")
+    print(header)
+    for r in results:
+        print(f"{r['rigs']:>5} {r['objects']:>8} {r['bones']:>7} {r['vertex_groups']:>8}  "
+              + " ".join(f"{r['us_per_unit'][k]:>10.3f}" for k in keys))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Rig counts to run")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument("--no-check", action="store_true", help="Don't fail on threshold regressions")
+    args = parser.parse_args(argv)
+
+    results = [bench_size(n) for n in sorted(args.sizes)]
+    print_table(results)
+    engine = renamer.get_naming_engine()
+    print()
+    print("Naming engine:", json.dumps(engine.stats()))
+
+    failures = check_thresholds(results[-1])
+    round_trip = [f"{r['rigs']} rigs: {line}" for r in results for line in r["round_trip_failures"]]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "thresholds": THRESHOLDS, "failures": failures + round_trip}, f, indent=2)
+    if round_trip:
+        print()
+        print("Convert + revert did not restore the original names:")
+        for line in round_trip:
+            print("  " + line)
+        return 1
+    if failures:
+        print()
+        print("Threshold regressions at the largest size:")
+        for line in failures:
+            print("  " + line)
+        return 0 if args.no_check else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
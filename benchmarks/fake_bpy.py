@@ -0,0 +1,678 @@
+"""
+Lightweight stand-in for the parts of bpy the addon touches, so the renamer can
+be imported, exercised and timed outside Blender:
+
+    import sys
+    from benchmarks import fake_bpy, fake_mathutils
+    sys.modules["bpy"] = fake_bpy
+    fake_mathutils.install()
+    import sim4_xmirror_renamer
+
+Only behaviour the addon relies on is modelled, including Blender renaming the
+matching vertex group on each mesh deformed by an armature whenever one of its
+bones is renamed. Blender finds those meshes by walking every object; the
+stand-in keeps a per-armature user list instead so large synthetic scenes stay
+quick to build, which means bone renames are cheaper here than in Blender.
+"""
+
+import types as _types
+
+_next_pointer = [0x1000]
+
+
+def _new_pointer():
+    _next_pointer[0] += 0x10
+    return _next_pointer[0]
+
+
+class IDProperties(dict):
+    """ID properties; nested dicts come back as groups with to_dict()."""
+
+    def __setitem__(self, key, value):
+        if isinstance(value, dict):
+            value = IDPropertyGroup(value)
+        super().__setitem__(key, value)
+
+
+class IDPropertyGroup(dict):
+    def to_dict(self):
+        return dict(self)
+
+
+class NamedItem:
+    _collection = None
+
+    def __init__(self, name):
+        self._name = name
+        self._pointer = _new_pointer()
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        value = value[:63]
+        coll = self._collection
+        if coll is not None:
+            value = coll._rename(self, value)
+        self._name = value
+
+    def as_pointer(self):
+        return self._pointer
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._name!r}>"
+
+
+class NamedCollection:
+    def __init__(self, items=()):
+        self._items = []
+        self._by_name = {}
+        for item in items:
+            self._link(item)
+
+    def _unique(self, name, exclude=None):
+        if name not in self._by_name or self._by_name[name] is exclude:
+            return name
+        i = 1
+        while True:
+            candidate = f"{name[:59]}.{i:03d}"
+            if candidate not in self._by_name:
+                return candidate
+            i += 1
+
+    def _link(self, item):
+        item._name = self._unique(item._name)
+        item._collection = self
+        self._items.append(item)
+        self._by_name[item._name] = item
+        return item
+
+    def _rename(self, item, value):
+        value = self._unique(value, exclude=item)
+        del self._by_name[item._name]
+        self._by_name[value] = item
+        return value
+
+    def remove(self, item):
+        self._items.remove(item)
+        del self._by_name[item._name]
+        item._collection = None
+
+    def get(self, name, default=None):
+        return self._by_name.get(name, default)
+
+    def keys(self):
+        return [i._name for i in self._items]
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._by_name[key]
+        return self._items[key]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def foreach_get(self, attr, seq):
+        i = 0
+        for item in self._items:
+            value = getattr(item, attr)
+            if isinstance(value, (tuple, list)):
+                for v in value:
+                    seq[i] = v
+                    i += 1
+            else:
+                seq[i] = value
+                i += 1
+
+    def foreach_set(self, attr, seq):
+        i = 0
+        for item in self._items:
+            value = getattr(item, attr)
+            if isinstance(value, (tuple, list)):
+                n = len(value)
+                setattr(item, attr, type(value)(seq[i:i + n]))
+                i += n
+            else:
+                setattr(item, attr, seq[i])
+                i += 1
+
+
+class ID(NamedItem):
+    def __init__(self, name):
+        super().__init__(name)
+        self._props = IDProperties()
+        self.animation_data = None
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData()
+        return self.animation_data
+
+    @property
+    def original(self):
+        return self
+
+    def __contains__(self, key):
+        return key in self._props
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def __delitem__(self, key):
+        del self._props[key]
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+
+class Bone(NamedItem):
+    def __init__(self, name, head=(0.0, 0.0, 0.0), tail=(0.0, 0.0, 1.0)):
+        super().__init__(name)
+        self.head_local = tuple(head)
+        self.tail_local = tuple(tail)
+        self.use_deform = True
+
+    @NamedItem.name.setter
+    def name(self, value):
+        old = self._name
+        NamedItem.name.fset(self, value)
+        coll = self._collection
+        if coll is not None and coll._armature is not None and old != self._name:
+            coll._armature._bone_renamed(old, self._name)
+
+
+class BoneCollection(NamedCollection):
+    def __init__(self, armature):
+        super().__init__()
+        self._armature = armature
+
+    def new(self, name, head=(0.0, 0.0, 0.0), tail=(0.0, 0.0, 1.0)):
+        return self._link(Bone(name, head, tail))
+
+
+class Armature(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.bones = BoneCollection(self)
+        self.edit_bones = BoneCollection(self)
+        self.is_editmode = False
+        self._users = None
+        self._users_count = -1
+
+    def _deformed_meshes(self):
+        count = len(data.objects)
+        if self._users is None or self._users_count != count:
+            self._users = [
+                obj for obj in data.objects
+                if obj.type == 'MESH' and any(
+                    m.type == 'ARMATURE' and m.object is not None and m.object.data is self
+                    for m in obj.modifiers
+                )
+            ]
+            self._users_count = count
+        return self._users
+
+    def _bone_renamed(self, old, new):
+        # Mirrors ED_armature_bone_rename: matching vertex groups follow the bone
+        for obj in self._deformed_meshes():
+            g = obj.vertex_groups.get(old)
+            if g is not None and new not in obj.vertex_groups:
+                g.name = new
+
+
+class VertexGroup(NamedItem):
+    def __init__(self, name, index):
+        super().__init__(name)
+        self.index = index
+        self._weights = {}
+        self._owner = None
+
+    def add(self, index, weight, type):
+        for i in index:
+            if type == 'REPLACE' or i not in self._weights:
+                self._weights[i] = weight
+            elif type == 'ADD':
+                self._weights[i] = min(1.0, self._weights[i] + weight)
+            elif type == 'SUBTRACT':
+                self._weights[i] = max(0.0, self._weights[i] - weight)
+
+    def remove(self, index):
+        for i in index:
+            self._weights.pop(i, None)
+
+    def weight(self, index):
+        try:
+            return self._weights[index]
+        except KeyError:
+            raise RuntimeError("Error: Vertex not in group") from None
+
+
+class VertexGroups(NamedCollection):
+    def __init__(self, obj):
+        super().__init__()
+        self._obj = obj
+
+    def new(self, name="Group"):
+        g = VertexGroup(name, len(self._items))
+        g._owner = self._obj
+        return self._link(g)
+
+    def remove(self, group):
+        super().remove(group)
+        for i, g in enumerate(self._items):
+            g.index = i
+
+
+class VertexGroupElement:
+    __slots__ = ("group", "weight")
+
+    def __init__(self, group, weight):
+        self.group = group
+        self.weight = weight
+
+
+class Vertex:
+    def __init__(self, mesh, index, co):
+        self._mesh = mesh
+        self.index = index
+        self.co = tuple(co)
+
+    @property
+    def groups(self):
+        # Weights live on the object's groups here; the last object using the mesh owns them
+        owner = self._mesh._owner
+        if owner is None:
+            return []
+        return [VertexGroupElement(g.index, g._weights[self.index])
+                for g in owner.vertex_groups._items if self.index in g._weights]
+
+
+class LoopTriangle:
+    def __init__(self, index, vertices):
+        self.index = index
+        self.vertices = tuple(vertices)
+
+
+class Mesh(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.vertices = NamedCollection()
+        self.loop_triangles = NamedCollection()
+        self._faces = []
+        self._owner = None
+
+    def from_pydata(self, vertices, edges=(), faces=()):
+        self.vertices = NamedCollection()
+        self.vertices._items = [Vertex(self, i, co) for i, co in enumerate(vertices)]
+        self._faces = [tuple(f) for f in faces]
+        self.calc_loop_triangles()
+
+    def calc_loop_triangles(self):
+        # Fan triangulation, enough for the convex quads/tris the tests build
+        tris = [(f[0], f[i], f[i + 1]) for f in self._faces for i in range(1, len(f) - 1)]
+        self.loop_triangles = NamedCollection()
+        self.loop_triangles._items = [LoopTriangle(i, tri) for i, tri in enumerate(tris)]
+
+
+class Modifier(NamedItem):
+    def __init__(self, name, type, object=None):
+        super().__init__(name)
+        self.type = type
+        self._object = object
+
+    @property
+    def object(self):
+        return self._object
+
+    @object.setter
+    def object(self, value):
+        self._object = value
+        if value is not None and isinstance(value.data, Armature):
+            value.data._users = None
+
+
+class Modifiers(NamedCollection):
+    def new(self, name, type):
+        return self._link(Modifier(name, type))
+
+
+class Object(ID):
+    def __init__(self, name, object_data=None):
+        super().__init__(name)
+        self.data = object_data
+        if isinstance(object_data, Armature):
+            self.type = 'ARMATURE'
+        elif isinstance(object_data, Mesh):
+            self.type = 'MESH'
+        else:
+            self.type = 'EMPTY'
+        self.modifiers = Modifiers()
+        self.vertex_groups = VertexGroups(self)
+        self.constraints = Constraints()
+        self.mode = 'OBJECT'
+        self.matrix_world = [[1.0 if r == c else 0.0 for c in range(4)] for r in range(4)]
+        self.pose = Pose(object_data) if self.type == 'ARMATURE' else None
+        if self.type == 'MESH':
+            object_data._owner = self
+        self._selected = False
+
+    def select_set(self, state):
+        self._selected = bool(state)
+
+    def select_get(self):
+        return self._selected
+
+
+class BlendDataObjects(NamedCollection):
+    def new(self, name, object_data):
+        obj = self._link(Object(name, object_data))
+        return obj
+
+    def remove(self, obj, do_unlink=True):
+        super().remove(obj)
+
+
+class BlendDataIDs(NamedCollection):
+    def __init__(self, cls):
+        super().__init__()
+        self._cls = cls
+
+    def new(self, name):
+        return self._link(self._cls(name))
+
+
+class FCurve:
+    def __init__(self, data_path, array_index=0, group=None):
+        self.data_path = data_path
+        self.array_index = array_index
+        self.group = group
+        self.driver = None
+
+
+class ActionGroup(NamedItem):
+    pass
+
+
+class Action(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.fcurves = []
+        self.groups = NamedCollection()
+        self.id_root = 'OBJECT'
+
+    def new_fcurve(self, data_path, array_index=0, group_name=None):
+        group = None
+        if group_name is not None:
+            group = self.groups.get(group_name) or self.groups._link(ActionGroup(group_name))
+        fc = FCurve(data_path, array_index, group)
+        self.fcurves.append(fc)
+        return fc
+
+
+class DriverTarget:
+    def __init__(self, id=None, bone_target="", data_path=""):
+        self.id = id
+        self.bone_target = bone_target
+        self.data_path = data_path
+        self.transform_type = 'LOC_X'
+
+
+class DriverVariable:
+    def __init__(self, name, type='SINGLE_PROP', targets=()):
+        self.name = name
+        self.type = type
+        self.targets = list(targets)
+
+
+class Driver:
+    def __init__(self, expression="var"):
+        self.expression = expression
+        self.variables = []
+
+
+class NlaStrip:
+    def __init__(self, action):
+        self.action = action
+
+
+class NlaTrack:
+    def __init__(self, strips=()):
+        self.strips = list(strips)
+
+
+class AnimData:
+    def __init__(self, action=None):
+        self.action = action
+        self.nla_tracks = []
+        self.drivers = []
+
+    def new_driver(self, data_path, array_index=0):
+        fc = FCurve(data_path, array_index)
+        fc.driver = Driver()
+        self.drivers.append(fc)
+        return fc
+
+
+class Constraint(NamedItem):
+    def __init__(self, name, type, target=None, subtarget=""):
+        super().__init__(name)
+        self.type = type
+        self.target = target
+        self.subtarget = subtarget
+
+
+class Constraints(NamedCollection):
+    def new(self, type):
+        return self._link(Constraint(type.title(), type))
+
+
+class PoseBone(NamedItem):
+    def __init__(self, name):
+        super().__init__(name)
+        self.constraints = Constraints()
+
+
+class Pose:
+    def __init__(self, armature):
+        self.bones = NamedCollection(PoseBone(b.name) for b in armature.bones)
+
+
+class _Data:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.objects = BlendDataObjects()
+        self.armatures = BlendDataIDs(Armature)
+        self.meshes = BlendDataIDs(Mesh)
+        self.actions = BlendDataIDs(Action)
+        self.shape_keys = BlendDataIDs(ID)
+        self.materials = BlendDataIDs(ID)
+        self.filepath = ""
+
+
+data = _Data()
+
+
+class _Struct:
+    pass
+
+
+class Operator(_Struct):
+    bl_options = set()
+
+    def __init__(self):
+        self.reports = []
+
+    def report(self, type, message):
+        self.reports.append((set(type), message))
+
+
+class Panel(_Struct):
+    pass
+
+
+class AddonPreferences(_Struct):
+    pass
+
+
+class PropertyGroup(_Struct):
+    pass
+
+
+class PreferencesView(_Struct):
+    pass
+
+
+types = _types.SimpleNamespace(
+    Operator=Operator,
+    Panel=Panel,
+    AddonPreferences=AddonPreferences,
+    PropertyGroup=PropertyGroup,
+    PreferencesView=PreferencesView,
+    Object=Object,
+    Armature=Armature,
+    Mesh=Mesh,
+    Bone=Bone,
+    EditBone=Bone,
+    VertexGroup=VertexGroup,
+    Action=Action,
+    ID=ID,
+)
+
+
+def _prop(**kwargs):
+    return kwargs.get("default")
+
+
+def _prop_factory(*args, **kwargs):
+    return _prop(**kwargs)
+
+
+props = _types.SimpleNamespace(
+    EnumProperty=_prop_factory,
+    BoolProperty=_prop_factory,
+    StringProperty=_prop_factory,
+    FloatProperty=_prop_factory,
+    IntProperty=_prop_factory,
+    PointerProperty=_prop_factory,
+    CollectionProperty=_prop_factory,
+)
+
+
+def _persistent(func):
+    return func
+
+
+app = _types.SimpleNamespace(
+    binary_path="blender",
+    background=True,
+    version=(4, 2, 0),
+    handlers=_types.SimpleNamespace(
+        persistent=_persistent,
+        depsgraph_update_post=[],
+        load_post=[],
+        undo_post=[],
+        redo_post=[],
+        save_pre=[],
+    ),
+    timers=_types.SimpleNamespace(
+        register=lambda func, first_interval=0.0, persistent=False: None,
+        unregister=lambda func: None,
+        is_registered=lambda func: False,
+    ),
+    driver_namespace={},
+)
+
+
+class _MsgBus:
+    def __init__(self):
+        self.subscriptions = []
+
+    def subscribe_rna(self, key, owner, args, notify, options=set()):
+        self.subscriptions.append((key, owner, args, notify))
+
+    def clear_by_owner(self, owner):
+        self.subscriptions = [s for s in self.subscriptions if s[1] is not owner]
+
+
+msgbus = _MsgBus()
+
+path = _types.SimpleNamespace(abspath=lambda p: p)
+
+utils = _types.SimpleNamespace(
+    register_class=lambda cls: None,
+    unregister_class=lambda cls: None,
+    user_resource=lambda resource_type, path="", create=False: "",
+)
+
+
+class _ObjectOps:
+    def mode_set(self, mode='OBJECT'):
+        active = context.view_layer.objects.active
+        if active is not None:
+            active.mode = mode
+            if active.type == 'ARMATURE':
+                active.data.is_editmode = mode == 'EDIT'
+        return {'FINISHED'}
+
+
+class _WMOps:
+    def save_as_mainfile(self, filepath="", copy=False):
+        return {'FINISHED'}
+
+
+ops = _types.SimpleNamespace(object=_ObjectOps(), wm=_WMOps())
+
+
+class _ViewLayerObjects:
+    def __init__(self):
+        self.active = None
+
+    def __iter__(self):
+        return iter(data.objects)
+
+
+class _Context:
+    def __init__(self):
+        self.preferences = _types.SimpleNamespace(
+            addons={},
+            view=_types.SimpleNamespace(language="en_US"),
+        )
+        self.view_layer = _types.SimpleNamespace(objects=_ViewLayerObjects())
+        self.collection = _types.SimpleNamespace(all_objects=data.objects)
+        self.window_manager = None
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def selected_objects(self):
+        return [o for o in data.objects if o.select_get()]
+
+    @property
+    def mode(self):
+        active = self.active_object
+        return active.mode if active is not None else 'OBJECT'
+
+
+context = _Context()
@@ -0,0 +1,137 @@
+"""
+Stand-in for the parts of mathutils the addon uses (kdtree, bvhtree),
+registered next to fake_bpy:
+
+    import sys
+    from benchmarks import fake_bpy, fake_mathutils
+    sys.modules["bpy"] = fake_bpy
+    fake_mathutils.install()
+
+KDTree answers exact hits from a dictionary and falls back to a linear scan,
+and BVHTree scans every triangle. That is enough for the small synthetic
+meshes, but far slower than Blender's trees on arbitrary queries.
+"""
+
+import math
+import sys
+import types as _types
+
+
+class Vector(tuple):
+    def __new__(cls, seq=(0.0, 0.0, 0.0)):
+        return super().__new__(cls, (float(v) for v in seq))
+
+    @property
+    def x(self):
+        return self[0]
+
+    @property
+    def y(self):
+        return self[1]
+
+    @property
+    def z(self):
+        return self[2]
+
+
+class KDTree:
+    def __init__(self, size):
+        self._points = []
+        self._exact = {}
+
+    def insert(self, co, index):
+        co = tuple(float(v) for v in co)
+        self._points.append((co, index))
+        self._exact.setdefault(co, index)
+
+    def balance(self):
+        pass
+
+    def find(self, co):
+        co = tuple(float(v) for v in co)
+        index = self._exact.get(co)
+        if index is not None:
+            return Vector(co), index, 0.0
+        best = (None, None, math.inf)
+        for point, i in self._points:
+            dist = math.dist(point, co)
+            if dist < best[2]:
+                best = (Vector(point), i, dist)
+        return best
+
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _closest_on_triangle(p, a, b, c):
+    # Ericson, Real-Time Collision Detection 5.1.5
+    ab, ac, ap = _sub(b, a), _sub(c, a), _sub(p, a)
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    if d1 <= 0 and d2 <= 0:
+        return a
+    bp = _sub(p, b)
+    d3, d4 = _dot(ab, bp), _dot(ac, bp)
+    if d3 >= 0 and d4 <= d3:
+        return b
+    vc = d1 * d4 - d3 * d2
+    if vc <= 0 and d1 >= 0 and d3 <= 0:
+        v = d1 / (d1 - d3)
+        return tuple(a[i] + v * ab[i] for i in range(3))
+    cp = _sub(p, c)
+    d5, d6 = _dot(ab, cp), _dot(ac, cp)
+    if d6 >= 0 and d5 <= d6:
+        return c
+    vb = d5 * d2 - d1 * d6
+    if vb <= 0 and d2 >= 0 and d6 <= 0:
+        w = d2 / (d2 - d6)
+        return tuple(a[i] + w * ac[i] for i in range(3))
+    va = d3 * d6 - d5 * d4
+    if va <= 0 and (d4 - d3) >= 0 and (d5 - d6) >= 0:
+        w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        return tuple(b[i] + w * (c[i] - b[i]) for i in range(3))
+    denom = 1.0 / (va + vb + vc)
+    v, w = vb * denom, vc * denom
+    return tuple(a[i] + ab[i] * v + ac[i] * w for i in range(3))
+
+
+class BVHTree:
+    """Linear scan over the triangles; fine for test-sized meshes."""
+
+    def __init__(self, vertices, polygons):
+        self._vertices = [tuple(map(float, v)) for v in vertices]
+        self._polygons = [tuple(p) for p in polygons]
+
+    @classmethod
+    def FromPolygons(cls, vertices, polygons, all_triangles=False, epsilon=0.0):
+        return cls(vertices, polygons)
+
+    def find_nearest(self, origin, distance=1.84467e19):
+        origin = tuple(map(float, origin))
+        best = (None, None, None, None)
+        best_dist = distance
+        for index, poly in enumerate(self._polygons):
+            a, b, c = (self._vertices[i] for i in poly[:3])
+            point = _closest_on_triangle(origin, a, b, c)
+            dist = math.dist(point, origin)
+            if dist <= best_dist:
+                best_dist = dist
+                best = (Vector(point), Vector((0.0, 0.0, 1.0)), index, dist)
+        return best
+
+
+kdtree = _types.ModuleType("mathutils.kdtree")
+kdtree.KDTree = KDTree
+bvhtree = _types.ModuleType("mathutils.bvhtree")
+bvhtree.BVHTree = BVHTree
+
+
+def install():
+    module = sys.modules[__name__]
+    sys.modules["mathutils"] = module
+    sys.modules["mathutils.kdtree"] = kdtree
+    sys.modules["mathutils.bvhtree"] = bvhtree
@@ -10,15 +10,37 @@ bl_info = {
 
 import bpy
 import re
+import os
+import sys
+import glob
 import json
+import hashlib
+import time
+import argparse
+import cProfile
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from mathutils.bvhtree import BVHTree
+from mathutils.kdtree import KDTree
+
+try:
+    import numpy as np
+except ImportError:  # bundled with Blender; only missing from stripped-down builds
+    np = None
 
 MAP_PROP = "sim4_rename_map"
 TEMP_SUFFIX = "__tmp_ren__"
 
-# Localization dictionary (multiple languages)
+# Localization tables (multiple languages)
 # Keys used by the addon. English and Japanese preserved; additional languages added.
-TEXTS = {
-    "en": {
+# Each table is built on first use by its loader, so only the active language
+# (plus English as the fallback) is ever materialized.
+
+def _texts_en():
+    return {
         "panel_title": "Sims4 Naming",
         "active_required": "Active Armature required",
         "convert_button": "Convert to X-Mirror Names",
@@ -31,16 +53,72 @@ TEXTS = {
         "info_no_targets": "No bones found to convert (already converted or naming differs).",
         "error_conversion": "Error during conversion: {err}",
         "info_converted": "Converted {bones} bones. Vertex groups changed: {vgs}. Use Revert to restore.",
+        "info_converted_incremental": "Converted {bones} new bones ({total} mapped in total). Vertex groups changed: {vgs}.",
         "error_no_mapping": "No saved conversion mapping found on this armature.",
         "error_revert": "Error during revert: {err}",
         "info_reverted": "Revert complete. Bones: {bones}. Vertex groups changed: {vgs}.",
+        "batch_convert_button": "Batch Convert...",
+        "batch_revert_button": "Batch Revert...",
+        "error_no_armatures": "No armatures found in the chosen scope.",
+        "info_batch_item": "{name}: bones {bones}, vertex groups changed {vgs}.",
+        "info_batch_skipped": "{name}: skipped ({reason})",
+        "error_batch_item": "{name}: failed ({err})",
+        "info_batch_summary": "Batch complete: {done}/{total} armatures. Bones: {bones}. Vertex groups changed: {vgs}.",
+        "symmetrize_button": "Symmetrize Weights...",
+        "error_weight_target": "Select a converted armature or a mesh deformed by one.",
+        "error_weights": "Error while editing weights: {err}",
+        "info_symmetrized": "Symmetrized {meshes} meshes. Weights changed: {weights}. Vertices without a mirror partner: {unmatched}.",
+        "validate_button": "Check Symmetry",
+        "symmetry_ok": "Symmetry OK: {pairs} bone pairs, {centers} center bones.",
+        "symmetry_issues": "Symmetry issues: {missing} without partner, {asymmetric} pairs not mirrored, {off_center} center bones off X=0.",
+        "symmetry_missing": "{name}: no mirror partner",
+        "symmetry_pair": "{left} / {right}: off by {error:.4f}",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "Check symmetry after Convert",
+        "prune_button": "Remove Empty Groups",
+        "info_pruned_mesh": "{name}: {count} empty groups ({groups})",
+        "info_pruned": "Removed {groups} empty vertex groups from {meshes} meshes.",
+        "info_empty_found": "Found {groups} empty vertex groups on {meshes} meshes.",
+        "pref_prune": "Remove empty groups on Convert",
+        "pref_keep_groups": "Always keep",
+        "status_original": "Not converted: {pending} bones to convert",
+        "status_partial": "Partly converted: {converted} bones, {pending} new to convert",
+        "status_converted": "Converted: {converted} bones",
+        "status_none": "No bones to convert (naming differs)",
+        "status_meshes": "Deforming meshes: {meshes}",
+        "status_collisions": "Pending name collisions: {count}",
+        "status_error": "Status unavailable: {err}",
+        "export_button": "Export with Sims 4 Names...",
+        "error_export": "Export failed, x-mirror names kept: {err}",
+        "info_exported": "Saved {path} with Sims 4 names ({count} armatures). This file keeps its x-mirror names.",
+        "limit_button": "Limit to 4 Influences",
+        "info_limited": "{meshes} meshes: {limited} vertices cut to {max} influences, {normalized} normalized ({weights} weights changed).",
+        "warn_unweighted": "{count} vertices have no bone weights.",
+        "pref_limit_export": "Limit influences on export",
+        "info_layouts": "Vertex groups: {meshes} meshes sharing {layouts} distinct layouts.",
+        "transfer_button": "Transfer Weights from Reference",
+        "error_transfer_reference": "Make the reference mesh active and select the target meshes.",
+        "info_transferred": "Transferred weights to {meshes} meshes ({vertices} vertices, {missed} out of range).",
+        "warn_transfer_skipped": "{count} meshes skipped: not deformed by a converted armature.",
+        "info_batch_layouts": "Vertex groups: {meshes} meshes on {armatures} armatures, {layouts} layouts planned (distinct per armature).",
         "pref_label": "S4 Rename Preferences",
         "pref_language": "Language",
+        "pref_rule_set": "Naming Rules",
+        "pref_modal": "Show progress (Esc cancels)",
+        "pref_rig_cache": "Cache known rigs",
+        "info_modal_cancelled": "Cancelled. All renames done so far were undone.",
+        "pref_profile_timings": "Report phase timings",
+        "pref_profile_cprofile": "Capture cProfile",
+        "pref_profile_path": "Profile output",
+        "info_timings": "Timings {summary}",
+        "error_profile_dump": "Could not write profile: {err}",
         "lang_auto": "Auto (use Blender language)",
         "lang_en": "English",
         "lang_ja": "日本語 (Japanese)",
-    },
-    "ja": {
+    }
+
+def _texts_ja():
+    return {
         "panel_title": "Sims4 命名",
         "active_required": "アクティブなアーマチュアが必要です",
         "convert_button": "Xミラー用に変換",
@@ -53,17 +131,73 @@ TEXTS = {
         "info_no_targets": "変換対象のボーンが見つかりませんでした（既に変換済み、または命名規則が異なる可能性があります）。",
         "error_conversion": "変換中にエラー: {err}",
         "info_converted": "ボーン名を {bones} 件変換しました。頂点グループの変更: {vgs} 件。元に戻すには Revert を使用してください。",
+        "info_converted_incremental": "新しいボーンを {bones} 件変換しました（合計 {total} 件）。頂点グループの変更: {vgs} 件。",
         "error_no_mapping": "このアーマチュアには保存された変換マッピングがありません。",
         "error_revert": "リバート中にエラー: {err}",
         "info_reverted": "リバート完了。ボーン数: {bones}。頂点グループの変更: {vgs} 件。",
+        "batch_convert_button": "一括変換...",
+        "batch_revert_button": "一括で元に戻す...",
+        "error_no_armatures": "指定範囲にアーマチュアが見つかりません。",
+        "info_batch_item": "{name}: ボーン {bones} 件、頂点グループの変更 {vgs} 件。",
+        "info_batch_skipped": "{name}: スキップ（{reason}）",
+        "error_batch_item": "{name}: 失敗（{err}）",
+        "info_batch_summary": "一括処理完了: {done}/{total} アーマチュア。ボーン: {bones}。頂点グループの変更: {vgs} 件。",
+        "symmetrize_button": "ウェイトを対称化...",
+        "error_weight_target": "変換済みのアーマチュア、またはそれで変形するメッシュを選択してください。",
+        "error_weights": "ウェイト編集中にエラー: {err}",
+        "info_symmetrized": "{meshes} 個のメッシュを対称化しました。変更したウェイト: {weights} 件。ミラー相手のない頂点: {unmatched} 個。",
+        "validate_button": "対称性をチェック",
+        "symmetry_ok": "対称性 OK: ボーンペア {pairs} 組、中央ボーン {centers} 本。",
+        "symmetry_issues": "対称性の問題: 相手なし {missing} 件、ミラーになっていないペア {asymmetric} 組、X=0 から外れた中央ボーン {off_center} 本。",
+        "symmetry_missing": "{name}: ミラー相手がありません",
+        "symmetry_pair": "{left} / {right}: {error:.4f} ずれています",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "変換後に対称性をチェック",
+        "prune_button": "空の頂点グループを削除",
+        "info_pruned_mesh": "{name}: 空のグループ {count} 件（{groups}）",
+        "info_pruned": "{meshes} 個のメッシュから空の頂点グループを {groups} 件削除しました。",
+        "info_empty_found": "{meshes} 個のメッシュに空の頂点グループが {groups} 件あります。",
+        "pref_prune": "変換時に空のグループを削除",
+        "pref_keep_groups": "常に残すグループ",
+        "status_original": "未変換: 変換対象のボーン {pending} 本",
+        "status_partial": "一部変換済み: {converted} 本、新規の変換対象 {pending} 本",
+        "status_converted": "変換済み: ボーン {converted} 本",
+        "status_none": "変換対象のボーンがありません（命名規則が異なります）",
+        "status_meshes": "変形対象のメッシュ: {meshes} 個",
+        "status_collisions": "名前の衝突: {count} 件",
+        "status_error": "状態を取得できません: {err}",
+        "export_button": "Sims 4 の命名でエクスポート...",
+        "error_export": "エクスポートに失敗しました（Xミラー用の命名は維持）: {err}",
+        "info_exported": "{path} を Sims 4 の命名で保存しました（アーマチュア {count} 個）。このファイルは Xミラー用の命名のままです。",
+        "limit_button": "影響ボーンを 4 つに制限",
+        "info_limited": "{meshes} 個のメッシュ: {limited} 頂点を {max} 影響に制限、{normalized} 頂点を正規化（変更したウェイト {weights} 件）。",
+        "warn_unweighted": "ボーンウェイトのない頂点が {count} 個あります。",
+        "pref_limit_export": "エクスポート時に影響ボーンを制限",
+        "info_layouts": "頂点グループ: {meshes} 個のメッシュ、異なるレイアウト {layouts} 種類。",
+        "transfer_button": "参照メッシュからウェイト転送",
+        "error_transfer_reference": "参照メッシュをアクティブにし、転送先のメッシュを選択してください。",
+        "info_transferred": "{meshes} 個のメッシュにウェイトを転送しました（{vertices} 頂点、範囲外 {missed} 頂点）。",
+        "warn_transfer_skipped": "{count} 個のメッシュをスキップしました（変換済みアーマチュアで変形していません）。",
+        "info_batch_layouts": "頂点グループ: {armatures} 個のアーマチュアの {meshes} 個のメッシュ、計画したレイアウト {layouts} 種類（アーマチュアごとに集計）。",
         "pref_label": "S4 Rename 設定",
         "pref_language": "言語",
+        "pref_rule_set": "命名ルール",
+        "pref_modal": "進捗を表示（Esc でキャンセル）",
+        "pref_rig_cache": "既知のリグをキャッシュ",
+        "info_modal_cancelled": "キャンセルしました。ここまでの名前変更はすべて元に戻しました。",
+        "pref_profile_timings": "処理時間を報告",
+        "pref_profile_cprofile": "cProfile を記録",
+        "pref_profile_path": "プロファイル出力先",
+        "info_timings": "処理時間 {summary}",
+        "error_profile_dump": "プロファイルを書き出せませんでした: {err}",
         "lang_auto": "自動（Blender の言語設定に従う）",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # Spanish
-    "es": {
+    }
+
+# Spanish
+def _texts_es():
+    return {
         "panel_title": "Nomenclatura Sims4",
         "active_required": "Se requiere un armature activo",
         "convert_button": "Convertir a nombres X-Mirror",
@@ -79,14 +213,70 @@ TEXTS = {
         "error_no_mapping": "No se encontró un mapeo de conversión guardado en este armature.",
         "error_revert": "Error durante la reversión: {err}",
         "info_reverted": "Reversión completa. Huesos: {bones}. Grupos de vértices cambiados: {vgs}.",
+        "info_converted_incremental": "Convertidos {bones} huesos nuevos ({total} mapeados en total). Grupos de vértices cambiados: {vgs}.",
+        "batch_convert_button": "Conversión por lotes...",
+        "batch_revert_button": "Reversión por lotes...",
+        "error_no_armatures": "No se encontraron armatures en el ámbito elegido.",
+        "info_batch_item": "{name}: huesos {bones}, grupos de vértices cambiados {vgs}.",
+        "info_batch_skipped": "{name}: omitido ({reason})",
+        "error_batch_item": "{name}: falló ({err})",
+        "info_batch_summary": "Lote completado: {done}/{total} armatures. Huesos: {bones}. Grupos de vértices cambiados: {vgs}.",
+        "symmetrize_button": "Simetrizar pesos...",
+        "error_weight_target": "Seleccione un armature convertido o una malla deformada por uno.",
+        "error_weights": "Error al editar los pesos: {err}",
+        "info_symmetrized": "Simetrizadas {meshes} mallas. Pesos cambiados: {weights}. Vértices sin pareja espejo: {unmatched}.",
+        "validate_button": "Comprobar simetría",
+        "symmetry_ok": "Simetría correcta: {pairs} pares de huesos, {centers} huesos centrales.",
+        "symmetry_issues": "Problemas de simetría: {missing} sin pareja, {asymmetric} pares no reflejados, {off_center} huesos centrales fuera de X=0.",
+        "symmetry_missing": "{name}: sin pareja espejo",
+        "symmetry_pair": "{left} / {right}: desviación de {error:.4f}",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "Comprobar simetría tras convertir",
+        "prune_button": "Eliminar grupos vacíos",
+        "info_pruned_mesh": "{name}: {count} grupos vacíos ({groups})",
+        "info_pruned": "Eliminados {groups} grupos de vértices vacíos de {meshes} mallas.",
+        "info_empty_found": "Encontrados {groups} grupos de vértices vacíos en {meshes} mallas.",
+        "pref_prune": "Eliminar grupos vacíos al convertir",
+        "pref_keep_groups": "Conservar siempre",
+        "status_original": "Sin convertir: {pending} huesos por convertir",
+        "status_partial": "Convertido en parte: {converted} huesos, {pending} nuevos por convertir",
+        "status_converted": "Convertido: {converted} huesos",
+        "status_none": "No hay huesos que convertir (nombres distintos)",
+        "status_meshes": "Mallas deformadas: {meshes}",
+        "status_collisions": "Colisiones de nombres pendientes: {count}",
+        "status_error": "Estado no disponible: {err}",
+        "export_button": "Exportar con nombres de Sims 4...",
+        "error_export": "La exportación falló, se mantienen los nombres x-mirror: {err}",
+        "info_exported": "Guardado {path} con nombres de Sims 4 ({count} armatures). Este archivo mantiene sus nombres x-mirror.",
+        "limit_button": "Limitar a 4 influencias",
+        "info_limited": "{meshes} mallas: {limited} vértices reducidos a {max} influencias, {normalized} normalizados ({weights} pesos cambiados).",
+        "warn_unweighted": "{count} vértices no tienen pesos de huesos.",
+        "pref_limit_export": "Limitar influencias al exportar",
+        "info_layouts": "Grupos de vértices: {meshes} mallas que comparten {layouts} disposiciones distintas.",
+        "transfer_button": "Transferir pesos desde referencia",
+        "error_transfer_reference": "Active la malla de referencia y seleccione las mallas de destino.",
+        "info_transferred": "Pesos transferidos a {meshes} mallas ({vertices} vértices, {missed} fuera de alcance).",
+        "warn_transfer_skipped": "{count} mallas omitidas: no las deforma un armature convertido.",
+        "info_batch_layouts": "Grupos de vértices: {meshes} mallas en {armatures} armatures, {layouts} disposiciones planificadas (distintas por armature).",
+        "pref_rule_set": "Reglas de nombres",
+        "pref_modal": "Mostrar progreso (Esc cancela)",
+        "pref_rig_cache": "Recordar rigs conocidos",
+        "info_modal_cancelled": "Cancelado. Se deshicieron todos los cambios de nombre hechos hasta ahora.",
+        "pref_profile_timings": "Informar tiempos por fase",
+        "pref_profile_cprofile": "Capturar cProfile",
+        "pref_profile_path": "Salida del perfil",
+        "info_timings": "Tiempos {summary}",
+        "error_profile_dump": "No se pudo escribir el perfil: {err}",
         "pref_label": "Preferencias S4 Rename",
         "pref_language": "Idioma",
         "lang_auto": "Auto (usar idioma de Blender)",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # French
-    "fr": {
+    }
+
+# French
+def _texts_fr():
+    return {
         "panel_title": "Nommage Sims4",
         "active_required": "Armature active requise",
         "convert_button": "Convertir pour X-Mirror",
@@ -102,14 +292,70 @@ TEXTS = {
         "error_no_mapping": "Aucune table de conversion enregistrée pour cette armature.",
         "error_revert": "Erreur lors de la restauration : {err}",
         "info_reverted": "Restauration terminée. Os : {bones}. Groupes de vertex modifiés : {vgs}.",
+        "info_converted_incremental": "Converti {bones} nouveaux os ({total} mappés au total). Groupes de vertex modifiés : {vgs}.",
+        "batch_convert_button": "Conversion par lot...",
+        "batch_revert_button": "Restauration par lot...",
+        "error_no_armatures": "Aucune armature trouvée dans la portée choisie.",
+        "info_batch_item": "{name} : os {bones}, groupes de vertex modifiés {vgs}.",
+        "info_batch_skipped": "{name} : ignorée ({reason})",
+        "error_batch_item": "{name} : échec ({err})",
+        "info_batch_summary": "Lot terminé : {done}/{total} armatures. Os : {bones}. Groupes de vertex modifiés : {vgs}.",
+        "symmetrize_button": "Symétriser les poids...",
+        "error_weight_target": "Sélectionnez une armature convertie ou un maillage déformé par celle-ci.",
+        "error_weights": "Erreur lors de la modification des poids : {err}",
+        "info_symmetrized": "{meshes} maillages symétrisés. Poids modifiés : {weights}. Vertex sans partenaire miroir : {unmatched}.",
+        "validate_button": "Vérifier la symétrie",
+        "symmetry_ok": "Symétrie correcte : {pairs} paires d'os, {centers} os centraux.",
+        "symmetry_issues": "Problèmes de symétrie : {missing} sans partenaire, {asymmetric} paires non symétriques, {off_center} os centraux hors de X=0.",
+        "symmetry_missing": "{name} : aucun partenaire miroir",
+        "symmetry_pair": "{left} / {right} : écart de {error:.4f}",
+        "symmetry_center": "{name} : X = {x:.4f}",
+        "pref_validate_symmetry": "Vérifier la symétrie après Convert",
+        "prune_button": "Supprimer les groupes vides",
+        "info_pruned_mesh": "{name} : {count} groupes vides ({groups})",
+        "info_pruned": "{groups} groupes de vertex vides supprimés de {meshes} maillages.",
+        "info_empty_found": "{groups} groupes de vertex vides trouvés sur {meshes} maillages.",
+        "pref_prune": "Supprimer les groupes vides lors de Convert",
+        "pref_keep_groups": "Toujours conserver",
+        "status_original": "Non converti : {pending} os à convertir",
+        "status_partial": "Converti en partie : {converted} os, {pending} nouveaux à convertir",
+        "status_converted": "Converti : {converted} os",
+        "status_none": "Aucun os à convertir (nommage différent)",
+        "status_meshes": "Maillages déformés : {meshes}",
+        "status_collisions": "Collisions de noms en attente : {count}",
+        "status_error": "État indisponible : {err}",
+        "export_button": "Exporter avec les noms Sims 4...",
+        "error_export": "Échec de l'export, noms x-mirror conservés : {err}",
+        "info_exported": "{path} enregistré avec les noms Sims 4 ({count} armatures). Ce fichier garde ses noms x-mirror.",
+        "limit_button": "Limiter à 4 influences",
+        "info_limited": "{meshes} maillages : {limited} vertex réduits à {max} influences, {normalized} normalisés ({weights} poids modifiés).",
+        "warn_unweighted": "{count} vertex n'ont aucun poids d'os.",
+        "pref_limit_export": "Limiter les influences à l'export",
+        "info_layouts": "Groupes de vertex : {meshes} maillages partageant {layouts} dispositions distinctes.",
+        "transfer_button": "Transférer les poids depuis la référence",
+        "error_transfer_reference": "Rendez le maillage de référence actif et sélectionnez les maillages cibles.",
+        "info_transferred": "Poids transférés vers {meshes} maillages ({vertices} vertex, {missed} hors de portée).",
+        "warn_transfer_skipped": "{count} maillages ignorés : non déformés par une armature convertie.",
+        "info_batch_layouts": "Groupes de vertex : {meshes} maillages sur {armatures} armatures, {layouts} dispositions planifiées (distinctes par armature).",
+        "pref_rule_set": "Règles de nommage",
+        "pref_modal": "Afficher la progression (Échap annule)",
+        "pref_rig_cache": "Mémoriser les rigs connus",
+        "info_modal_cancelled": "Annulé. Tous les renommages déjà effectués ont été annulés.",
+        "pref_profile_timings": "Afficher les durées par phase",
+        "pref_profile_cprofile": "Capturer cProfile",
+        "pref_profile_path": "Fichier de profil",
+        "info_timings": "Durées {summary}",
+        "error_profile_dump": "Impossible d'écrire le profil : {err}",
         "pref_label": "Préférences S4 Rename",
         "pref_language": "Langue",
         "lang_auto": "Auto (utiliser la langue de Blender)",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # German
-    "de": {
+    }
+
+# German
+def _texts_de():
+    return {
         "panel_title": "Sims4 Benennung",
         "active_required": "Aktives Armature erforderlich",
         "convert_button": "Für X-Mirror konvertieren",
@@ -125,14 +371,70 @@ TEXTS = {
         "error_no_mapping": "Keine gespeicherte Konvertierungszuordnung für diese Armature gefunden.",
         "error_revert": "Fehler beim Zurücksetzen: {err}",
         "info_reverted": "Zurücksetzen abgeschlossen. Bones: {bones}. Vertex-Gruppen geändert: {vgs}.",
+        "info_converted_incremental": "{bones} neue Bones konvertiert ({total} insgesamt zugeordnet). Vertex-Gruppen geändert: {vgs}.",
+        "batch_convert_button": "Stapelkonvertierung...",
+        "batch_revert_button": "Stapel-Zurücksetzen...",
+        "error_no_armatures": "Im gewählten Bereich wurden keine Armatures gefunden.",
+        "info_batch_item": "{name}: Bones {bones}, Vertex-Gruppen geändert {vgs}.",
+        "info_batch_skipped": "{name}: übersprungen ({reason})",
+        "error_batch_item": "{name}: fehlgeschlagen ({err})",
+        "info_batch_summary": "Stapel abgeschlossen: {done}/{total} Armatures. Bones: {bones}. Vertex-Gruppen geändert: {vgs}.",
+        "symmetrize_button": "Gewichte symmetrisieren...",
+        "error_weight_target": "Wählen Sie eine konvertierte Armature oder ein von ihr verformtes Mesh aus.",
+        "error_weights": "Fehler beim Bearbeiten der Gewichte: {err}",
+        "info_symmetrized": "{meshes} Meshes symmetrisiert. Gewichte geändert: {weights}. Vertices ohne Spiegelpartner: {unmatched}.",
+        "validate_button": "Symmetrie prüfen",
+        "symmetry_ok": "Symmetrie in Ordnung: {pairs} Bone-Paare, {centers} mittlere Bones.",
+        "symmetry_issues": "Symmetrieprobleme: {missing} ohne Partner, {asymmetric} Paare nicht gespiegelt, {off_center} mittlere Bones außerhalb von X=0.",
+        "symmetry_missing": "{name}: kein Spiegelpartner",
+        "symmetry_pair": "{left} / {right}: Abweichung {error:.4f}",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "Symmetrie nach Convert prüfen",
+        "prune_button": "Leere Gruppen entfernen",
+        "info_pruned_mesh": "{name}: {count} leere Gruppen ({groups})",
+        "info_pruned": "{groups} leere Vertex-Gruppen aus {meshes} Meshes entfernt.",
+        "info_empty_found": "{groups} leere Vertex-Gruppen auf {meshes} Meshes gefunden.",
+        "pref_prune": "Leere Gruppen bei Convert entfernen",
+        "pref_keep_groups": "Immer behalten",
+        "status_original": "Nicht konvertiert: {pending} Bones zu konvertieren",
+        "status_partial": "Teilweise konvertiert: {converted} Bones, {pending} neue zu konvertieren",
+        "status_converted": "Konvertiert: {converted} Bones",
+        "status_none": "Keine Bones zu konvertieren (andere Namenskonvention)",
+        "status_meshes": "Verformte Meshes: {meshes}",
+        "status_collisions": "Ausstehende Namenskonflikte: {count}",
+        "status_error": "Status nicht verfügbar: {err}",
+        "export_button": "Mit Sims 4 Namen exportieren...",
+        "error_export": "Export fehlgeschlagen, X-Mirror-Namen beibehalten: {err}",
+        "info_exported": "{path} mit Sims 4 Namen gespeichert ({count} Armatures). Diese Datei behält ihre X-Mirror-Namen.",
+        "limit_button": "Auf 4 Einflüsse begrenzen",
+        "info_limited": "{meshes} Meshes: {limited} Vertices auf {max} Einflüsse gekürzt, {normalized} normalisiert ({weights} Gewichte geändert).",
+        "warn_unweighted": "{count} Vertices haben keine Bone-Gewichte.",
+        "pref_limit_export": "Einflüsse beim Export begrenzen",
+        "info_layouts": "Vertex-Gruppen: {meshes} Meshes mit {layouts} unterschiedlichen Anordnungen.",
+        "transfer_button": "Gewichte von Referenz übertragen",
+        "error_transfer_reference": "Machen Sie das Referenz-Mesh aktiv und wählen Sie die Ziel-Meshes aus.",
+        "info_transferred": "Gewichte auf {meshes} Meshes übertragen ({vertices} Vertices, {missed} außer Reichweite).",
+        "warn_transfer_skipped": "{count} Meshes übersprungen: nicht von einer konvertierten Armature verformt.",
+        "info_batch_layouts": "Vertex-Gruppen: {meshes} Meshes auf {armatures} Armatures, {layouts} Anordnungen geplant (je Armature unterschiedlich).",
+        "pref_rule_set": "Namensregeln",
+        "pref_modal": "Fortschritt anzeigen (Esc bricht ab)",
+        "pref_rig_cache": "Bekannte Rigs merken",
+        "info_modal_cancelled": "Abgebrochen. Alle bisherigen Umbenennungen wurden rückgängig gemacht.",
+        "pref_profile_timings": "Zeiten pro Phase melden",
+        "pref_profile_cprofile": "cProfile aufzeichnen",
+        "pref_profile_path": "Profilausgabe",
+        "info_timings": "Zeiten {summary}",
+        "error_profile_dump": "Profil konnte nicht geschrieben werden: {err}",
         "pref_label": "S4 Rename Einstellungen",
         "pref_language": "Sprache",
         "lang_auto": "Auto (Blender Sprache verwenden)",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # Chinese (Simplified)
-    "zh": {
+    }
+
+# Chinese (Simplified)
+def _texts_zh():
+    return {
         "panel_title": "Sims4 命名",
         "active_required": "需要选中骨架（Armature）",
         "convert_button": "转换为 X 镜像 名称",
@@ -148,14 +450,70 @@ TEXTS = {
         "error_no_mapping": "在此骨架上未找到保存的转换映射。",
         "error_revert": "恢复时出错：{err}",
         "info_reverted": "恢复完成。骨骼：{bones}。顶点组更改：{vgs}。",
+        "info_converted_incremental": "已转换 {bones} 个新骨骼（共映射 {total} 个）。顶点组更改：{vgs}。",
+        "batch_convert_button": "批量转换...",
+        "batch_revert_button": "批量恢复...",
+        "error_no_armatures": "所选范围内未找到骨架。",
+        "info_batch_item": "{name}：骨骼 {bones}，顶点组更改 {vgs}。",
+        "info_batch_skipped": "{name}：已跳过（{reason}）",
+        "error_batch_item": "{name}：失败（{err}）",
+        "info_batch_summary": "批量完成：{done}/{total} 个骨架。骨骼：{bones}。顶点组更改：{vgs}。",
+        "symmetrize_button": "对称权重...",
+        "error_weight_target": "请选择已转换的骨架或由其变形的网格。",
+        "error_weights": "编辑权重时出错：{err}",
+        "info_symmetrized": "已对称 {meshes} 个网格。权重更改：{weights}。无镜像对应的顶点：{unmatched}。",
+        "validate_button": "检查对称",
+        "symmetry_ok": "对称正常：{pairs} 对骨骼，{centers} 个中心骨骼。",
+        "symmetry_issues": "对称问题：{missing} 个无对应，{asymmetric} 对未镜像，{off_center} 个中心骨骼偏离 X=0。",
+        "symmetry_missing": "{name}：无镜像对应",
+        "symmetry_pair": "{left} / {right}：偏差 {error:.4f}",
+        "symmetry_center": "{name}：X = {x:.4f}",
+        "pref_validate_symmetry": "转换后检查对称",
+        "prune_button": "移除空顶点组",
+        "info_pruned_mesh": "{name}：{count} 个空顶点组（{groups}）",
+        "info_pruned": "已从 {meshes} 个网格移除 {groups} 个空顶点组。",
+        "info_empty_found": "在 {meshes} 个网格上找到 {groups} 个空顶点组。",
+        "pref_prune": "转换时移除空顶点组",
+        "pref_keep_groups": "始终保留",
+        "status_original": "未转换：{pending} 个骨骼待转换",
+        "status_partial": "部分转换：{converted} 个骨骼，{pending} 个新骨骼待转换",
+        "status_converted": "已转换：{converted} 个骨骼",
+        "status_none": "没有可转换的骨骼（命名不同）",
+        "status_meshes": "变形网格：{meshes}",
+        "status_collisions": "待解决的名称冲突：{count}",
+        "status_error": "状态不可用：{err}",
+        "export_button": "以 Sims 4 名称导出...",
+        "error_export": "导出失败，已保留 X 镜像名称：{err}",
+        "info_exported": "已以 Sims 4 名称保存 {path}（{count} 个骨架）。此文件保留其 X 镜像名称。",
+        "limit_button": "限制为 4 个影响",
+        "info_limited": "{meshes} 个网格：{limited} 个顶点削减为 {max} 个影响，{normalized} 个已归一化（{weights} 个权重更改）。",
+        "warn_unweighted": "{count} 个顶点没有骨骼权重。",
+        "pref_limit_export": "导出时限制影响数",
+        "info_layouts": "顶点组：{meshes} 个网格共用 {layouts} 种不同布局。",
+        "transfer_button": "从参考网格传递权重",
+        "error_transfer_reference": "请将参考网格设为活动对象，并选择目标网格。",
+        "info_transferred": "已将权重传递到 {meshes} 个网格（{vertices} 个顶点，{missed} 个超出范围）。",
+        "warn_transfer_skipped": "已跳过 {count} 个网格：未由已转换的骨架变形。",
+        "info_batch_layouts": "顶点组：{armatures} 个骨架上的 {meshes} 个网格，计划了 {layouts} 种布局（按骨架分别统计）。",
+        "pref_rule_set": "命名规则",
+        "pref_modal": "显示进度（Esc 取消）",
+        "pref_rig_cache": "缓存已知骨架",
+        "info_modal_cancelled": "已取消。已完成的重命名均已撤销。",
+        "pref_profile_timings": "报告各阶段耗时",
+        "pref_profile_cprofile": "记录 cProfile",
+        "pref_profile_path": "性能分析输出",
+        "info_timings": "耗时 {summary}",
+        "error_profile_dump": "无法写入性能分析文件：{err}",
         "pref_label": "S4 Rename 设置",
         "pref_language": "语言",
         "lang_auto": "自动（使用 Blender 语言）",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # Portuguese
-    "pt": {
+    }
+
+# Portuguese
+def _texts_pt():
+    return {
         "panel_title": "Nomenclatura Sims4",
         "active_required": "Armature ativo necessário",
         "convert_button": "Converter para nomes X-Mirror",
@@ -171,14 +529,70 @@ TEXTS = {
         "error_no_mapping": "Nenhum mapeamento de conversão salvo encontrado neste armature.",
         "error_revert": "Erro durante a reversão: {err}",
         "info_reverted": "Reversão concluída. Ossos: {bones}. Grupos de vértices alterados: {vgs}.",
+        "info_converted_incremental": "Convertidos {bones} ossos novos ({total} mapeados no total). Grupos de vértices alterados: {vgs}.",
+        "batch_convert_button": "Converter em lote...",
+        "batch_revert_button": "Reverter em lote...",
+        "error_no_armatures": "Nenhum armature encontrado no escopo escolhido.",
+        "info_batch_item": "{name}: ossos {bones}, grupos de vértices alterados {vgs}.",
+        "info_batch_skipped": "{name}: ignorado ({reason})",
+        "error_batch_item": "{name}: falhou ({err})",
+        "info_batch_summary": "Lote concluído: {done}/{total} armatures. Ossos: {bones}. Grupos de vértices alterados: {vgs}.",
+        "symmetrize_button": "Simetrizar pesos...",
+        "error_weight_target": "Selecione um armature convertido ou uma malha deformada por ele.",
+        "error_weights": "Erro ao editar os pesos: {err}",
+        "info_symmetrized": "Simetrizadas {meshes} malhas. Pesos alterados: {weights}. Vértices sem par espelhado: {unmatched}.",
+        "validate_button": "Verificar simetria",
+        "symmetry_ok": "Simetria correta: {pairs} pares de ossos, {centers} ossos centrais.",
+        "symmetry_issues": "Problemas de simetria: {missing} sem par, {asymmetric} pares não espelhados, {off_center} ossos centrais fora de X=0.",
+        "symmetry_missing": "{name}: sem par espelhado",
+        "symmetry_pair": "{left} / {right}: desvio de {error:.4f}",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "Verificar simetria após converter",
+        "prune_button": "Remover grupos vazios",
+        "info_pruned_mesh": "{name}: {count} grupos vazios ({groups})",
+        "info_pruned": "Removidos {groups} grupos de vértices vazios de {meshes} malhas.",
+        "info_empty_found": "Encontrados {groups} grupos de vértices vazios em {meshes} malhas.",
+        "pref_prune": "Remover grupos vazios ao converter",
+        "pref_keep_groups": "Manter sempre",
+        "status_original": "Não convertido: {pending} ossos a converter",
+        "status_partial": "Parcialmente convertido: {converted} ossos, {pending} novos a converter",
+        "status_converted": "Convertido: {converted} ossos",
+        "status_none": "Nenhum osso a converter (nome diferente)",
+        "status_meshes": "Malhas deformadas: {meshes}",
+        "status_collisions": "Colisões de nomes pendentes: {count}",
+        "status_error": "Status indisponível: {err}",
+        "export_button": "Exportar com nomes do Sims 4...",
+        "error_export": "A exportação falhou, nomes x-mirror mantidos: {err}",
+        "info_exported": "{path} salvo com nomes do Sims 4 ({count} armatures). Este arquivo mantém seus nomes x-mirror.",
+        "limit_button": "Limitar a 4 influências",
+        "info_limited": "{meshes} malhas: {limited} vértices reduzidos a {max} influências, {normalized} normalizados ({weights} pesos alterados).",
+        "warn_unweighted": "{count} vértices não têm pesos de ossos.",
+        "pref_limit_export": "Limitar influências ao exportar",
+        "info_layouts": "Grupos de vértices: {meshes} malhas compartilhando {layouts} layouts distintos.",
+        "transfer_button": "Transferir pesos da referência",
+        "error_transfer_reference": "Torne a malha de referência ativa e selecione as malhas de destino.",
+        "info_transferred": "Pesos transferidos para {meshes} malhas ({vertices} vértices, {missed} fora de alcance).",
+        "warn_transfer_skipped": "{count} malhas ignoradas: não deformadas por um armature convertido.",
+        "info_batch_layouts": "Grupos de vértices: {meshes} malhas em {armatures} armatures, {layouts} layouts planejados (distintos por armature).",
+        "pref_rule_set": "Regras de nomes",
+        "pref_modal": "Mostrar progresso (Esc cancela)",
+        "pref_rig_cache": "Lembrar rigs conhecidos",
+        "info_modal_cancelled": "Cancelado. Todas as renomeações feitas até agora foram desfeitas.",
+        "pref_profile_timings": "Relatar tempos por fase",
+        "pref_profile_cprofile": "Capturar cProfile",
+        "pref_profile_path": "Saída do perfil",
+        "info_timings": "Tempos {summary}",
+        "error_profile_dump": "Não foi possível gravar o perfil: {err}",
         "pref_label": "Preferências S4 Rename",
         "pref_language": "Idioma",
         "lang_auto": "Auto (usar idioma do Blender)",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # Russian
-    "ru": {
+    }
+
+# Russian
+def _texts_ru():
+    return {
         "panel_title": "Именование Sims4",
         "active_required": "Требуется активная арматура",
         "convert_button": "Преобразовать для X-Mirror",
@@ -194,14 +608,70 @@ TEXTS = {
         "error_no_mapping": "Сохраненная карта преобразования не найдена для этой арматуры.",
         "error_revert": "Ошибка при восстановлении: {err}",
         "info_reverted": "Восстановление завершено. Костей: {bones}. Изменено групп вершин: {vgs}.",
+        "info_converted_incremental": "Преобразовано новых костей: {bones} (всего сопоставлено {total}). Изменено групп вершин: {vgs}.",
+        "batch_convert_button": "Пакетное преобразование...",
+        "batch_revert_button": "Пакетное восстановление...",
+        "error_no_armatures": "В выбранной области не найдено арматур.",
+        "info_batch_item": "{name}: костей {bones}, изменено групп вершин {vgs}.",
+        "info_batch_skipped": "{name}: пропущено ({reason})",
+        "error_batch_item": "{name}: ошибка ({err})",
+        "info_batch_summary": "Пакет завершён: {done}/{total} арматур. Костей: {bones}. Изменено групп вершин: {vgs}.",
+        "symmetrize_button": "Симметризовать веса...",
+        "error_weight_target": "Выберите преобразованную арматуру или меш, который она деформирует.",
+        "error_weights": "Ошибка при изменении весов: {err}",
+        "info_symmetrized": "Симметризовано мешей: {meshes}. Изменено весов: {weights}. Вершин без зеркальной пары: {unmatched}.",
+        "validate_button": "Проверить симметрию",
+        "symmetry_ok": "Симметрия в порядке: пар костей {pairs}, центральных костей {centers}.",
+        "symmetry_issues": "Проблемы симметрии: без пары {missing}, не отражённых пар {asymmetric}, центральных костей вне X=0 {off_center}.",
+        "symmetry_missing": "{name}: нет зеркальной пары",
+        "symmetry_pair": "{left} / {right}: отклонение {error:.4f}",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "Проверять симметрию после преобразования",
+        "prune_button": "Удалить пустые группы",
+        "info_pruned_mesh": "{name}: пустых групп {count} ({groups})",
+        "info_pruned": "Удалено пустых групп вершин: {groups} из мешей: {meshes}.",
+        "info_empty_found": "Найдено пустых групп вершин: {groups} на мешах: {meshes}.",
+        "pref_prune": "Удалять пустые группы при преобразовании",
+        "pref_keep_groups": "Всегда сохранять",
+        "status_original": "Не преобразовано: костей к преобразованию {pending}",
+        "status_partial": "Частично преобразовано: костей {converted}, новых к преобразованию {pending}",
+        "status_converted": "Преобразовано: костей {converted}",
+        "status_none": "Нет костей для преобразования (другое именование)",
+        "status_meshes": "Деформируемые меши: {meshes}",
+        "status_collisions": "Ожидающие конфликты имён: {count}",
+        "status_error": "Состояние недоступно: {err}",
+        "export_button": "Экспорт с именами Sims 4...",
+        "error_export": "Экспорт не удался, имена X-Mirror сохранены: {err}",
+        "info_exported": "Сохранено {path} с именами Sims 4 (арматур: {count}). Этот файл сохраняет имена X-Mirror.",
+        "limit_button": "Ограничить до 4 влияний",
+        "info_limited": "Мешей {meshes}: вершин сокращено до {max} влияний {limited}, нормализовано {normalized} (изменено весов {weights}).",
+        "warn_unweighted": "Вершин без весов костей: {count}.",
+        "pref_limit_export": "Ограничивать влияния при экспорте",
+        "info_layouts": "Группы вершин: мешей {meshes}, различных раскладок {layouts}.",
+        "transfer_button": "Перенести веса с эталона",
+        "error_transfer_reference": "Сделайте эталонный меш активным и выберите целевые меши.",
+        "info_transferred": "Веса перенесены на мешей: {meshes} (вершин {vertices}, вне досягаемости {missed}).",
+        "warn_transfer_skipped": "Пропущено мешей: {count} — их не деформирует преобразованная арматура.",
+        "info_batch_layouts": "Группы вершин: мешей {meshes} на арматурах: {armatures}, запланировано раскладок {layouts} (различных для каждой арматуры).",
+        "pref_rule_set": "Правила именования",
+        "pref_modal": "Показывать прогресс (Esc отменяет)",
+        "pref_rig_cache": "Запоминать известные риги",
+        "info_modal_cancelled": "Отменено. Все выполненные переименования отменены.",
+        "pref_profile_timings": "Сообщать время по фазам",
+        "pref_profile_cprofile": "Записывать cProfile",
+        "pref_profile_path": "Файл профиля",
+        "info_timings": "Время {summary}",
+        "error_profile_dump": "Не удалось записать профиль: {err}",
         "pref_label": "Настройки S4 Rename",
         "pref_language": "Язык",
         "lang_auto": "Авто (использовать язык Blender)",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # Korean
-    "ko": {
+    }
+
+# Korean
+def _texts_ko():
+    return {
         "panel_title": "Sims4 명명",
         "active_required": "활성 아마추어(Armature)가 필요합니다",
         "convert_button": "X-미러용으로 변환",
@@ -217,14 +687,70 @@ TEXTS = {
         "error_no_mapping": "이 아마추어에 저장된 변환 맵이 없습니다.",
         "error_revert": "복원 중 오류: {err}",
         "info_reverted": "복원 완료. 본 수: {bones}. 버텍스 그룹 변경: {vgs}.",
+        "info_converted_incremental": "새 본 {bones} 개를 변환했습니다(총 {total} 개 매핑). 버텍스 그룹 변경: {vgs} 개.",
+        "batch_convert_button": "일괄 변환...",
+        "batch_revert_button": "일괄 복원...",
+        "error_no_armatures": "선택한 범위에서 아마추어를 찾을 수 없습니다.",
+        "info_batch_item": "{name}: 본 {bones}, 버텍스 그룹 변경 {vgs}.",
+        "info_batch_skipped": "{name}: 건너뜀({reason})",
+        "error_batch_item": "{name}: 실패({err})",
+        "info_batch_summary": "일괄 처리 완료: 아마추어 {done}/{total}. 본: {bones}. 버텍스 그룹 변경: {vgs}.",
+        "symmetrize_button": "웨이트 대칭화...",
+        "error_weight_target": "변환된 아마추어나 그 아마추어가 변형하는 메시를 선택하세요.",
+        "error_weights": "웨이트 편집 중 오류: {err}",
+        "info_symmetrized": "메시 {meshes} 개를 대칭화했습니다. 웨이트 변경: {weights}. 미러 짝이 없는 버텍스: {unmatched}.",
+        "validate_button": "대칭 검사",
+        "symmetry_ok": "대칭 정상: 본 쌍 {pairs} 개, 중앙 본 {centers} 개.",
+        "symmetry_issues": "대칭 문제: 짝 없음 {missing} 개, 미러되지 않은 쌍 {asymmetric} 개, X=0에서 벗어난 중앙 본 {off_center} 개.",
+        "symmetry_missing": "{name}: 미러 짝 없음",
+        "symmetry_pair": "{left} / {right}: 오차 {error:.4f}",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "변환 후 대칭 검사",
+        "prune_button": "빈 그룹 제거",
+        "info_pruned_mesh": "{name}: 빈 그룹 {count} 개({groups})",
+        "info_pruned": "메시 {meshes} 개에서 빈 버텍스 그룹 {groups} 개를 제거했습니다.",
+        "info_empty_found": "메시 {meshes} 개에서 빈 버텍스 그룹 {groups} 개를 찾았습니다.",
+        "pref_prune": "변환 시 빈 그룹 제거",
+        "pref_keep_groups": "항상 유지",
+        "status_original": "변환 안 됨: 변환할 본 {pending} 개",
+        "status_partial": "일부 변환됨: 본 {converted} 개, 새로 변환할 본 {pending} 개",
+        "status_converted": "변환됨: 본 {converted} 개",
+        "status_none": "변환할 본 없음(명명 규칙이 다름)",
+        "status_meshes": "변형되는 메시: {meshes}",
+        "status_collisions": "대기 중인 이름 충돌: {count}",
+        "status_error": "상태를 확인할 수 없음: {err}",
+        "export_button": "Sims 4 이름으로 내보내기...",
+        "error_export": "내보내기 실패, X-미러 이름 유지: {err}",
+        "info_exported": "{path}을(를) Sims 4 이름으로 저장했습니다(아마추어 {count} 개). 이 파일은 X-미러 이름을 유지합니다.",
+        "limit_button": "영향 4개로 제한",
+        "info_limited": "메시 {meshes} 개: 버텍스 {limited} 개를 영향 {max} 개로 줄이고 {normalized} 개를 정규화했습니다(웨이트 {weights} 개 변경).",
+        "warn_unweighted": "본 웨이트가 없는 버텍스: {count} 개.",
+        "pref_limit_export": "내보낼 때 영향 수 제한",
+        "info_layouts": "버텍스 그룹: 메시 {meshes} 개가 서로 다른 레이아웃 {layouts} 개를 공유합니다.",
+        "transfer_button": "참조에서 웨이트 전송",
+        "error_transfer_reference": "참조 메시를 활성화하고 대상 메시를 선택하세요.",
+        "info_transferred": "메시 {meshes} 개에 웨이트를 전송했습니다(버텍스 {vertices} 개, 범위 밖 {missed} 개).",
+        "warn_transfer_skipped": "메시 {count} 개 건너뜀: 변환된 아마추어가 변형하지 않습니다.",
+        "info_batch_layouts": "버텍스 그룹: 아마추어 {armatures} 개의 메시 {meshes} 개, 계획된 레이아웃 {layouts} 개(아마추어별로 집계).",
+        "pref_rule_set": "명명 규칙",
+        "pref_modal": "진행 상황 표시(Esc로 취소)",
+        "pref_rig_cache": "알려진 리그 캐시",
+        "info_modal_cancelled": "취소되었습니다. 지금까지의 이름 변경은 모두 되돌렸습니다.",
+        "pref_profile_timings": "단계별 시간 보고",
+        "pref_profile_cprofile": "cProfile 기록",
+        "pref_profile_path": "프로파일 출력",
+        "info_timings": "시간 {summary}",
+        "error_profile_dump": "프로파일을 쓸 수 없습니다: {err}",
         "pref_label": "S4 Rename 설정",
         "pref_language": "언어",
         "lang_auto": "자동(Blender 언어 사용)",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
-    # Italian
-    "it": {
+    }
+
+# Italian
+def _texts_it():
+    return {
         "panel_title": "Denominazione Sims4",
         "active_required": "Armatura attiva richiesta",
         "convert_button": "Converti per X-Mirror",
@@ -240,12 +766,102 @@ TEXTS = {
         "error_no_mapping": "Nessuna mappatura di conversione salvata trovata in questa armatura.",
         "error_revert": "Errore durante il ripristino: {err}",
         "info_reverted": "Ripristino completato. Ossa: {bones}. Gruppi di vertici modificati: {vgs}.",
+        "info_converted_incremental": "Convertite {bones} nuove ossa ({total} mappate in totale). Gruppi di vertici modificati: {vgs}.",
+        "batch_convert_button": "Conversione in blocco...",
+        "batch_revert_button": "Ripristino in blocco...",
+        "error_no_armatures": "Nessuna armatura trovata nell'ambito scelto.",
+        "info_batch_item": "{name}: ossa {bones}, gruppi di vertici modificati {vgs}.",
+        "info_batch_skipped": "{name}: saltata ({reason})",
+        "error_batch_item": "{name}: non riuscita ({err})",
+        "info_batch_summary": "Blocco completato: {done}/{total} armature. Ossa: {bones}. Gruppi di vertici modificati: {vgs}.",
+        "symmetrize_button": "Simmetrizza pesi...",
+        "error_weight_target": "Seleziona un'armatura convertita o una mesh deformata da essa.",
+        "error_weights": "Errore durante la modifica dei pesi: {err}",
+        "info_symmetrized": "Simmetrizzate {meshes} mesh. Pesi modificati: {weights}. Vertici senza partner speculare: {unmatched}.",
+        "validate_button": "Controlla simmetria",
+        "symmetry_ok": "Simmetria corretta: {pairs} coppie di ossa, {centers} ossa centrali.",
+        "symmetry_issues": "Problemi di simmetria: {missing} senza partner, {asymmetric} coppie non speculari, {off_center} ossa centrali fuori da X=0.",
+        "symmetry_missing": "{name}: nessun partner speculare",
+        "symmetry_pair": "{left} / {right}: scarto di {error:.4f}",
+        "symmetry_center": "{name}: X = {x:.4f}",
+        "pref_validate_symmetry": "Controlla simmetria dopo Convert",
+        "prune_button": "Rimuovi gruppi vuoti",
+        "info_pruned_mesh": "{name}: {count} gruppi vuoti ({groups})",
+        "info_pruned": "Rimossi {groups} gruppi di vertici vuoti da {meshes} mesh.",
+        "info_empty_found": "Trovati {groups} gruppi di vertici vuoti su {meshes} mesh.",
+        "pref_prune": "Rimuovi gruppi vuoti durante Convert",
+        "pref_keep_groups": "Mantieni sempre",
+        "status_original": "Non convertita: {pending} ossa da convertire",
+        "status_partial": "Convertita in parte: {converted} ossa, {pending} nuove da convertire",
+        "status_converted": "Convertita: {converted} ossa",
+        "status_none": "Nessun osso da convertire (nomenclatura diversa)",
+        "status_meshes": "Mesh deformate: {meshes}",
+        "status_collisions": "Conflitti di nomi in sospeso: {count}",
+        "status_error": "Stato non disponibile: {err}",
+        "export_button": "Esporta con nomi Sims 4...",
+        "error_export": "Esportazione non riuscita, nomi x-mirror mantenuti: {err}",
+        "info_exported": "Salvato {path} con nomi Sims 4 ({count} armature). Questo file mantiene i suoi nomi x-mirror.",
+        "limit_button": "Limita a 4 influenze",
+        "info_limited": "{meshes} mesh: {limited} vertici ridotti a {max} influenze, {normalized} normalizzati ({weights} pesi modificati).",
+        "warn_unweighted": "{count} vertici non hanno pesi delle ossa.",
+        "pref_limit_export": "Limita influenze all'esportazione",
+        "info_layouts": "Gruppi di vertici: {meshes} mesh che condividono {layouts} disposizioni distinte.",
+        "transfer_button": "Trasferisci pesi da riferimento",
+        "error_transfer_reference": "Rendi attiva la mesh di riferimento e seleziona le mesh di destinazione.",
+        "info_transferred": "Pesi trasferiti su {meshes} mesh ({vertices} vertici, {missed} fuori portata).",
+        "warn_transfer_skipped": "{count} mesh saltate: non deformate da un'armatura convertita.",
+        "info_batch_layouts": "Gruppi di vertici: {meshes} mesh su {armatures} armature, {layouts} disposizioni pianificate (distinte per armatura).",
+        "pref_rule_set": "Regole di denominazione",
+        "pref_modal": "Mostra avanzamento (Esc annulla)",
+        "pref_rig_cache": "Memorizza rig noti",
+        "info_modal_cancelled": "Annullato. Tutte le rinominazioni eseguite finora sono state annullate.",
+        "pref_profile_timings": "Riporta tempi per fase",
+        "pref_profile_cprofile": "Registra cProfile",
+        "pref_profile_path": "Output del profilo",
+        "info_timings": "Tempi {summary}",
+        "error_profile_dump": "Impossibile scrivere il profilo: {err}",
         "pref_label": "Preferenze S4 Rename",
         "pref_language": "Lingua",
         "lang_auto": "Auto (usa lingua di Blender)",
         "lang_en": "English",
         "lang_ja": "日本語",
-    },
+    }
+
+_TEXT_LOADERS = {
+    "en": _texts_en,
+    "ja": _texts_ja,
+    "es": _texts_es,
+    "fr": _texts_fr,
+    "de": _texts_de,
+    "zh": _texts_zh,
+    "pt": _texts_pt,
+    "ru": _texts_ru,
+    "ko": _texts_ko,
+    "it": _texts_it,
+}
+
+# Loaded tables, filled on demand by get_texts()
+TEXTS = {}
+
+def get_texts(lang):
+    table = TEXTS.get(lang)
+    if table is None:
+        loader = _TEXT_LOADERS.get(lang, _texts_en)
+        table = TEXTS[lang] = loader()
+    return table
+
+# Addon preference value -> TEXTS key
+_LANG_PREF_CODES = {
+    "EN": "en",
+    "JA": "ja",
+    "ES": "es",
+    "FR": "fr",
+    "DE": "de",
+    "ZH": "zh",
+    "PT": "pt",
+    "RU": "ru",
+    "KO": "ko",
+    "IT": "it",
 }
 
 def get_addon_language_setting():
@@ -262,325 +878,3160 @@ def get_addon_language_setting():
         lang_choice = "AUTO"
 
     # Direct mapping from preference selection to TEXTS keys
-    if lang_choice == "EN":
-        return "en"
-    if lang_choice == "JA":
-        return "ja"
-    if lang_choice == "ES":
-        return "es"
-    if lang_choice == "FR":
-        return "fr"
-    if lang_choice == "DE":
-        return "de"
-    if lang_choice == "ZH":
-        return "zh"
-    if lang_choice == "PT":
-        return "pt"
-    if lang_choice == "RU":
-        return "ru"
-    if lang_choice == "KO":
-        return "ko"
-    if lang_choice == "IT":
-        return "it"
-
-    # AUTO -> inspect Blender language setting
+    lang = _LANG_PREF_CODES.get(lang_choice)
+    if lang:
+        return lang
+
+    # AUTO -> inspect Blender language setting ('ja_JP', 'zh_HANS', ...)
     try:
         bl_lang = bpy.context.preferences.view.language
-        if bl_lang:
-            bl = bl_lang.lower()
-            if bl.startswith("ja"):
-                return "ja"
-            if bl.startswith("es"):
-                return "es"
-            if bl.startswith("fr"):
-                return "fr"
-            if bl.startswith("de"):
-                return "de"
-            if bl.startswith("zh"):
-                return "zh"
-            if bl.startswith("pt"):
-                return "pt"
-            if bl.startswith("ru"):
-                return "ru"
-            if bl.startswith("ko"):
-                return "ko"
-            if bl.startswith("it"):
-                return "it"
+        if bl_lang and bl_lang != "DEFAULT":
+            lang = bl_lang[:2].lower()
+            if lang in _TEXT_LOADERS:
+                return lang
     except Exception:
         pass
     return "en"
 
+# Active language table merged over English, resolved once and reused by t()
+# until the addon preference or Blender's UI language changes.
+_ACTIVE_TEXTS = None
+
+def invalidate_language_cache(*args):
+    global _ACTIVE_TEXTS
+    _ACTIVE_TEXTS = None
+
+def _active_texts():
+    global _ACTIVE_TEXTS
+    if _ACTIVE_TEXTS is None:
+        lang = get_addon_language_setting()
+        table = get_texts("en")
+        if lang != "en":
+            table = {**table, **get_texts(lang)}
+        _ACTIVE_TEXTS = table
+    return _ACTIVE_TEXTS
+
 def t(key):
-    lang = get_addon_language_setting()
-    return TEXTS.get(lang, TEXTS["en"]).get(key, TEXTS["en"].get(key, key))
+    return _active_texts().get(key, key)
 
-def normalize_name_remove_b_and_unders(name: str) -> str:
-    if name.startswith("b__"):
-        name = name[3:]
-    name = name.strip("_")
-    return name
+_MSGBUS_OWNER = object()
 
-def detect_side_and_base(name: str):
-    # If already contains .L or .R suffix
-    m = re.match(r'^(.*)\.(L|R)$', name)
-    if m:
-        base = m.group(1)
-        return base, m.group(2)
+def subscribe_language_changes():
+    bpy.msgbus.clear_by_owner(_MSGBUS_OWNER)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.PreferencesView, "language"),
+        owner=_MSGBUS_OWNER,
+        args=(),
+        notify=invalidate_language_cache,
+    )
 
-    # Leading L_ or R_
-    m = re.match(r'^([LR])_(.*)$', name)
-    if m:
-        return m.group(2).strip("_"), m.group(1)
-
-    # Middle _L_ or _R_
-    m = re.search(r'_(L|R)_', name)
-    if m:
-        side = m.group(1)
-        base = name.replace("_" + side + "_", "_")
-        base = base.strip("_")
-        return base, side
+class RuleSet:
+    """
+    Declarative L/R naming convention. side_rules is an ordered list of
+    (position, {token: side}, strip_base) with position 'suffix', 'prefix' or
+    'infix'; the rules compile into one anchored alternation, so each name is
+    matched once and the first rule (in list order) that fits wins.
+    reverse_sides/reverse_center are format strings producing the source-style
+    name back from an x-mirror name.
+    """
+
+    def __init__(self, key, label, description, side_rules, strip_prefixes=(), strip_chars="_", infix_join="_", reverse_sides=None, reverse_center="{base}"):
+        self.key = key
+        self.label = label
+        self.description = description
+        self.side_rules = side_rules
+        self.strip_prefixes = strip_prefixes
+        self.strip_chars = strip_chars
+        self.infix_join = infix_join
+        self.reverse_sides = reverse_sides or {"L": "{base}.L", "R": "{base}.R"}
+        self.reverse_center = reverse_center
+        self._matcher = self._compile()
+        # Changes whenever the rules do, so cached mappings from older rules never match
+        self.signature = hashlib.blake2b(
+            repr((side_rules, strip_prefixes, strip_chars, infix_join)).encode("utf-8"), digest_size=8
+        ).hexdigest()
+
+    def _compile(self):
+        parts = []
+        for i, (position, tokens, _strip_base) in enumerate(self.side_rules):
+            alt = "|".join(re.escape(token) for token in tokens)
+            if position == "suffix":
+                body = f"(?P<b{i}>.*)(?P<s{i}>{alt})"
+            elif position == "prefix":
+                body = f"(?P<s{i}>{alt})(?P<b{i}>.*)"
+            elif position == "infix":
+                body = f".*?(?P<s{i}>{alt}).*"
+            else:
+                raise ValueError(f"Unknown rule position '{position}' in rule set '{self.key}'")
+            parts.append(f"(?P<r{i}>{body})")
+        return re.compile("|".join(parts), re.DOTALL)
+
+    def normalize(self, name):
+        for prefix in self.strip_prefixes:
+            if name.startswith(prefix):
+                name = name[len(prefix):]
+                break
+        return name.strip(self.strip_chars)
+
+    def detect(self, name):
+        m = self._matcher.fullmatch(name)
+        if m is None:
+            return name.strip(self.strip_chars), None
+        i = int(m.lastgroup[1:])
+        position, tokens, strip_base = self.side_rules[i]
+        token = m.group(f"s{i}")
+        if position == "infix":
+            base = name.replace(token, self.infix_join)
+        else:
+            base = m.group(f"b{i}")
+        if strip_base:
+            base = base.strip(self.strip_chars)
+        return base, tokens[token]
+
+    def convert(self, name):
+        base, side = self.detect(self.normalize(name))
+        if side is None:
+            return base
+        return f"{base}.{side}"
 
+    def reverse(self, xmirror_name):
+        if xmirror_name.endswith((".L", ".R")):
+            return self.reverse_sides[xmirror_name[-1]].format(base=xmirror_name[:-2])
+        return self.reverse_center.format(base=xmirror_name)
+
+_SIMS_SIDE_RULES = [
+    # Already .L / .R
+    ("suffix", {".L": "L", ".R": "R"}, False),
+    # Leading L_ or R_
+    ("prefix", {"L_": "L", "R_": "R"}, True),
+    # Middle _L_ or _R_ (the earliest occurrence decides the side)
+    ("infix", {"_L_": "L", "_R_": "R"}, True),
     # Trailing _L or _R
-    m = re.search(r'_(L|R)$', name)
-    if m:
-        side = m.group(1)
-        base = name[: - (len(m.group(0)))]
-        base = base.strip("_")
-        return base, side
+    ("suffix", {"_L": "L", "_R": "R"}, True),
+]
+
+RULE_SETS = {
+    "SIMS4": RuleSet(
+        "SIMS4", "Sims 4", "b__L_Name__ style bones (Sims 4)",
+        _SIMS_SIDE_RULES,
+        strip_prefixes=("b__",),
+        reverse_sides={"L": "b__L_{base}__", "R": "b__R_{base}__"},
+        reverse_center="b__{base}__",
+    ),
+    # Sims 3 rigs use the same b__ / L_ / R_ convention; kept as its own set so
+    # the two can diverge without touching Sims 4 conversions.
+    "SIMS3": RuleSet(
+        "SIMS3", "Sims 3", "b__L_Name__ style bones (Sims 3)",
+        _SIMS_SIDE_RULES,
+        strip_prefixes=("b__",),
+        reverse_sides={"L": "b__L_{base}__", "R": "b__R_{base}__"},
+        reverse_center="b__{base}__",
+    ),
+    "GENERIC": RuleSet(
+        "GENERIC", "Generic L/R", "Left/Right, l_/r_, _l/_r and similar in-house conventions",
+        [
+            ("suffix", {".L": "L", ".R": "R"}, False),
+            ("prefix", {"Left_": "L", "Right_": "R", "Left": "L", "Right": "R"}, True),
+            ("suffix", {"_Left": "L", "_Right": "R", "Left": "L", "Right": "R"}, True),
+            ("prefix", {"L_": "L", "R_": "R", "l_": "L", "r_": "R"}, True),
+            ("infix", {"_L_": "L", "_R_": "R", "_l_": "L", "_r_": "R"}, True),
+            ("suffix", {"_L": "L", "_R": "R", "_l": "L", "_r": "R"}, True),
+        ],
+        reverse_sides={"L": "{base}_L", "R": "{base}_R"},
+    ),
+}
+DEFAULT_RULE_SET = "SIMS4"
 
-    return name.strip("_"), None
+def normalize_name_remove_b_and_unders(name: str) -> str:
+    return RULE_SETS["SIMS4"].normalize(name)
+
+def detect_side_and_base(name: str):
+    return RULE_SETS["SIMS4"].detect(name)
 
 def to_xmirror_name(orig_name: str) -> str:
-    name = normalize_name_remove_b_and_unders(orig_name)
-    base, side = detect_side_and_base(name)
-    if side is None:
-        return base
-    return f"{base}.{side}"
-
-def build_conversion_map(bones):
-    mapping = {}
-    for b in bones:
-        orig = b.name
-        new = to_xmirror_name(orig)
-        if new != orig:
-            mapping[orig] = new
-    return mapping
-
-def rename_bones(arm_obj, mapping):
-    ctx = bpy.context
-    prev_mode = ctx.mode
-    # Make armature active
-    ctx.view_layer.objects.active = arm_obj
-    for obj in ctx.view_layer.objects:
-        obj.select_set(False)
-    arm_obj.select_set(True)
-    # Enter edit mode
-    try:
-        bpy.ops.object.mode_set(mode='EDIT')
-    except RuntimeError:
-        pass
+    return RULE_SETS["SIMS4"].convert(orig_name)
 
-    arm = arm_obj.data
-    edit_bones = arm.edit_bones
+class NamingEngine:
+    """
+    bpy-free batch name converter for one RuleSet. Conversions are memoized in a
+    bounded LRU cache, since every Sims 4 rig reuses the same few hundred bone names.
+    """
 
-    # Collision checks
-    new_names = list(mapping.values())
-    if len(set(new_names)) != len(new_names):
-        raise RuntimeError(t("error_conversion").format(err="Name collision among targets."))
+    def __init__(self, rule_set=None, max_cache=4096):
+        self.rule_set = rule_set or RULE_SETS[DEFAULT_RULE_SET]
+        self.max_cache = max_cache
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
-    existing_names = set(b.name for b in arm.bones)
-    for target in new_names:
-        if target in existing_names and target not in mapping.keys():
-            raise RuntimeError(t("error_conversion").format(err=f"Target name '{target}' already exists and is not part of rename mapping."))
-
-    # Two-pass renaming to avoid collisions
-    temp_map = {}
-    for orig, new in mapping.items():
-        eb = edit_bones.get(orig)
-        if eb is None:
-            continue
-        tmp = new + TEMP_SUFFIX
-        if tmp in edit_bones:
-            tmp = tmp + "_x"
-        eb.name = tmp
-        temp_map[tmp] = orig
-
-    for tmp, orig in temp_map.items():
-        eb = edit_bones.get(tmp)
-        if eb:
-            final = mapping[orig]
-            eb.name = final
-
-    # Restore mode
+    def convert(self, name):
+        cache = self._cache
+        new = cache.get(name)
+        if new is not None:
+            self.hits += 1
+            cache.move_to_end(name)
+            return new
+        self.misses += 1
+        new = self.rule_set.convert(name)
+        cache[name] = new
+        if len(cache) > self.max_cache:
+            cache.popitem(last=False)
+        return new
+
+    def convert_many(self, names):
+        """Return {orig: new} for every name that changes, in input order."""
+        convert = self.convert
+        mapping = {}
+        for orig in names:
+            new = convert(orig)
+            if new != orig:
+                mapping[orig] = new
+        return mapping
+
+    def reverse_many(self, names):
+        """Source-style names from this rule set's templates, for names that change."""
+        reverse = self.rule_set.reverse
+        mapping = {}
+        for name in names:
+            orig = reverse(name)
+            if orig != name:
+                mapping[name] = orig
+        return mapping
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "rule_set": self.rule_set.key,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "size": len(self._cache),
+            "max_size": self.max_cache,
+        }
+
+    def clear_cache(self):
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+_NAMING_ENGINES = {}
+
+def get_addon_prefs():
     try:
-        bpy.ops.object.mode_set(mode=prev_mode)
+        addon = bpy.context.preferences.addons.get(__name__)
+        if addon:
+            return addon.preferences
     except Exception:
         pass
+    return None
 
-def rename_vertex_groups_for_armature(arm_obj, mapping):
-    renamed = 0
-    for obj in bpy.data.objects:
-        if obj.type != 'MESH' or not obj.vertex_groups:
-            continue
-        uses = False
+def get_active_rule_set_key():
+    prefs = get_addon_prefs()
+    if prefs is not None:
+        return prefs.rule_set
+    return DEFAULT_RULE_SET
+
+def get_naming_engine(rule_set_key=None):
+    key = rule_set_key or get_active_rule_set_key()
+    if key not in RULE_SETS:
+        key = DEFAULT_RULE_SET
+    engine = _NAMING_ENGINES.get(key)
+    if engine is None:
+        engine = _NAMING_ENGINES[key] = NamingEngine(RULE_SETS[key])
+    return engine
+
+def build_conversion_map(bones, rule_set_key=None):
+    return get_naming_engine(rule_set_key).convert_many(b.name for b in bones)
+
+# ---------------------------------------------------------------------------
+# Known-rig fingerprint cache
+#
+# A rig is identified by a hash of its sorted bone names plus the rule set's
+# signature. KNOWN_RIGS holds mappings registered up front through
+# register_known_rig(); rigs first converted on this machine are saved to
+# RIG_CACHE_FILE in Blender's config directory, so the next file with the same
+# rig reuses the mapping. A hit skips name conversion and the bone collision
+# checks (the mapping was validated when it was registered or first applied).
+# ---------------------------------------------------------------------------
+
+RIG_CACHE_FILE = "rig_mappings.json"
+RIG_CACHE_MAX_ENTRIES = 256
+
+class RigMapping(dict):
+    """A conversion mapping that knows its rig fingerprint and whether it was pre-validated."""
+
+    def __init__(self, mapping, fingerprint=None, prevalidated=False, label=None):
+        super().__init__(mapping)
+        self.fingerprint = fingerprint
+        self.prevalidated = prevalidated
+        self.label = label
+
+# fingerprint -> (label, mapping)
+KNOWN_RIGS = {}
+
+_rig_disk_cache = None
+
+def fingerprint_bone_names(names, rule_set_key=None):
+    rule_set = RULE_SETS.get(rule_set_key or DEFAULT_RULE_SET, RULE_SETS[DEFAULT_RULE_SET])
+    h = hashlib.blake2b(digest_size=16)
+    h.update(rule_set.signature.encode("ascii"))
+    h.update("\0".join(sorted(names)).encode("utf-8"))
+    return h.hexdigest()
+
+def validate_rig_mapping(names, mapping):
+    targets = list(mapping.values())
+    if len(set(targets)) != len(targets):
+        raise ValueError("Name collision among targets.")
+    names = set(names)
+    for orig, target in mapping.items():
+        if orig not in names:
+            raise ValueError(f"Mapped bone '{orig}' is not part of the rig.")
+        if target in names and target not in mapping:
+            raise ValueError(f"Target name '{target}' already exists and is not part of rename mapping.")
+
+def register_known_rig(label, bone_names, rule_set_key=None):
+    """Precompute and validate the mapping for a rig's bone names and add it to KNOWN_RIGS."""
+    bone_names = list(bone_names)
+    mapping = get_naming_engine(rule_set_key or DEFAULT_RULE_SET).convert_many(bone_names)
+    validate_rig_mapping(bone_names, mapping)
+    fingerprint = fingerprint_bone_names(bone_names, rule_set_key)
+    KNOWN_RIGS[fingerprint] = (label, mapping)
+    return fingerprint
+
+def _rig_cache_path():
+    directory = bpy.utils.user_resource('CONFIG', path="s4_xmirror_renamer", create=True)
+    return os.path.join(directory, RIG_CACHE_FILE) if directory else None
+
+def _read_rig_cache_file(path):
+    rigs = OrderedDict()
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for fingerprint, entry in json.load(f).get("rigs", {}).items():
+                    rigs[fingerprint] = dict(zip(entry["src"], entry["dst"]))
+        except Exception:
+            rigs.clear()
+    return rigs
+
+def _load_rig_disk_cache():
+    global _rig_disk_cache
+    if _rig_disk_cache is None:
+        _rig_disk_cache = _read_rig_cache_file(_rig_cache_path())
+    return _rig_disk_cache
+
+def _save_rig_disk_cache(merge=True):
+    """
+    Writes the cache through a private temp file and os.replace, so parallel
+    CLI workers never read a half-written file. With merge, rigs another
+    process saved since we loaded are kept (ours win, newest last).
+    """
+    global _rig_disk_cache
+    path = _rig_cache_path()
+    if not path or _rig_disk_cache is None:
+        return
+    if merge:
+        merged = _read_rig_cache_file(path)
+        for fingerprint, mapping in _rig_disk_cache.items():
+            merged.pop(fingerprint, None)
+            merged[fingerprint] = mapping
+        while len(merged) > RIG_CACHE_MAX_ENTRIES:
+            merged.popitem(last=False)
+        _rig_disk_cache = merged
+    rigs = {fp: {"src": list(m.keys()), "dst": list(m.values())} for fp, m in _rig_disk_cache.items()}
+    try:
+        fd, tmp = tempfile.mkstemp(prefix=RIG_CACHE_FILE + ".", suffix=".tmp", dir=os.path.dirname(path))
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "rigs": rigs}, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def remember_rig_mapping(fingerprint, mapping):
+    cache = _load_rig_disk_cache()
+    if fingerprint in cache:
+        return
+    cache[fingerprint] = dict(mapping)
+    while len(cache) > RIG_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+    _save_rig_disk_cache()
+
+def clear_rig_cache():
+    global _rig_disk_cache
+    _rig_disk_cache = OrderedDict()
+    _save_rig_disk_cache(merge=False)
+
+def rig_cache_enabled():
+    prefs = get_addon_prefs()
+    return prefs is None or prefs.use_rig_cache
+
+def lookup_rig_mapping(bones, rule_set_key=None):
+    """RigMapping for the bones: from KNOWN_RIGS, the disk cache, or freshly built."""
+    rule_set_key = rule_set_key or get_active_rule_set_key()
+    names = [b.name for b in bones]
+    if not rig_cache_enabled():
+        return RigMapping(get_naming_engine(rule_set_key).convert_many(names))
+    fingerprint = fingerprint_bone_names(names, rule_set_key)
+    known = KNOWN_RIGS.get(fingerprint)
+    if known is not None:
+        return RigMapping(known[1], fingerprint, prevalidated=True, label=known[0])
+    cached = _load_rig_disk_cache().get(fingerprint)
+    if cached is not None:
+        return RigMapping(cached, fingerprint, prevalidated=True)
+    return RigMapping(get_naming_engine(rule_set_key).convert_many(names), fingerprint)
+
+def build_revert_map(mapping):
+    return {v: k for k, v in mapping.items()}
+
+def build_incremental_map(bones, stored, rule_set_key=None):
+    """
+    Delta against a mapping already stored on the armature: only bones that are
+    not one of its converted names are considered, so re-running Convert on a
+    rig that gained bones renames just the new ones.
+    """
+    converted = set(stored.values())
+    return get_naming_engine(rule_set_key).convert_many(b.name for b in bones if b.name not in converted)
+
+def plan_conversion_map(arm_obj, rule_set_key=None):
+    """Returns (mapping to apply now, mapping already stored on the armature or None)."""
+    stored = load_mapping_from_armature(arm_obj)
+    if stored:
+        return build_incremental_map(arm_obj.data.bones, stored, rule_set_key), stored
+    return lookup_rig_mapping(arm_obj.data.bones, rule_set_key), None
+
+class ArmatureMeshIndex:
+    """
+    Scene-level reverse index: armature object -> mesh objects deforming with it
+    through an Armature modifier. Built in one pass over bpy.data.objects and
+    patched from depsgraph updates; anything that can't be verified on read
+    triggers a rebuild instead of returning stale targets.
+    """
+
+    def __init__(self):
+        self._by_armature = {}  # armature ptr -> {mesh ptr: mesh name}
+        self._by_mesh = {}      # mesh ptr -> set of armature ptrs
+        self._object_count = -1
+        self._dirty = True
+        self.objects_scanned = 0
+
+    def invalidate(self):
+        self._dirty = True
+
+    def rebuild(self):
+        self._by_armature.clear()
+        self._by_mesh.clear()
+        for obj in bpy.data.objects:
+            if obj.type == 'MESH':
+                self._index_mesh(obj)
+        self._object_count = len(bpy.data.objects)
+        self.objects_scanned += self._object_count
+        self._dirty = False
+
+    def _index_mesh(self, obj):
+        mesh_ptr = obj.as_pointer()
+        arm_ptrs = set()
         for mod in obj.modifiers:
-            if mod.type == 'ARMATURE' and mod.object == arm_obj:
-                uses = True
-                break
-        if not uses:
-            continue
-        # rename vertex groups (watch for collision)
-        vg_names = {g.name for g in obj.vertex_groups}
-        for g in list(obj.vertex_groups):
-            if g.name in mapping:
-                target = mapping[g.name]
-                if target in vg_names and target != g.name:
-                    raise RuntimeError(f"Vertex group name collision on object '{obj.name}': target '{target}' already exists.")
-                g.name = target
-                renamed += 1
-    return renamed
+            if mod.type == 'ARMATURE' and mod.object is not None:
+                arm_ptrs.add(mod.object.as_pointer())
+        for arm_ptr in arm_ptrs:
+            self._by_armature.setdefault(arm_ptr, {})[mesh_ptr] = obj.name
+        if arm_ptrs:
+            self._by_mesh[mesh_ptr] = arm_ptrs
+
+    def _unindex_mesh(self, mesh_ptr):
+        for arm_ptr in self._by_mesh.pop(mesh_ptr, ()):
+            meshes = self._by_armature.get(arm_ptr)
+            if meshes is not None:
+                meshes.pop(mesh_ptr, None)
+                if not meshes:
+                    del self._by_armature[arm_ptr]
+
+    def update_objects(self, objects):
+        if self._dirty:
+            return
+        for obj in objects:
+            if obj.type != 'MESH':
+                continue
+            self._unindex_mesh(obj.as_pointer())
+            self._index_mesh(obj)
+        self._object_count = len(bpy.data.objects)
+
+    def _resolve(self, arm_obj):
+        objects = bpy.data.objects
+        result = []
+        for mesh_ptr, name in self._by_armature.get(arm_obj.as_pointer(), {}).items():
+            obj = objects.get(name)
+            if obj is None or obj.as_pointer() != mesh_ptr:
+                return None
+            result.append(obj)
+        return result
+
+    def meshes_for(self, arm_obj):
+        if self._dirty or self._object_count != len(bpy.data.objects):
+            self.rebuild()
+        result = self._resolve(arm_obj)
+        if result is None:
+            self.rebuild()
+            result = self._resolve(arm_obj) or []
+        return result
+
+_MESH_INDEX = ArmatureMeshIndex()
+
+def get_deforming_meshes(arm_obj):
+    return _MESH_INDEX.meshes_for(arm_obj)
+
+def scan_deforming_meshes(arm_obj, timer=None):
+    timer = timer or _NULL_TIMER
+    with timer.phase("scan") as info:
+        scanned = _MESH_INDEX.objects_scanned
+        meshes = _MESH_INDEX.meshes_for(arm_obj)
+        info["objects_scanned"] = _MESH_INDEX.objects_scanned - scanned
+        info["meshes"] = len(meshes)
+    return meshes
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_update_post(scene, depsgraph):
+    objects = []
+    changed = []
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Object):
+            objects.append(id_data)
+        # Moving objects around doesn't change what Convert/Revert would do
+        if _RIG_STATUS and (update.is_updated_geometry or not update.is_updated_transform):
+            changed.append(id_data)
+    if changed and _RIG_STATUS:
+        invalidate_rig_status_for(changed)
+    if objects:
+        _MESH_INDEX.update_objects(objects)
+
+@bpy.app.handlers.persistent
+def _on_file_or_undo_change(*args):
+    _MESH_INDEX.invalidate()
+    invalidate_mapping_cache()
+    _APPLIED_PLANS.clear()
+    _MIRROR_TABLES.invalidate()
+    _SYMMETRY_REPORTS.clear()
+    _RIG_STATUS.clear()
+    _REFERENCE_SURFACES.clear()
+
+@bpy.app.handlers.persistent
+def _on_load_post(*args):
+    # msgbus subscriptions don't survive loading a file
+    subscribe_language_changes()
+    subscribe_rig_status_changes()
+    invalidate_language_cache()
+
+_HANDLERS = (
+    ("depsgraph_update_post", _on_depsgraph_update_post),
+    ("load_post", _on_file_or_undo_change),
+    ("undo_post", _on_file_or_undo_change),
+    ("redo_post", _on_file_or_undo_change),
+    ("load_post", _on_load_post),
+)
+
+# Mapping storage format (version 2): an ID property group holding two strings,
+# the original and converted names joined by MAP_SEPARATOR in matching order.
+# Version 1 (a JSON string) is still read for files converted by older builds.
+MAP_FORMAT_VERSION = 2
+MAP_SEPARATOR = "\x1f"
+
+# armature data pointer -> (src string, dst string, parsed mapping)
+_MAPPING_CACHE = {}
+
+def invalidate_mapping_cache(arm_obj=None):
+    if arm_obj is None:
+        _MAPPING_CACHE.clear()
+    else:
+        _MAPPING_CACHE.pop(arm_obj.data.as_pointer(), None)
+
+def _split_names(packed):
+    return packed.split(MAP_SEPARATOR) if packed else []
 
 def store_mapping_on_armature(arm_obj, mapping):
+    src = MAP_SEPARATOR.join(mapping.keys())
+    dst = MAP_SEPARATOR.join(mapping.values())
     try:
-        arm_obj[MAP_PROP] = json.dumps(mapping)
+        arm_obj[MAP_PROP] = {"version": MAP_FORMAT_VERSION, "src": src, "dst": dst}
     except Exception as e:
         raise RuntimeError("Failed to store mapping on armature: " + str(e))
+    _MAPPING_CACHE[arm_obj.data.as_pointer()] = (src, dst, dict(mapping))
 
 def load_mapping_from_armature(arm_obj):
     if MAP_PROP not in arm_obj:
         return None
+    raw = arm_obj[MAP_PROP]
+    if isinstance(raw, str):
+        src, dst = raw, None
+    else:
+        try:
+            if raw.get("version") != MAP_FORMAT_VERSION:
+                return None
+            src, dst = raw["src"], raw["dst"]
+        except Exception:
+            return None
+
+    # The cached entry is only trusted while the stored strings are unchanged
+    key = arm_obj.data.as_pointer()
+    cached = _MAPPING_CACHE.get(key)
+    if cached is not None and cached[0] == src and cached[1] == dst:
+        return dict(cached[2])
+
     try:
-        mapping = json.loads(arm_obj[MAP_PROP])
-        return mapping
+        if dst is None:
+            mapping = json.loads(src)
+        else:
+            mapping = dict(zip(_split_names(src), _split_names(dst)))
     except Exception:
         return None
+    _MAPPING_CACHE[key] = (src, dst, mapping)
+    return dict(mapping)
 
 def clear_mapping_on_armature(arm_obj):
+    invalidate_mapping_cache(arm_obj)
     if MAP_PROP in arm_obj:
         try:
             del arm_obj[MAP_PROP]
         except Exception:
             pass
 
-class S4_OT_ConvertNames(bpy.types.Operator):
-    bl_idname = "s4.rename_to_xmirror"
-    bl_label = "Convert (S4->Xmirror)"
-    bl_description = "Convert TheSims4-style bone names to Blender x-mirror-friendly names and rename related vertex groups"
+class PhaseTimer:
+    """
+    Opt-in wall time and counters per phase of one convert/revert run. Code
+    being measured does `with timer.phase("bones") as info: ... info["bones_renamed"] = n`;
+    a disabled timer still hands out a dict but records nothing. Time between
+    pause() and resume() (the UI's share of a modal run) is left out.
+    """
 
-    def execute(self, context):
-        arm_obj = context.active_object
-        if not arm_obj or arm_obj.type != 'ARMATURE':
-            self.report({'ERROR'}, t("error_not_armature"))
-            return {'CANCELLED'}
-        bones = arm_obj.data.bones
-        mapping = build_conversion_map(bones)
-        if not mapping:
-            self.report({'INFO'}, t("info_no_targets"))
-            return {'CANCELLED'}
-        try:
-            rename_bones(arm_obj, mapping)
-            renamed_vg = rename_vertex_groups_for_armature(arm_obj, mapping)
-            store_mapping_on_armature(arm_obj, mapping)
-        except Exception as e:
-            self.report({'ERROR'}, t("error_conversion").format(err=str(e)))
-            return {'CANCELLED'}
-        self.report({'INFO'}, t("info_converted").format(bones=len(mapping), vgs=renamed_vg))
-        return {'FINISHED'}
+    def __init__(self, label, enabled=True):
+        self.label = label
+        self.enabled = enabled
+        self.phases = []  # [(name, seconds, counts), ...]
+        self.profile_path = None
+        self._paused = 0.0
+        self._paused_at = None
 
-class S4_OT_RevertNames(bpy.types.Operator):
-    bl_idname = "s4.revert_names"
-    bl_label = "Revert (Xmirror->S4)"
-    bl_description = "Revert bone names and vertex groups to the original names saved during conversion"
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = time.perf_counter()
 
-    def execute(self, context):
-        arm_obj = context.active_object
-        if not arm_obj or arm_obj.type != 'ARMATURE':
-            self.report({'ERROR'}, t("error_not_armature"))
-            return {'CANCELLED'}
-        mapping = load_mapping_from_armature(arm_obj)
-        if not mapping:
-            self.report({'ERROR'}, t("error_no_mapping"))
-            return {'CANCELLED'}
-        reverse = {v: k for k, v in mapping.items()}
-        if not reverse:
-            self.report({'ERROR'}, t("error_no_mapping"))
-            return {'CANCELLED'}
+    def resume(self):
+        if self._paused_at is not None:
+            self._paused += time.perf_counter() - self._paused_at
+            self._paused_at = None
+
+    @contextmanager
+    def phase(self, name, **counts):
+        if not self.enabled:
+            yield counts
+            return
+        start = time.perf_counter()
+        paused = self._paused
         try:
-            rename_bones(arm_obj, reverse)
-            renamed_vg = rename_vertex_groups_for_armature(arm_obj, reverse)
-            clear_mapping_on_armature(arm_obj)
-        except Exception as e:
-            self.report({'ERROR'}, t("error_revert").format(err=str(e)))
-            return {'CANCELLED'}
-        self.report({'INFO'}, t("info_reverted").format(bones=len(reverse), vgs=renamed_vg))
-        return {'FINISHED'}
+            yield counts
+        finally:
+            seconds = time.perf_counter() - start - (self._paused - paused)
+            self.phases.append((name, seconds, counts))
 
-class S4_PT_Panel(bpy.types.Panel):
-    bl_space_type = "VIEW_3D"
-    bl_region_type = "UI"
-    bl_category = "S4 Rename"
-    bl_label = "S4 Rename"
+    @property
+    def total(self):
+        return sum(seconds for _name, seconds, _counts in self.phases)
 
-    def draw(self, context):
-        layout = self.layout
-        # Localized panel title
-        layout.label(text=t("panel_title"))
-        col = layout.column(align=True)
-        col.label(text=t("active_required"))
-        # Single Convert button (localized)
-        col.operator("s4.rename_to_xmirror", text=t("convert_button"), icon='SNAP_ON')
-        # Revert button (localized)
-        col.operator("s4.revert_names", text=t("revert_button"), icon='LOOP_BACK')
-        col.separator()
-        col.label(text=t("processing"))
-        col.label(text=t("remove_b_prefix"))
-        col.label(text=t("convert_side"))
-        col.label(text=t("center_keep"))
+    def as_dict(self):
+        return {
+            "label": self.label,
+            "total_seconds": self.total,
+            "phases": [{"name": name, "seconds": seconds, **counts} for name, seconds, counts in self.phases],
+            "profile_path": self.profile_path,
+        }
 
-class S4_AddonPreferences(bpy.types.AddonPreferences):
-    bl_idname = __name__
-    language: bpy.props.EnumProperty(
-        name="Language",
-        items=(
-            ("AUTO", "Auto", "Use Blender language preference"),
-            ("EN", "English", "Force English UI"),
-            ("JA", "日本語", "Force Japanese UI"),
-            ("ES", "Español", "Force Spanish UI"),
-            ("FR", "Français", "Force French UI"),
-            ("DE", "Deutsch", "Force German UI"),
-            ("ZH", "中文", "Force Chinese (Simplified) UI"),
-            ("PT", "Português", "Force Portuguese UI"),
-            ("RU", "Русский", "Force Russian UI"),
-            ("KO", "한국어", "Force Korean UI"),
-            ("IT", "Italiano", "Force Italian UI"),
-        ),
-        default="AUTO",
-    )
+    def summary(self):
+        parts = []
+        for name, seconds, counts in self.phases:
+            detail = ", ".join(f"{k.replace('_', ' ')} {v}" for k, v in counts.items())
+            parts.append(f"{name} {seconds * 1000.0:.1f}ms" + (f" ({detail})" if detail else ""))
+        text = f"{self.total * 1000.0:.1f}ms: " + " | ".join(parts)
+        if self.profile_path:
+            text += f" | cProfile: {self.profile_path}"
+        return text
 
-    def draw(self, context):
-        layout = self.layout
-        layout.label(text=t("pref_label"))
-        row = layout.row()
-        row.prop(self, "language", text=t("pref_language"))
-        layout.label(text=t("lang_auto"))
-        # Show sample language names
-        layout.label(text=t("lang_en"))
-        layout.label(text=t("lang_ja"))
+_NULL_TIMER = PhaseTimer("", enabled=False)
 
-classes = (
-    S4_OT_ConvertNames,
-    S4_OT_RevertNames,
-    S4_PT_Panel,
-    S4_AddonPreferences,
-)
+# Last instrumented run per operator kind ("convert", "revert", ...), as PhaseTimer.as_dict()
+LAST_RUN_STATS = {}
+
+def get_last_run_stats(kind=None):
+    if kind is None:
+        return dict(LAST_RUN_STATS)
+    return LAST_RUN_STATS.get(kind)
+
+class InstrumentedRun:
+    """
+    The timing/cProfile options from the addon preferences for one operator
+    run. Measuring happens between resume() and pause(); a modal operator
+    keeps one across its timer ticks. finish() publishes the results to
+    LAST_RUN_STATS and the Info report.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.prefs = get_addon_prefs()
+        self.timer = PhaseTimer(kind, enabled=bool(self.prefs and self.prefs.profile_timings))
+        self.timer.pause()
+        self.profiler = cProfile.Profile() if self.prefs and self.prefs.profile_cprofile else None
+
+    def resume(self):
+        self.timer.resume()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def pause(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.timer.pause()
+
+    def finish(self, op):
+        self.pause()
+        timer = self.timer
+        if self.profiler is not None:
+            prefs = self.prefs
+            path = bpy.path.abspath(prefs.profile_dump_path) if prefs.profile_dump_path else ""
+            if not path:
+                path = os.path.join(tempfile.gettempdir(), f"s4_rename_{self.kind}.prof")
+            try:
+                self.profiler.dump_stats(path)
+                timer.profile_path = path
+            except OSError as e:
+                op.report({'WARNING'}, t("error_profile_dump").format(err=str(e)))
+        if timer.enabled or timer.profile_path:
+            LAST_RUN_STATS[self.kind] = timer.as_dict()
+            op.report({'INFO'}, t("info_timings").format(summary=timer.summary()))
+
+def run_instrumented(op, kind, func):
+    """Calls func(timer) inside an InstrumentedRun for kind and finishes it."""
+    run = InstrumentedRun(kind)
+    run.resume()
+    try:
+        return func(run.timer)
+    finally:
+        run.finish(op)
+
+class RenamePlan:
+    """
+    Read-only description of one convert/revert of an armature: the bone renames
+    and, for every deforming mesh, the vertex group renames. Built and validated
+    by plan_rename() before anything is modified; applied by RenameTransaction.
+    """
+
+    def __init__(self, arm_obj, mapping, stored_before, stored_after):
+        self.arm_name = arm_obj.name
+        self.arm_ptr = arm_obj.as_pointer()
+        self.mapping = mapping              # bone renames, old -> new
+        self.vg_renames = []                # [(mesh name, [(old, new), ...]), ...]
+        self.mesh_layouts = {}              # mesh name -> vertex group count at planning time
+        self.layout_count = 0               # distinct vertex group layouts among those meshes
+        self.prune = []                     # [(mesh name, [empty group names]), ...] removed before renaming
+        self.stored_before = stored_before  # mapping on the armature before apply (None: none)
+        self.stored_after = stored_after    # mapping to leave on it after apply (None: cleared)
+        self.errors = []
+
+    @property
+    def vg_count(self):
+        return sum(len(renames) for _name, renames in self.vg_renames)
+
+    def layouts_after(self):
+        """Vertex group count per mesh once the plan is applied."""
+        layouts = dict(self.mesh_layouts)
+        for mesh_name, names in self.prune:
+            layouts[mesh_name] -= len(names)
+        return layouts
+
+    @property
+    def is_empty(self):
+        """True when applying would rename nothing (e.g. Convert on a fully converted rig)."""
+        return not self.mapping and not self.vg_renames
+
+    def raise_if_invalid(self):
+        if self.errors:
+            raise RuntimeError(" ".join(self.errors))
+
+    def reversed(self):
+        """
+        The plan that undoes this one, without rescanning meshes. Bones added
+        since may block its targets; plan_revert() checks them again.
+        """
+        plan = RenamePlan.__new__(RenamePlan)
+        plan.arm_name = self.arm_name
+        plan.arm_ptr = self.arm_ptr
+        plan.mapping = {new: old for old, new in self.mapping.items()}
+        # Meshes sharing a layout share one rename list; keep it that way
+        reversed_lists = {}
+        plan.vg_renames = []
+        for name, renames in self.vg_renames:
+            key = id(renames)
+            if key not in reversed_lists:
+                reversed_lists[key] = [(new, old) for old, new in renames]
+            plan.vg_renames.append((name, reversed_lists[key]))
+        plan.mesh_layouts = self.layouts_after()
+        plan.layout_count = self.layout_count
+        plan.prune = []
+        plan.stored_before = self.stored_after
+        plan.stored_after = self.stored_before
+        plan.errors = []
+        return plan
+
+def plan_rename(arm_obj, mapping, meshes=None, vg_mapping=None, stored_before=None, stored_after=None, timer=None):
+    """
+    One read-only pass over the armature's bones and every deforming mesh's
+    vertex groups. Collisions are collected in plan.errors instead of raised.
+    vg_mapping defaults to mapping (incremental converts pass the merged one).
+    """
+    timer = timer or _NULL_TIMER
+    if meshes is None:
+        meshes = scan_deforming_meshes(arm_obj, timer)
+    if vg_mapping is None:
+        vg_mapping = mapping
+    with timer.phase("plan") as info:
+        plan = _plan_rename(arm_obj, mapping, meshes, vg_mapping, stored_before, stored_after)
+        info["meshes"] = len(meshes)
+        info["layouts"] = plan.layout_count
+        info["groups_planned"] = plan.vg_count
+    return plan
+
+def _plan_rename(arm_obj, mapping, meshes, vg_mapping, stored_before, stored_after):
+    plan = RenamePlan(arm_obj, mapping, stored_before, stored_after)
+
+    # A pre-validated rig mapping was checked against this exact bone set
+    if not getattr(mapping, "prevalidated", False):
+        plan.errors.extend(_bone_target_errors(arm_obj, mapping))
+
+    # Outfit parts, LODs and morphs usually carry the same ordered groups:
+    # each distinct layout is planned once and shared by every mesh with it
+    layouts = {}  # tuple of group names -> (renames, colliding targets)
+    for obj in meshes:
+        groups = obj.vertex_groups
+        plan.mesh_layouts[obj.name] = len(groups)
+        if not groups:
+            continue
+        layout = tuple(groups.keys())
+        planned = layouts.get(layout)
+        if planned is None:
+            planned = layouts[layout] = _plan_layout(layout, vg_mapping)
+        renames, collisions = planned
+        for target in collisions:
+            plan.errors.append(f"Vertex group name collision on object '{obj.name}': target '{target}' already exists.")
+        if renames:
+            plan.vg_renames.append((obj.name, renames))
+    plan.layout_count = len(layouts)
+    return plan
+
+def _bone_target_errors(arm_obj, mapping):
+    arm = arm_obj.data
+    bones = arm.edit_bones if arm.is_editmode else arm.bones
+    errors = []
+    new_names = list(mapping.values())
+    if len(set(new_names)) != len(new_names):
+        errors.append("Name collision among targets.")
+    existing_names = set(b.name for b in bones)
+    for target in new_names:
+        if target in existing_names and target not in mapping:
+            errors.append(f"Target name '{target}' already exists and is not part of rename mapping.")
+    return errors
+
+def _plan_layout(layout, vg_mapping):
+    existing = set(layout)
+    renames = []
+    collisions = []
+    for name in layout:
+        target = vg_mapping.get(name)
+        if target is None:
+            continue
+        if target in existing and target != name:
+            collisions.append(target)
+            continue
+        renames.append((name, target))
+    return renames, collisions
+
+# Data path prefixes that name a bone, e.g. pose.bones["b__L_Hand__"].rotation_quaternion
+_BONE_PATH_PREFIXES = ('pose.bones["', 'bones["')
+
+def _split_bone_path(path):
+    """Returns (prefix, bone name, suffix) for a bone data path, else None."""
+    for head in _BONE_PATH_PREFIXES:
+        if path.startswith(head):
+            end = path.find('"]', len(head))
+            if end != -1:
+                return head, path[len(head):end], path[end:]
+    return None
+
+def _action_channel_sets(action):
+    """Yields (fcurves, groups) per channel set, for legacy and slotted actions."""
+    layers = getattr(action, "layers", None)
+    if layers:
+        for layer in layers:
+            for strip in layer.strips:
+                for bag in getattr(strip, "channelbags", ()):
+                    yield bag.fcurves, bag.groups
+    else:
+        # Builds without the legacy properties have nothing to yield here
+        yield getattr(action, "fcurves", ()), getattr(action, "groups", ())
+
+def _armature_ptr(id_data):
+    if id_data is not None and getattr(id_data, "type", None) == 'ARMATURE':
+        return id_data.as_pointer()
+    return None
+
+class BoneReferenceIndex:
+    """
+    Everything outside the armature that names one of its bones: F-curve paths
+    and groups in actions, driver paths and variable targets, and constraint
+    subtargets. Built in one pass over the file; rewrite() then renames through
+    the mapping with a dict lookup per old name instead of scanning every
+    F-curve per bone.
+
+    Each entry is (owners, struct, attr, prefix, suffix): struct.attr currently
+    reads prefix + name + suffix. owners is the set of armature object pointers
+    the reference belongs to; an empty set (an action no armature uses) means
+    it follows whichever armature is renamed.
+    """
+
+    def __init__(self):
+        self._refs = {}
+
+    def _add(self, name, owners, struct, attr, prefix="", suffix=""):
+        self._refs.setdefault(name, []).append((owners, struct, attr, prefix, suffix))
+
+    def _add_path(self, owners, struct, attr="data_path"):
+        split = _split_bone_path(getattr(struct, attr))
+        if split is not None:
+            prefix, name, suffix = split
+            self._add(name, owners, struct, attr, prefix, suffix)
+
+    @classmethod
+    def build(cls):
+        index = cls()
+        data = bpy.data
+
+        # Which armatures use each action (directly or through NLA strips)
+        action_users = {}
+        for obj in data.objects:
+            ad = obj.animation_data
+            if ad is None or obj.type != 'ARMATURE':
+                continue
+            actions = [ad.action] + [strip.action for track in ad.nla_tracks for strip in track.strips]
+            for action in actions:
+                if action is not None:
+                    action_users.setdefault(action.as_pointer(), set()).add(obj.as_pointer())
+
+        for action in data.actions:
+            owners = frozenset(action_users.get(action.as_pointer(), ()))
+            for fcurves, groups in _action_channel_sets(action):
+                for fc in fcurves:
+                    index._add_path(owners, fc)
+                for group in groups:
+                    index._add(group.name, owners, group, "name")
+
+        for collection in (data.objects, data.armatures, data.meshes, data.shape_keys, data.materials):
+            for id_data in collection:
+                ad = getattr(id_data, "animation_data", None)
+                if ad is None:
+                    continue
+                own = _armature_ptr(id_data)
+                for fc in ad.drivers:
+                    if own is not None:
+                        index._add_path(frozenset((own,)), fc)
+                    for var in fc.driver.variables:
+                        for target in var.targets:
+                            tgt = _armature_ptr(target.id)
+                            if tgt is None:
+                                continue
+                            owners = frozenset((tgt,))
+                            if target.bone_target:
+                                index._add(target.bone_target, owners, target, "bone_target")
+                            index._add_path(owners, target)
+
+        for obj in data.objects:
+            constraint_sets = [obj.constraints]
+            if obj.pose is not None:
+                constraint_sets.extend(pb.constraints for pb in obj.pose.bones)
+            for constraints in constraint_sets:
+                for con in constraints:
+                    index._add_constraint(con)
+                    for target in getattr(con, "targets", ()):
+                        index._add_constraint(target)
+        return index
+
+    def _add_constraint(self, con):
+        for target_attr, sub_attr in (("target", "subtarget"), ("pole_target", "pole_subtarget")):
+            tgt = _armature_ptr(getattr(con, target_attr, None))
+            if tgt is None:
+                continue
+            name = getattr(con, sub_attr, "")
+            if name:
+                self._add(name, frozenset((tgt,)), con, sub_attr)
+
+    def rewrite(self, arm_obj, mapping, journal=None):
+        """
+        Point every reference owned by arm_obj from old to new names. Entries
+        Blender already fixed while renaming the bones no longer read the old
+        value and are skipped. Returns the number of references rewritten.
+        """
+        arm_ptr = arm_obj.as_pointer()
+        count = 0
+        for old, new in mapping.items():
+            for owners, struct, attr, prefix, suffix in self._refs.get(old, ()):
+                if owners and arm_ptr not in owners:
+                    continue
+                current = getattr(struct, attr)
+                if current != prefix + old + suffix:
+                    continue
+                setattr(struct, attr, prefix + new + suffix)
+                if journal is not None:
+                    journal.append(("ref", struct, attr, current))
+                count += 1
+        self.refresh(mapping)
+        return count
+
+    def refresh(self, names):
+        """
+        Re-files the entries listed under names by the name they read now, so
+        the index stays usable after renames and rollbacks. Entries that no
+        longer name a bone are dropped.
+        """
+        moved = []
+        for name in set(names):
+            entries = self._refs.get(name)
+            if not entries:
+                continue
+            keep = []
+            for entry in entries:
+                _owners, struct, attr, prefix, suffix = entry
+                value = getattr(struct, attr)
+                if len(value) < len(prefix) + len(suffix) or not value.startswith(prefix) or not value.endswith(suffix):
+                    continue
+                current = value[len(prefix):len(value) - len(suffix)]
+                if current == name:
+                    keep.append(entry)
+                else:
+                    moved.append((current, entry))
+            if keep:
+                self._refs[name] = keep
+            else:
+                del self._refs[name]
+        for name, entry in moved:
+            self._refs.setdefault(name, []).append(entry)
+
+def _mapping_prop_snapshot(arm_obj):
+    if MAP_PROP not in arm_obj:
+        return None
+    raw = arm_obj[MAP_PROP]
+    return raw if isinstance(raw, str) else raw.to_dict()
+
+class RenameTransaction:
+    """
+    Applies a RenamePlan while recording every change in a journal. run() rolls
+    the journal back if any step fails, so the rig ends up either fully renamed
+    (with the mapping stored) or exactly as it was. steps() exposes the same work
+    as a generator yielding after each unit, for callers that apply in slices.
+    """
+
+    def __init__(self, plan, timer=None, references=None):
+        self.plan = plan
+        self.timer = timer or _NULL_TIMER
+        self.references = references
+        self.journal = []
+        self.bones_renamed = 0
+        self.vgs_renamed = 0
+        self.vgs_followed_bones = 0
+        self.meshes_touched = 0
+        self.refs_rewritten = 0
+        self.groups_pruned = 0
+        # One yield per pruned mesh, per bone per pass, per mesh, plus the refs and store phases
+        self.total_steps = len(plan.prune) + len(plan.mapping) * 2 + len(plan.vg_renames) + 2
+
+    def _armature(self):
+        arm_obj = bpy.data.objects.get(self.plan.arm_name)
+        if arm_obj is None or arm_obj.as_pointer() != self.plan.arm_ptr:
+            raise RuntimeError(f"Armature '{self.plan.arm_name}' is no longer available.")
+        return arm_obj
+
+    def _check_layouts(self):
+        # Bone renames drag matching vertex groups along, so a mesh that changed
+        # since planning has to be caught before the first bone is touched.
+        objects = bpy.data.objects
+        for mesh_name, count in self.plan.mesh_layouts.items():
+            obj = objects.get(mesh_name)
+            if obj is None or len(obj.vertex_groups) != count:
+                raise RuntimeError(f"Mesh '{mesh_name}' changed after planning; plan again.")
+
+    def steps(self):
+        plan = self.plan
+        arm_obj = self._armature()
+        self._check_layouts()
+        arm = arm_obj.data
+        bones = arm.edit_bones if arm.is_editmode else arm.bones
+
+        timer = self.timer
+
+        # Empty groups go first so neither pass below renames them
+        if plan.prune:
+            with timer.phase("prune") as info:
+                objects = bpy.data.objects
+                for mesh_name, names in plan.prune:
+                    groups = objects[mesh_name].vertex_groups
+                    for name in names:
+                        g = groups.get(name)
+                        if g is not None:
+                            groups.remove(g)
+                            self.journal.append(("prune", mesh_name, name))
+                            self.groups_pruned += 1
+                    yield
+                info["groups"] = self.groups_pruned
+
+        # Two-pass renaming to avoid collisions
+        with timer.phase("bones") as info:
+            temp_map = {}
+            for orig, new in plan.mapping.items():
+                b = bones.get(orig)
+                if b is not None:
+                    tmp = new + TEMP_SUFFIX
+                    if tmp in bones:
+                        tmp = tmp + "_x"
+                    b.name = tmp
+                    # Blender may truncate/uniquify; journal the name it actually got
+                    tmp = b.name
+                    self.journal.append(("bone", orig, tmp))
+                    temp_map[tmp] = new
+                yield
+            for tmp, new in temp_map.items():
+                b = bones.get(tmp)
+                if b is not None:
+                    b.name = new
+                    self.journal.append(("bone", tmp, b.name))
+                    if b.name != new:
+                        raise RuntimeError(f"Bone '{new}' could not be renamed (Blender named it '{b.name}').")
+                    self.bones_renamed += 1
+                yield
+            info["bones_renamed"] = self.bones_renamed
+
+        # Blender renames a deforming mesh's vertex group together with its bone,
+        # so most planned renames are already done here. Those still count: the
+        # layout check guarantees the target name didn't exist before.
+        with timer.phase("vgroups") as info:
+            objects = bpy.data.objects
+            for mesh_name, renames in plan.vg_renames:
+                obj = objects.get(mesh_name)
+                if obj is None:
+                    raise RuntimeError(f"Mesh '{mesh_name}' was removed after planning.")
+                groups = obj.vertex_groups
+                for old, new in renames:
+                    g = groups.get(old)
+                    if g is None:
+                        if new in groups:
+                            self.vgs_followed_bones += 1
+                            self.vgs_renamed += 1
+                        continue
+                    if new in groups:
+                        raise RuntimeError(f"Vertex group name collision on object '{mesh_name}': target '{new}' already exists.")
+                    g.name = new
+                    self.journal.append(("vgroup", mesh_name, old, g.name))
+                    if g.name != new:
+                        raise RuntimeError(f"Vertex group '{new}' on object '{mesh_name}' could not be renamed (Blender named it '{g.name}').")
+                    self.vgs_renamed += 1
+                self.meshes_touched += 1
+                yield
+            info["meshes_touched"] = self.meshes_touched
+            info["groups_renamed"] = self.vgs_renamed
+            info["with_bones"] = self.vgs_followed_bones
+
+        # Actions, drivers and constraints that still use the old names
+        with timer.phase("refs") as info:
+            if plan.mapping:
+                if self.references is None:
+                    self.references = BoneReferenceIndex.build()
+                self.refs_rewritten = self.references.rewrite(arm_obj, plan.mapping, self.journal)
+            info["refs_rewritten"] = self.refs_rewritten
+            yield
+
+        with timer.phase("store"):
+            if plan.stored_after != plan.stored_before:
+                self.journal.append(("mapping", _mapping_prop_snapshot(arm_obj)))
+                if plan.stored_after is None:
+                    clear_mapping_on_armature(arm_obj)
+                else:
+                    store_mapping_on_armature(arm_obj, plan.stored_after)
+            yield
+
+    def run(self):
+        try:
+            for _ in self.steps():
+                pass
+        except Exception:
+            self.rollback()
+            raise
+        return self.commit()
+
+    def commit(self):
+        _remember_applied_plan(self.plan)
+        _RIG_STATUS.pop(self.plan.arm_ptr, None)
+        return self
+
+    def rollback(self):
+        _RIG_STATUS.pop(self.plan.arm_ptr, None)
+        failures = []
+        arm_obj = bpy.data.objects.get(self.plan.arm_name)
+        objects = bpy.data.objects
+        for entry in reversed(self.journal):
+            try:
+                kind = entry[0]
+                if kind == "bone":
+                    arm = arm_obj.data
+                    bones = arm.edit_bones if arm.is_editmode else arm.bones
+                    bones[entry[2]].name = entry[1]
+                elif kind == "vgroup":
+                    objects[entry[1]].vertex_groups[entry[3]].name = entry[2]
+                elif kind == "prune":
+                    # The group held no weight; it comes back at the end of the list
+                    objects[entry[1]].vertex_groups.new(name=entry[2])
+                elif kind == "ref":
+                    setattr(entry[1], entry[2], entry[3])
+                elif kind == "mapping":
+                    invalidate_mapping_cache(arm_obj)
+                    if entry[1] is None:
+                        if MAP_PROP in arm_obj:
+                            del arm_obj[MAP_PROP]
+                    else:
+                        arm_obj[MAP_PROP] = entry[1]
+            except Exception as e:
+                failures.append(str(e))
+        if self.references is not None:
+            self.references.refresh(self.plan.mapping.values())
+        self.journal.clear()
+        self.bones_renamed = 0
+        self.vgs_renamed = 0
+        self.refs_rewritten = 0
+        self.groups_pruned = 0
+        if failures:
+            raise RuntimeError("Rollback incomplete: " + "; ".join(failures))
+
+# Last plan applied to each armature (by object pointer), reused for the matching revert
+_APPLIED_PLANS = {}
+
+def _remember_applied_plan(plan):
+    if plan.stored_after is None:
+        _APPLIED_PLANS.pop(plan.arm_ptr, None)
+    else:
+        _APPLIED_PLANS[plan.arm_ptr] = plan
+    # A freshly built rig mapping that applied cleanly is now validated
+    fingerprint = getattr(plan.mapping, "fingerprint", None)
+    if fingerprint and not plan.mapping.prevalidated and plan.stored_before is None:
+        remember_rig_mapping(fingerprint, plan.mapping)
+
+def apply_rename_plan(plan, timer=None, references=None):
+    plan.raise_if_invalid()
+    return RenameTransaction(plan, timer, references).run()
+
+def plan_conversion(arm_obj, mapping, meshes=None, stored=None, timer=None):
+    # With a stored mapping, `mapping` is only the delta. Vertex groups use the
+    # merged mapping so meshes that arrived with the new bones still carrying
+    # original names are converted too; already converted groups don't match.
+    merged = {**stored, **mapping} if stored else mapping
+    return plan_rename(arm_obj, mapping, meshes, vg_mapping=merged, stored_before=stored, stored_after=merged, timer=timer)
+
+def plan_revert(arm_obj, stored, meshes=None, timer=None):
+    """Reuses the reversed convert plan when the rig is still as that plan left it."""
+    if meshes is None:
+        meshes = scan_deforming_meshes(arm_obj, timer)
+    last = _APPLIED_PLANS.get(arm_obj.as_pointer())
+    if (
+        last is not None
+        and last.stored_before is None
+        and last.stored_after == stored
+        and last.layouts_after() == {obj.name: len(obj.vertex_groups) for obj in meshes}
+    ):
+        plan = last.reversed()
+        plan.errors = _bone_target_errors(arm_obj, plan.mapping)
+        return plan
+    return plan_rename(arm_obj, build_revert_map(stored), meshes, stored_before=stored, stored_after=None, timer=timer)
+
+def convert_armature(arm_obj, mapping, meshes=None, stored=None, timer=None, references=None):
+    return apply_rename_plan(plan_conversion(arm_obj, mapping, meshes, stored, timer), timer, references).vgs_renamed
+
+def revert_armature(arm_obj, stored, meshes=None, timer=None, references=None):
+    return apply_rename_plan(plan_revert(arm_obj, stored, meshes, timer), timer, references).vgs_renamed
+
+class RigStatus:
+    """What Convert/Revert would do to an armature right now, as shown in the panel."""
+
+    def __init__(self, state, bones_to_convert=0, bones_converted=0, meshes=0, collisions=(), data_ptr=0):
+        self.state = state  # 'ORIGINAL', 'PARTIAL', 'CONVERTED', 'NONE' or 'ERROR'
+        self.bones_to_convert = bones_to_convert
+        self.bones_converted = bones_converted
+        self.meshes = meshes
+        self.collisions = list(collisions)
+        self.data_ptr = data_ptr
+
+    @property
+    def can_convert(self):
+        return self.bones_to_convert > 0
+
+    @property
+    def can_revert(self):
+        return self.bones_converted > 0
+
+def compute_rig_status(arm_obj):
+    mapping, stored = plan_conversion_map(arm_obj)
+    meshes = get_deforming_meshes(arm_obj)
+    if mapping:
+        collisions = plan_conversion(arm_obj, mapping, meshes, stored).errors
+    elif stored:
+        collisions = plan_revert(arm_obj, stored, meshes).errors
+    else:
+        collisions = []
+    if stored:
+        state = 'PARTIAL' if mapping else 'CONVERTED'
+    else:
+        state = 'ORIGINAL' if mapping else 'NONE'
+    return RigStatus(state, len(mapping), len(stored or ()), len(meshes), collisions, arm_obj.data.as_pointer())
+
+# Armature object pointer -> RigStatus. Filled on first draw and dropped by
+# depsgraph updates touching the rig or its meshes, msgbus name changes and our
+# own transactions, so redraws never rescan.
+_RIG_STATUS = {}
+
+def get_rig_status(arm_obj):
+    key = arm_obj.as_pointer()
+    status = _RIG_STATUS.get(key)
+    if status is None:
+        try:
+            status = compute_rig_status(arm_obj)
+        except Exception as e:
+            status = RigStatus('ERROR', collisions=[str(e)], data_ptr=arm_obj.data.as_pointer())
+        _RIG_STATUS[key] = status
+    return status
+
+def invalidate_rig_status(*args):
+    _RIG_STATUS.clear()
+
+def invalidate_rig_status_for(ids):
+    """Drops the status of every armature affected by a change to the given original IDs."""
+    stale = set()
+    data_ptrs = set()
+    for id_data in ids:
+        if isinstance(id_data, bpy.types.Armature):
+            data_ptrs.add(id_data.as_pointer())
+        elif isinstance(id_data, bpy.types.Object):
+            ptr = id_data.as_pointer()
+            if id_data.type == 'ARMATURE':
+                stale.add(ptr)
+            elif id_data.type == 'MESH':
+                # Armatures it deformed before this update and the ones it deforms now
+                stale.update(_MESH_INDEX._by_mesh.get(ptr, ()))
+                stale.update(m.object.as_pointer() for m in id_data.modifiers if m.type == 'ARMATURE' and m.object is not None)
+    if data_ptrs:
+        stale.update(key for key, status in _RIG_STATUS.items() if status.data_ptr in data_ptrs)
+    for key in stale:
+        _RIG_STATUS.pop(key, None)
+
+_STATUS_MSGBUS_OWNER = object()
+
+def subscribe_rig_status_changes():
+    bpy.msgbus.clear_by_owner(_STATUS_MSGBUS_OWNER)
+    for key in ((bpy.types.Bone, "name"), (bpy.types.EditBone, "name"), (bpy.types.VertexGroup, "name")):
+        bpy.msgbus.subscribe_rna(key=key, owner=_STATUS_MSGBUS_OWNER, args=(), notify=invalidate_rig_status)
+
+def export_with_sims_names(arm_objs, export):
+    """
+    Reverts every converted armature in arm_objs, calls export() and then
+    restores the x-mirror names by rolling the revert journals back, so the
+    return trip needs no planning or scanning at all. The reverts reuse the
+    applied convert plans where still valid. Whatever fails, the armatures end
+    up x-mirror named as before. Returns the number of armatures reverted.
+    """
+    references = BoneReferenceIndex.build()
+    txns = []
+    try:
+        for arm_obj in arm_objs:
+            stored = load_mapping_from_armature(arm_obj)
+            if not stored:
+                continue
+            plan = plan_revert(arm_obj, stored)
+            plan.raise_if_invalid()
+            txn = RenameTransaction(plan, references=references)
+            txns.append(txn)
+            for _ in txn.steps():
+                pass
+        export()
+    except Exception:
+        _restore_after_export(txns)
+        raise
+    _restore_after_export(txns)
+    return len(txns)
+
+def _restore_after_export(txns):
+    failures = []
+    for txn in reversed(txns):
+        try:
+            txn.rollback()
+        except Exception as e:
+            failures.append(f"{txn.plan.arm_name}: {e}")
+    if failures:
+        raise RuntimeError("Could not restore x-mirror names: " + "; ".join(failures))
+
+BATCH_SCOPE_ITEMS = (
+    ("SELECTED", "Selected", "Selected armatures"),
+    ("COLLECTION", "Active Collection", "Armatures in the active collection and its children"),
+    ("ALL", "Whole File", "Every armature in the file"),
+)
+
+def collect_armatures(context, scope):
+    if scope == 'SELECTED':
+        objects = context.selected_objects
+    elif scope == 'COLLECTION':
+        objects = context.collection.all_objects
+    else:
+        objects = bpy.data.objects
+    return [obj for obj in objects if obj.type == 'ARMATURE']
+
+def run_batch_rename(context, arm_objs, revert=False):
+    """
+    Plan every armature first (mappings and deforming meshes), then apply all
+    renames inside a single switch to object mode, rewriting bone references
+    from one shared BoneReferenceIndex. Returns a list of per-armature
+    result dicts: {"name", "status", "bones", "vgs", "message"}.
+    """
+    results = []
+    planned = []
+    for arm_obj in arm_objs:
+        stored = None
+        if revert:
+            mapping = load_mapping_from_armature(arm_obj)
+            reason = t("error_no_mapping")
+        else:
+            mapping, stored = plan_conversion_map(arm_obj)
+            reason = t("info_no_targets")
+        if not mapping and not stored:
+            results.append({"name": arm_obj.name, "status": "SKIPPED", "bones": 0, "vgs": 0, "message": reason})
+            continue
+        planned.append((arm_obj, mapping, stored, get_deforming_meshes(arm_obj)))
+
+    if not planned:
+        return results
+
+    active = context.view_layer.objects.active
+    prev_mode = active.mode if active else 'OBJECT'
+    if prev_mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    try:
+        # One reference index serves every armature in the batch
+        references = BoneReferenceIndex.build()
+        for arm_obj, mapping, stored, meshes in planned:
+            try:
+                if revert:
+                    plan = plan_revert(arm_obj, mapping, meshes)
+                else:
+                    plan = plan_conversion(arm_obj, mapping, meshes, stored)
+                    if plan.is_empty:
+                        results.append({"name": arm_obj.name, "status": "SKIPPED", "bones": 0, "vgs": 0, "message": t("info_no_targets")})
+                        continue
+                    prune_before_convert(plan, arm_obj)
+                vgs = apply_rename_plan(plan, references=references).vgs_renamed
+            except Exception as e:
+                results.append({"name": arm_obj.name, "status": "FAILED", "bones": 0, "vgs": 0, "message": str(e)})
+                continue
+            results.append({
+                "name": arm_obj.name,
+                "status": "DONE",
+                "bones": len(mapping),
+                "vgs": vgs,
+                "meshes": len(plan.mesh_layouts),
+                "layouts": plan.layout_count,
+                "message": "",
+            })
+    finally:
+        if prev_mode != 'OBJECT':
+            try:
+                bpy.ops.object.mode_set(mode=prev_mode)
+            except Exception:
+                pass
+    return results
+
+def report_batch_results(op, results):
+    done = [r for r in results if r["status"] == "DONE"]
+    for r in results:
+        if r["status"] == "DONE":
+            op.report({'INFO'}, t("info_batch_item").format(name=r["name"], bones=r["bones"], vgs=r["vgs"]))
+        elif r["status"] == "SKIPPED":
+            op.report({'INFO'}, t("info_batch_skipped").format(name=r["name"], reason=r["message"]))
+        else:
+            op.report({'WARNING'}, t("error_batch_item").format(name=r["name"], err=r["message"]))
+    op.report({'INFO'}, t("info_batch_summary").format(
+        done=len(done),
+        total=len(results),
+        bones=sum(r["bones"] for r in done),
+        vgs=sum(r["vgs"] for r in done),
+    ))
+    if done:
+        # Layouts are planned per armature, so identical rigs each count theirs
+        op.report({'INFO'}, t("info_batch_layouts").format(
+            layouts=sum(r["layouts"] for r in done),
+            meshes=sum(r["meshes"] for r in done),
+            armatures=len(done),
+        ))
+
+# ---------------------------------------------------------------------------
+# Weight tools
+#
+# Blender has no bulk accessor for deform weights, so each mesh is read in one
+# pass over mesh.vertices into NumPy arrays (a dense (vertices, groups) array,
+# or the sparse (vertex, group, weight) entries for large meshes), processed as
+# whole arrays, and only the entries that changed are written back: one
+# VertexGroup.remove() per group for cleared weights and one VertexGroup.add()
+# per group and distinct weight value. Written weights are rounded to Sims 4's
+# 8-bit precision (1/255), so that is at most 255 calls per group however the
+# values were computed. The one exception is preserved_weights(), which puts
+# the original values back exactly: it writes only the entries the edit
+# changed, one call per distinct original value, so its cost grows with the
+# vertices the edit touched rather than with the mesh. Vertex positions are
+# read with foreach_get.
+# ---------------------------------------------------------------------------
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("NumPy is not available in this Blender build.")
+
+@contextmanager
+def object_mode(context):
+    """Switches the active object to object mode (weights live in BMesh while editing) and back."""
+    active = context.view_layer.objects.active
+    prev_mode = active.mode if active else 'OBJECT'
+    if prev_mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    try:
+        yield
+    finally:
+        if prev_mode != 'OBJECT':
+            try:
+                bpy.ops.object.mode_set(mode=prev_mode)
+            except Exception:
+                pass
+
+def read_vertex_coords(mesh):
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+def read_weight_entries(obj):
+    """Returns obj's deform weights as flat (vertex, group index, weight) arrays, read in one pass over the vertices."""
+    rows = []
+    cols = []
+    values = []
+    for v in obj.data.vertices:
+        for g in v.groups:
+            rows.append(v.index)
+            cols.append(g.group)
+            values.append(g.weight)
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64), np.asarray(values, dtype=np.float32)
+
+def read_weight_matrix(obj):
+    """Returns obj's deform weights as a float32 array of shape (vertices, vertex groups)."""
+    group_count = len(obj.vertex_groups)
+    weights = np.zeros((len(obj.data.vertices), group_count), dtype=np.float32)
+    rows, cols, values = read_weight_entries(obj)
+    valid = cols < group_count
+    weights[rows[valid], cols[valid]] = values[valid]
+    return weights
+
+# Sims 4 stores bone weights in 8 bits
+WEIGHT_STEPS = 255.0
+
+def _write_group(group, indices, values, quantize=True):
+    if quantize:
+        values = np.rint(values * WEIGHT_STEPS) / WEIGHT_STEPS
+    cleared = indices[values <= 0.0]
+    if cleared.size:
+        group.remove(cleared.tolist())
+    keep = values > 0.0
+    indices = indices[keep]
+    values = values[keep]
+    if indices.size:
+        order = np.argsort(values, kind="stable")
+        indices = indices[order]
+        values = values[order]
+        distinct, starts = np.unique(values, return_index=True)
+        ends = np.append(starts[1:], len(values))
+        for value, start, end in zip(distinct.tolist(), starts.tolist(), ends.tolist()):
+            group.add(indices[start:end].tolist(), value, 'REPLACE')
+
+def write_weight_matrix(obj, weights, previous, columns=None, quantize=True):
+    """Writes the entries of weights that differ from previous into obj's vertex groups. Returns how many changed."""
+    groups = obj.vertex_groups
+    if columns is None:
+        columns = range(weights.shape[1])
+    changed_total = 0
+    for col in columns:
+        new = weights[:, col]
+        changed = np.flatnonzero(new != previous[:, col])
+        if not changed.size:
+            continue
+        _write_group(groups[int(col)], changed, new[changed], quantize)
+        changed_total += int(changed.size)
+    return changed_total
+
+def write_weight_entries(obj, previous, entries, quantize=True):
+    """
+    Sparse counterpart of write_weight_matrix: previous and entries are
+    (vertex, group index, weight) arrays for the same groups, and the weights
+    that differ are written. Returns how many changed.
+    """
+    groups = obj.vertex_groups
+    group_count = len(groups)
+    old_keys = previous[0] * group_count + previous[1]
+    new_keys = entries[0] * group_count + entries[1]
+    keys = np.union1d(old_keys, new_keys)
+    before = np.zeros(len(keys), dtype=np.float32)
+    after = np.zeros(len(keys), dtype=np.float32)
+    before[np.searchsorted(keys, old_keys)] = previous[2]
+    after[np.searchsorted(keys, new_keys)] = entries[2]
+    changed = np.flatnonzero(before != after)
+    if not changed.size:
+        return 0
+    keys = keys[changed]
+    values = after[changed]
+    order = np.argsort(keys % group_count, kind="stable")
+    rows = keys[order] // group_count
+    cols = keys[order] % group_count
+    values = values[order]
+    distinct, starts = np.unique(cols, return_index=True)
+    ends = np.append(starts[1:], len(cols))
+    for col, start, end in zip(distinct.tolist(), starts.tolist(), ends.tolist()):
+        _write_group(groups[col], rows[start:end], values[start:end], quantize)
+    return int(changed.size)
+
+@contextmanager
+def preserved_weights(meshes):
+    """Puts the deform weights of meshes back on exit, for edits only an exported copy should get."""
+    saved = []
+    for obj in meshes:
+        rows, cols, values = read_weight_entries(obj)
+        valid = cols < len(obj.vertex_groups)
+        saved.append((obj, (rows[valid], cols[valid], values[valid])))
+    try:
+        yield
+    finally:
+        for obj, entries in saved:
+            rows, cols, values = read_weight_entries(obj)
+            valid = cols < len(obj.vertex_groups)
+            write_weight_entries(obj, (rows[valid], cols[valid], values[valid]), entries, quantize=False)
+
+def mirror_group_pairs(mapping):
+    """
+    Splits the x-mirror names of a stored mapping into ([(left, right)],
+    [center], [one-sided]) so tools can pair .L/.R groups and bones.
+    """
+    sides = {}
+    centers = []
+    for name in mapping.values():
+        if name.endswith((".L", ".R")):
+            sides.setdefault(name[:-2], {})[name[-1]] = name
+        else:
+            centers.append(name)
+    pairs = []
+    one_sided = []
+    for found in sides.values():
+        if len(found) == 2:
+            pairs.append((found["L"], found["R"]))
+        else:
+            one_sided.extend(found.values())
+    return pairs, centers, one_sided
+
+def build_mirror_table(coords, tolerance):
+    """For every vertex, the index of the vertex at its X-mirrored position (-1 if none within tolerance)."""
+    tree = KDTree(len(coords))
+    for i, co in enumerate(coords.tolist()):
+        tree.insert(co, i)
+    tree.balance()
+    mirror = np.full(len(coords), -1, dtype=np.int64)
+    flipped = coords * (-1.0, 1.0, 1.0)
+    for i, co in enumerate(flipped.tolist()):
+        _co, index, dist = tree.find(co)
+        if index is not None and dist <= tolerance:
+            mirror[i] = index
+    return mirror
+
+class MirrorTableCache:
+    """
+    X-mirror vertex tables per mesh datablock. A table stays valid while the
+    mesh's vertex positions are unchanged (checked with a digest of the
+    coordinates, which costs a foreach_get instead of a KD-tree build), so
+    weight edits and other non-geometry updates keep it.
+    """
+
+    def __init__(self):
+        self._tables = {}  # mesh ptr -> (tolerance, coords digest, mirror table)
+
+    def invalidate(self, mesh=None):
+        if mesh is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(mesh.as_pointer(), None)
+
+    def get(self, mesh, coords, tolerance):
+        key = mesh.as_pointer()
+        digest = hashlib.blake2b(coords.tobytes(), digest_size=16).digest()
+        cached = self._tables.get(key)
+        if cached is not None and cached[0] == tolerance and cached[1] == digest:
+            return cached[2]
+        mirror = build_mirror_table(coords, tolerance)
+        self._tables[key] = (tolerance, digest, mirror)
+        return mirror
+
+_MIRROR_TABLES = MirrorTableCache()
+
+def deforming_armature(obj):
+    """The armature object of obj's first Armature modifier, or None."""
+    for mod in obj.modifiers:
+        if mod.type == 'ARMATURE' and mod.object is not None and mod.object.type == 'ARMATURE':
+            return mod.object
+    return None
+
+def weight_tool_targets(context):
+    """
+    Returns (armature object, meshes) for the weight tools: every mesh deformed
+    by the active armature, or the active mesh and the armature deforming it.
+    (None, []) when neither applies.
+    """
+    obj = context.active_object
+    if obj is None:
+        return None, []
+    if obj.type == 'ARMATURE':
+        return obj, get_deforming_meshes(obj)
+    if obj.type == 'MESH':
+        arm_obj = deforming_armature(obj)
+        if arm_obj is not None:
+            return arm_obj, [obj]
+    return None, []
+
+# Vertex groups Sims 4 Studio expects on CAS meshes, kept even when empty
+S4S_REQUIRED_GROUPS = ("b__ROOT_bind__",)
+
+def protected_vertex_groups(obj, mapping=None):
+    """Group names on obj that must survive pruning: S4S requirements, user keeps and groups used by modifiers or shape keys."""
+    names = set(S4S_REQUIRED_GROUPS)
+    if mapping:
+        names.update(mapping[name] for name in S4S_REQUIRED_GROUPS if name in mapping)
+    prefs = get_addon_prefs()
+    if prefs is not None and prefs.keep_vertex_groups:
+        names.update(n.strip() for n in prefs.keep_vertex_groups.split(",") if n.strip())
+    for mod in obj.modifiers:
+        name = getattr(mod, "vertex_group", "")
+        if name:
+            names.add(name)
+    shape_keys = getattr(obj.data, "shape_keys", None)
+    if shape_keys is not None:
+        names.update(kb.vertex_group for kb in shape_keys.key_blocks if kb.vertex_group)
+    return names
+
+def find_empty_vertex_groups(obj, candidates, protected=()):
+    """Names of obj's groups in candidates that hold no non-zero weight, skipping protected names."""
+    _rows, cols, values = read_weight_entries(obj)
+    used = set(np.unique(cols[values > 0.0]).tolist())
+    return [g.name for g in obj.vertex_groups if g.index not in used and g.name in candidates and g.name not in protected]
+
+def prune_empty_vertex_groups(arm_obj, meshes=None, remove=True):
+    """
+    Finds the bone vertex groups without any weight on each mesh deformed by
+    arm_obj (in either naming), removing them unless remove is False. Groups
+    that don't belong to a bone are never touched.
+    Returns [(mesh object, [group names])].
+    """
+    require_numpy()
+    if meshes is None:
+        meshes = get_deforming_meshes(arm_obj)
+    mapping = load_mapping_from_armature(arm_obj) or {}
+    candidates = {b.name for b in arm_obj.data.bones}
+    candidates.update(mapping)
+    candidates.update(mapping.values())
+    results = []
+    for obj in meshes:
+        names = find_empty_vertex_groups(obj, candidates, protected_vertex_groups(obj, mapping))
+        if remove:
+            groups = obj.vertex_groups
+            for name in names:
+                groups.remove(groups[name])
+        results.append((obj, names))
+    return results
+
+def prune_before_convert(plan, arm_obj, timer=None):
+    """
+    Optional convert stage, when the preference asks for it: lists the empty
+    bone groups of a valid convert plan's meshes in plan.prune, so the
+    transaction removes them (and its rollback restores them).
+    Returns the number of groups planned for removal.
+    """
+    prefs = get_addon_prefs()
+    if prefs is None or not prefs.prune_before_convert or np is None or plan.errors:
+        return 0
+    timer = timer or _NULL_TIMER
+    with timer.phase("find_empty") as info:
+        results = prune_empty_vertex_groups(arm_obj, remove=False)
+        plan.prune = [(obj.name, names) for obj, names in results if names and obj.name in plan.mesh_layouts]
+        planned = sum(len(names) for _name, names in plan.prune)
+        info["groups"] = planned
+    return planned
+
+SYMMETRIZE_DIRECTION_ITEMS = (
+    ("L_TO_R", "Left to Right", "Copy .L weights (and the left half of center groups) onto the right side"),
+    ("R_TO_L", "Right to Left", "Copy .R weights (and the right half of center groups) onto the left side"),
+    ("AVERAGE", "Average", "Average each vertex with its mirror partner on both sides"),
+)
+
+def symmetrize_mesh_weights(obj, pairs, centers=(), direction='L_TO_R', tolerance=1e-4):
+    """
+    Mirrors obj's weights across X: between each (left, right) group pair and,
+    for center groups, between the two halves of the mesh. Vertices without a
+    mirror partner within tolerance are left alone. The groups involved are
+    rounded to 1/255 as a whole, so both sides stay exact mirrors.
+    Returns (weights changed, vertices without a partner).
+    """
+    require_numpy()
+    groups = obj.vertex_groups
+    left = [groups[l].index for l, r in pairs if l in groups and r in groups]
+    right = [groups[r].index for l, r in pairs if l in groups and r in groups]
+    center = [groups[c].index for c in centers if c in groups]
+    if not left and not center:
+        return 0, 0
+
+    coords = read_vertex_coords(obj.data)
+    mirror = _MIRROR_TABLES.get(obj.data, coords, tolerance)
+    matched = np.flatnonzero(mirror >= 0)
+    partner = mirror[matched]
+    before = read_weight_matrix(obj)
+    after = before.copy()
+
+    if direction == 'AVERAGE':
+        if left:
+            after[np.ix_(matched, left)] = (before[np.ix_(matched, left)] + before[np.ix_(partner, right)]) * 0.5
+            after[np.ix_(matched, right)] = (before[np.ix_(matched, right)] + before[np.ix_(partner, left)]) * 0.5
+        if center:
+            after[np.ix_(matched, center)] = (before[np.ix_(matched, center)] + before[np.ix_(partner, center)]) * 0.5
+    else:
+        source, target = (left, right) if direction == 'L_TO_R' else (right, left)
+        if source:
+            after[np.ix_(matched, target)] = before[np.ix_(partner, source)]
+        if center:
+            # The source half is the side carrying the source groups' weight (+X for .L in Blender)
+            x = coords[:, 0]
+            sign = 1.0 if direction == 'L_TO_R' else -1.0
+            if source:
+                mass = float((before[:, source].sum(axis=1) * x).sum())
+                if mass:
+                    sign = 1.0 if mass > 0.0 else -1.0
+            on_target = x[matched] * sign < -tolerance
+            rows = matched[on_target]
+            after[np.ix_(rows, center)] = before[np.ix_(partner[on_target], center)]
+
+    # Rounding sources and copies alike keeps the sides equal and the writes to 255 values per group
+    columns = sorted(set(left) | set(right) | set(center))
+    after[:, columns] = np.rint(after[:, columns] * WEIGHT_STEPS) / WEIGHT_STEPS
+    changed = write_weight_matrix(obj, after, before, columns=columns)
+    return changed, int(len(mirror) - len(matched))
+
+# Sims 4 meshes take at most this many bone influences per vertex
+SIMS4_MAX_INFLUENCES = 4
+
+def limit_mesh_influences(obj, deform_names, max_influences=SIMS4_MAX_INFLUENCES, pairs=(), mirror=False, tolerance=1e-4):
+    """
+    Keeps the strongest max_influences deform weights of every vertex of obj
+    and renormalizes them to sum to 1 (exactly, in 1/255 steps). With mirror
+    set, each vertex is first averaged with its X-mirror partner (.L and .R
+    swapped) and ties at the cut are broken the same way on both sides, so
+    mirrored vertices keep mirrored influences. Otherwise ties go to the group
+    listed first. Works on the (vertex, group, weight) entries, never on a
+    dense vertices x groups array.
+    Returns {"limited", "normalized", "unweighted", "weights"} counts.
+    """
+    require_numpy()
+    groups = obj.vertex_groups
+    group_count = len(groups)
+    vertex_count = len(obj.data.vertices)
+    result = {"limited": 0, "normalized": 0, "unweighted": 0, "weights": 0}
+    deform = np.zeros(group_count + 1, dtype=bool)
+    for g in groups:
+        if g.name in deform_names:
+            deform[g.index] = True
+    if not deform.any() or not vertex_count:
+        return result
+    rows, cols, values = read_weight_entries(obj)
+    keep = deform[np.minimum(cols, group_count)]
+    old = (rows[keep], cols[keep], values[keep])
+    live = old[2] > 0.0
+    rows, cols, values = old[0][live], old[1][live], old[2][live]
+
+    # Tie-break keys per group: rank shared by both groups of a pair, then side
+    rank = np.arange(group_count)
+    side = np.zeros(group_count, dtype=np.int8)  # +1 for .L, -1 for .R groups
+    mismatch = None
+    if mirror and pairs:
+        swap = np.arange(group_count)
+        for l, r in pairs:
+            if l in groups and r in groups and deform[groups[l].index] and deform[groups[r].index]:
+                li = groups[l].index
+                ri = groups[r].index
+                swap[li] = ri
+                swap[ri] = li
+                rank[ri] = rank[li]
+                side[li] = 1
+                side[ri] = -1
+        coords = read_vertex_coords(obj.data)
+        table = _MIRROR_TABLES.get(obj.data, coords, tolerance)
+        rows, cols, values = _mirror_average_entries(rows, cols, values, table, swap, group_count)
+        # Prefer the group on the vertex's own side, mirrored on the other half
+        near_side = np.where(coords[:, 0] >= 0.0, 1, -1).astype(np.int8)
+        mismatch = side[cols] != near_side[rows]
+
+    # Strongest first within each vertex
+    keys = [rank[cols], -values, rows]
+    if mismatch is not None:
+        keys.insert(0, mismatch)
+    order = np.lexsort(keys)
+    rows, cols, values = rows[order], cols[order], values[order]
+    if mismatch is not None:
+        mismatch = mismatch[order]
+    counts = np.bincount(rows, minlength=vertex_count)
+    position = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    kept = position < max_influences
+    rows, cols, values = rows[kept], cols[kept], values[kept]
+    if mismatch is not None:
+        mismatch = mismatch[kept]
+
+    sums = np.bincount(rows, weights=values, minlength=vertex_count)
+    over = counts > max_influences
+    normalize = ((sums > 0.0) & (np.abs(sums - 1.0) > 1e-5)) | over
+    selected = normalize[rows]
+    if selected.any():
+        values = values.copy()
+        values[selected] = _quantize_rows(
+            rows[selected], values[selected] / sums[rows[selected]],
+            [rank[cols[selected]]] + ([mismatch[selected]] if mismatch is not None else []),
+            vertex_count,
+        )
+
+    result["limited"] = int(np.count_nonzero(over))
+    result["normalized"] = int(np.count_nonzero(normalize))
+    result["unweighted"] = int(np.count_nonzero(sums <= 0.0))
+    result["weights"] = write_weight_entries(obj, old, (rows, cols, values))
+    return result
+
+def _mirror_average_entries(rows, cols, values, table, swap, group_count):
+    """Averages every vertex that has a mirror partner with the partner's entries, groups swapped."""
+    order = np.argsort(rows, kind="stable")
+    rows, cols, values = rows[order], cols[order], values[order]
+    starts = np.searchsorted(rows, np.arange(len(table) + 1))
+    matched = np.flatnonzero(table >= 0)
+    partner = table[matched]
+    lengths = starts[partner + 1] - starts[partner]
+    offsets = np.repeat(starts[partner] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    has_partner = table[rows] >= 0
+    all_rows = np.concatenate((rows, np.repeat(matched, lengths)))
+    all_cols = np.concatenate((cols, swap[cols[offsets]]))
+    all_values = np.concatenate((np.where(has_partner, values * 0.5, values), values[offsets] * 0.5))
+    keys, inverse = np.unique(all_rows * group_count + all_cols, return_inverse=True)
+    summed = np.bincount(inverse, weights=all_values).astype(np.float32)
+    return keys // group_count, keys % group_count, summed
+
+def _quantize_rows(rows, values, tie_keys, vertex_count):
+    """
+    Rounds weights summing to 1 per vertex to 1/255 steps that still sum to
+    exactly 1: each vertex's leftover steps go to its largest remainders.
+    """
+    units = values * WEIGHT_STEPS
+    base = np.floor(units)
+    remainder = units - base
+    deficit = np.rint(WEIGHT_STEPS - np.bincount(rows, weights=base, minlength=vertex_count)).astype(np.int64)
+    order = np.lexsort(list(tie_keys) + [-remainder, rows])
+    sorted_rows = rows[order]
+    position = np.arange(len(rows)) - np.searchsorted(sorted_rows, sorted_rows)
+    bump = np.zeros(len(rows))
+    bump[order] = position < deficit[sorted_rows]
+    return ((base + bump) / WEIGHT_STEPS).astype(np.float32)
+
+def deform_bone_names(arm_obj):
+    return {b.name for b in arm_obj.data.bones if b.use_deform}
+
+def limit_armature_influences(arm_obj, meshes=None, max_influences=SIMS4_MAX_INFLUENCES, mirror=False, tolerance=1e-4):
+    """Runs limit_mesh_influences over every mesh deformed by arm_obj. Returns summed counts plus "meshes"."""
+    if meshes is None:
+        meshes = get_deforming_meshes(arm_obj)
+    pairs = mirror_group_pairs(load_mapping_from_armature(arm_obj) or {})[0] if mirror else ()
+    deform_names = deform_bone_names(arm_obj)
+    totals = {"meshes": len(meshes), "limited": 0, "normalized": 0, "unweighted": 0, "weights": 0}
+    for obj in meshes:
+        for key, value in limit_mesh_influences(obj, deform_names, max_influences, pairs, mirror, tolerance).items():
+            totals[key] += value
+    return totals
+
+# Weight transfer from a reference body: one BVH tree per reference mesh,
+# nearest-surface lookups per target vertex, then barycentric interpolation of
+# the reference weights for all hits at once.
+
+def world_coords(obj):
+    coords = read_vertex_coords(obj.data)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    return coords @ matrix[:3, :3].T + matrix[:3, 3]
+
+def barycentric_weights(points, a, b, c):
+    """Barycentric coordinates (m, 3) of points on triangles (a, b, c), clamped to the triangle."""
+    v0 = b - a
+    v1 = c - a
+    v2 = points - a
+    d00 = (v0 * v0).sum(axis=1)
+    d01 = (v0 * v1).sum(axis=1)
+    d11 = (v1 * v1).sum(axis=1)
+    d20 = (v2 * v0).sum(axis=1)
+    d21 = (v2 * v1).sum(axis=1)
+    denom = d00 * d11 - d01 * d01
+    degenerate = np.abs(denom) < 1e-20
+    denom[degenerate] = 1.0
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    bary = np.stack((1.0 - v - w, v, w), axis=1)
+    bary[degenerate] = (1.0, 0.0, 0.0)
+    bary = np.clip(bary, 0.0, 1.0)
+    return bary / bary.sum(axis=1, keepdims=True)
+
+class ReferenceSurface:
+    """A reference mesh in world space: BVH tree, triangles and (refreshable) weights."""
+
+    def __init__(self, obj, coords, digest):
+        mesh = obj.data
+        mesh.calc_loop_triangles()
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int64)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        self.coords = coords
+        self.digest = digest
+        self.triangles = triangles.reshape(-1, 3)
+        self.tree = BVHTree.FromPolygons(coords.tolist(), self.triangles.tolist(), all_triangles=True)
+        self.group_names = []
+        self.weights = None
+
+    def refresh_weights(self, obj):
+        self.group_names = list(obj.vertex_groups.keys())
+        self.weights = read_weight_matrix(obj)
+
+    def sample(self, points, columns, max_distance=0.0):
+        """
+        Interpolates the reference weights of the given group columns at the
+        surface point nearest to each point. Returns (hit mask, weights for the
+        hit points); points farther than max_distance (if set) miss.
+        """
+        find_nearest = self.tree.find_nearest
+        faces = np.full(len(points), -1, dtype=np.int64)
+        locations = np.zeros((len(points), 3))
+        for i, co in enumerate(points.tolist()):
+            location, _normal, index, _dist = find_nearest(co, max_distance) if max_distance > 0.0 else find_nearest(co)
+            if index is not None:
+                faces[i] = index
+                locations[i] = location
+        hit = faces >= 0
+        tri = self.triangles[faces[hit]]
+        bary = barycentric_weights(locations[hit], self.coords[tri[:, 0]], self.coords[tri[:, 1]], self.coords[tri[:, 2]])
+        source = self.weights[:, columns]
+        sampled = source[tri[:, 0]] * bary[:, 0:1] + source[tri[:, 1]] * bary[:, 1:2] + source[tri[:, 2]] * bary[:, 2:3]
+        return hit, sampled.astype(np.float32)
+
+# Reference object pointer -> ReferenceSurface, kept while its world-space geometry is unchanged
+_REFERENCE_SURFACES = {}
+
+def get_reference_surface(obj):
+    """Returns the cached surface for obj (rebuilt when its geometry or transform changed) with fresh weights."""
+    require_numpy()
+    coords = world_coords(obj)
+    digest = hashlib.blake2b(coords.tobytes(), digest_size=16).digest()
+    key = obj.as_pointer()
+    surface = _REFERENCE_SURFACES.get(key)
+    if surface is None or surface.digest != digest or len(surface.coords) != len(coords):
+        surface = _REFERENCE_SURFACES[key] = ReferenceSurface(obj, coords, digest)
+    surface.refresh_weights(obj)
+    return surface
+
+def transfer_weights_from_reference(surface, obj, arm_obj, mapping=None, max_distance=0.0, replace=True):
+    """
+    Writes the reference weights sampled at obj's vertices into obj's groups of
+    arm_obj's bones. Reference groups in either naming are matched through
+    mapping; missing target groups are created. With replace, other bone
+    weights of the sampled vertices are cleared.
+    Returns (vertices transferred, vertices out of range).
+    """
+    mapping = mapping or {}
+    bone_names = {b.name for b in arm_obj.data.bones}
+    columns = []
+    names = []
+    for col, name in enumerate(surface.group_names):
+        target = name if name in bone_names else mapping.get(name)
+        if target in bone_names and target not in names:
+            columns.append(col)
+            names.append(target)
+    if not names or not len(obj.data.vertices):
+        return 0, 0
+
+    groups = obj.vertex_groups
+    for name in names:
+        if name not in groups:
+            groups.new(name=name)
+    hit, sampled = surface.sample(world_coords(obj), columns, max_distance)
+    rows = np.flatnonzero(hit)
+    before = read_weight_matrix(obj)
+    after = before.copy()
+    target_cols = [groups[name].index for name in names]
+    written = set(target_cols)
+    if replace:
+        bone_cols = [g.index for g in groups if g.name in bone_names]
+        after[np.ix_(rows, bone_cols)] = 0.0
+        written.update(bone_cols)
+    after[np.ix_(rows, target_cols)] = sampled
+    write_weight_matrix(obj, after, before, columns=sorted(written))
+    return int(rows.size), int(len(hit) - rows.size)
+
+TRANSFER_SCOPE_ITEMS = (
+    ("SELECTED", "Selected Meshes", "Selected meshes other than the active reference"),
+    ("ARMATURE", "Whole Rig", "Every mesh deformed by the armature of the selected meshes or the reference"),
+)
+
+# Rig symmetry validation: bone positions are read with foreach_get and every
+# .L/.R pair is compared in one array operation.
+
+SYMMETRY_TOLERANCE = 0.001
+
+class SymmetryReport:
+    """
+    Result of validate_rig_symmetry. missing lists .L/.R bones without a
+    partner, asymmetric holds (left, right, error) for pairs whose heads or
+    tails don't mirror across X, off_center holds (name, x) for center bones
+    away from X=0; both sorted worst first.
+    """
+
+    def __init__(self, pairs, centers, missing, asymmetric, off_center, tolerance):
+        self.pairs = pairs
+        self.centers = centers
+        self.missing = missing
+        self.asymmetric = asymmetric
+        self.off_center = off_center
+        self.tolerance = tolerance
+
+    @property
+    def ok(self):
+        return not (self.missing or self.asymmetric or self.off_center)
+
+    def summary(self):
+        if self.ok:
+            return t("symmetry_ok").format(pairs=self.pairs, centers=self.centers)
+        return t("symmetry_issues").format(missing=len(self.missing), asymmetric=len(self.asymmetric), off_center=len(self.off_center))
+
+    def issue_lines(self, limit=None):
+        lines = [t("symmetry_missing").format(name=name) for name in self.missing]
+        lines += [t("symmetry_pair").format(left=l, right=r, error=err) for l, r, err in self.asymmetric]
+        lines += [t("symmetry_center").format(name=name, x=x) for name, x in self.off_center]
+        return lines if limit is None else lines[:limit]
+
+def read_bone_positions(arm):
+    """Returns (names, heads, tails) of arm's bones in armature space, from edit bones while in edit mode."""
+    if arm.is_editmode:
+        bones, head_attr, tail_attr = arm.edit_bones, "head", "tail"
+    else:
+        bones, head_attr, tail_attr = arm.bones, "head_local", "tail_local"
+    count = len(bones)
+    heads = np.empty(count * 3, dtype=np.float64)
+    tails = np.empty(count * 3, dtype=np.float64)
+    bones.foreach_get(head_attr, heads)
+    bones.foreach_get(tail_attr, tails)
+    return [b.name for b in bones], heads.reshape(-1, 3), tails.reshape(-1, 3)
+
+def validate_rig_symmetry(arm_obj, mapping=None, tolerance=SYMMETRY_TOLERANCE):
+    """Checks the converted bones of arm_obj for X-mirror symmetry. Returns a SymmetryReport."""
+    require_numpy()
+    if mapping is None:
+        mapping = load_mapping_from_armature(arm_obj) or {}
+    names, heads, tails = read_bone_positions(arm_obj.data)
+    index = {name: i for i, name in enumerate(names)}
+    pairs, centers, one_sided = mirror_group_pairs(mapping)
+
+    missing = sorted(name for name in one_sided if name in index)
+    present = []
+    for l, r in pairs:
+        if l in index and r in index:
+            present.append((l, r))
+        elif l in index:
+            missing.append(l)
+        elif r in index:
+            missing.append(r)
+    centers = [name for name in centers if name in index]
+
+    asymmetric = []
+    if present:
+        left = np.array([index[l] for l, _r in present])
+        right = np.array([index[r] for _l, r in present])
+        flip = np.array((-1.0, 1.0, 1.0))
+        error = np.maximum(
+            np.linalg.norm(heads[left] * flip - heads[right], axis=1),
+            np.linalg.norm(tails[left] * flip - tails[right], axis=1),
+        )
+        for i in np.argsort(-error):
+            if error[i] <= tolerance:
+                break
+            asymmetric.append((present[i][0], present[i][1], float(error[i])))
+
+    off_center = []
+    if centers:
+        rows = np.array([index[name] for name in centers])
+        head_x = heads[rows, 0]
+        tail_x = tails[rows, 0]
+        worst_x = np.where(np.abs(head_x) >= np.abs(tail_x), head_x, tail_x)
+        offset = np.abs(worst_x)
+        for i in np.argsort(-offset):
+            if offset[i] <= tolerance:
+                break
+            off_center.append((centers[i], float(worst_x[i])))
+
+    return SymmetryReport(len(present), len(centers), missing, asymmetric, off_center, tolerance)
+
+# Last report per armature object pointer, shown in the panel while the armature stays converted
+_SYMMETRY_REPORTS = {}
+
+def get_symmetry_report(arm_obj):
+    if MAP_PROP not in arm_obj:
+        return None
+    return _SYMMETRY_REPORTS.get(arm_obj.as_pointer())
+
+def run_symmetry_check(op, arm_obj, tolerance=SYMMETRY_TOLERANCE):
+    """Validates arm_obj, keeps the report for the panel and warns through op when something is off."""
+    report = validate_rig_symmetry(arm_obj, tolerance=tolerance)
+    _SYMMETRY_REPORTS[arm_obj.as_pointer()] = report
+    if not report.ok:
+        op.report({'WARNING'}, f"{arm_obj.name}: {report.summary()}")
+    return report
+
+def symmetry_check_enabled():
+    prefs = get_addon_prefs()
+    return np is not None and (prefs is None or prefs.validate_symmetry)
+
+class S4_OT_ConvertNames(bpy.types.Operator):
+    bl_idname = "s4.rename_to_xmirror"
+    bl_label = "Convert (S4->Xmirror)"
+    bl_description = "Convert TheSims4-style bone names to Blender x-mirror-friendly names and rename related vertex groups"
+
+    def execute(self, context):
+        return run_instrumented(self, "convert", lambda timer: self._convert(context, timer))
+
+    def _convert(self, context, timer):
+        arm_obj = context.active_object
+        if not arm_obj or arm_obj.type != 'ARMATURE':
+            self.report({'ERROR'}, t("error_not_armature"))
+            return {'CANCELLED'}
+        with timer.phase("map") as info:
+            mapping, stored = plan_conversion_map(arm_obj)
+            info["bones"] = len(mapping)
+        if not mapping and not stored:
+            self.report({'INFO'}, t("info_no_targets"))
+            return {'CANCELLED'}
+        try:
+            plan = plan_conversion(arm_obj, mapping, stored=stored, timer=timer)
+            if plan.is_empty:
+                self.report({'INFO'}, t("info_no_targets"))
+                return {'CANCELLED'}
+            prune_before_convert(plan, arm_obj, timer)
+            txn = apply_rename_plan(plan, timer)
+        except Exception as e:
+            self.report({'ERROR'}, t("error_conversion").format(err=str(e)))
+            return {'CANCELLED'}
+        return report_convert_result(self, arm_obj, mapping, stored, txn)
+
+def report_layouts(op, plan):
+    if plan.mesh_layouts:
+        op.report({'INFO'}, t("info_layouts").format(layouts=plan.layout_count, meshes=len(plan.mesh_layouts)))
+
+def report_convert_result(op, arm_obj, mapping, stored, txn):
+    renamed_vg = txn.vgs_renamed
+    if txn.groups_pruned:
+        op.report({'INFO'}, t("info_pruned").format(groups=txn.groups_pruned, meshes=len(txn.plan.prune)))
+    report_layouts(op, txn.plan)
+    if stored:
+        op.report({'INFO'}, t("info_converted_incremental").format(bones=len(mapping), total=len(stored) + len(mapping), vgs=renamed_vg))
+    else:
+        op.report({'INFO'}, t("info_converted").format(bones=len(mapping), vgs=renamed_vg))
+    if symmetry_check_enabled():
+        run_symmetry_check(op, arm_obj)
+    return {'FINISHED'}
+
+class S4_OT_RevertNames(bpy.types.Operator):
+    bl_idname = "s4.revert_names"
+    bl_label = "Revert (Xmirror->S4)"
+    bl_description = "Revert bone names and vertex groups to the original names saved during conversion"
+
+    def execute(self, context):
+        return run_instrumented(self, "revert", lambda timer: self._revert(context, timer))
+
+    def _revert(self, context, timer):
+        arm_obj = context.active_object
+        if not arm_obj or arm_obj.type != 'ARMATURE':
+            self.report({'ERROR'}, t("error_not_armature"))
+            return {'CANCELLED'}
+        with timer.phase("load") as info:
+            mapping = load_mapping_from_armature(arm_obj)
+            info["bones"] = len(mapping) if mapping else 0
+        if not mapping:
+            self.report({'ERROR'}, t("error_no_mapping"))
+            return {'CANCELLED'}
+        try:
+            txn = apply_rename_plan(plan_revert(arm_obj, mapping, timer=timer), timer)
+        except Exception as e:
+            self.report({'ERROR'}, t("error_revert").format(err=str(e)))
+            return {'CANCELLED'}
+        report_layouts(self, txn.plan)
+        self.report({'INFO'}, t("info_reverted").format(bones=len(mapping), vgs=txn.vgs_renamed))
+        return {'FINISHED'}
+
+class _ModalRenameMixin:
+    """
+    Applies a RenameTransaction in time slices from a window-manager timer so
+    the UI stays responsive, with progress in the window manager. Esc cancels
+    and rolls back every completed chunk. execute() (scripts) runs it blocking.
+
+    Operators using it define kind and error_key (the LAST_RUN_STATS key and
+    the error message) and _prepare(context, timer), which returns
+    (RenamePlan, on_finish(op, txn) -> set) or None after reporting why not.
+    Timings and cProfile cover the planning and every tick, not the UI between.
+    """
+
+    # Seconds of work per timer tick; the rest of each tick goes to the UI
+    chunk_seconds = 0.05
+
+    def execute(self, context):
+        return run_instrumented(self, self.kind, lambda timer: self._execute(context, timer))
+
+    def _execute(self, context, timer):
+        prepared = self._prepare(context, timer)
+        if prepared is None:
+            return {'CANCELLED'}
+        plan, on_finish = prepared
+        try:
+            txn = apply_rename_plan(plan, timer)
+        except Exception as e:
+            self.report({'ERROR'}, t(self.error_key).format(err=str(e)))
+            return {'CANCELLED'}
+        return on_finish(self, txn)
+
+    def invoke(self, context, event):
+        self._run = InstrumentedRun(self.kind)
+        self._run.resume()
+        prepared = self._prepare(context, self._run.timer)
+        if prepared is None:
+            return self._finish({'CANCELLED'})
+        plan, self._on_finish = prepared
+        if plan.errors:
+            self.report({'ERROR'}, t(self.error_key).format(err=" ".join(plan.errors)))
+            return self._finish({'CANCELLED'})
+        self._txn = RenameTransaction(plan, self._run.timer)
+        self._steps = self._txn.steps()
+        self._done = 0
+        wm = context.window_manager
+        wm.progress_begin(0, self._txn.total_steps)
+        self._timer = wm.event_timer_add(0.001, window=context.window)
+        wm.modal_handler_add(self)
+        self._run.pause()
+        return {'RUNNING_MODAL'}
+
+    def _end(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+
+    def _finish(self, result):
+        self._run.finish(self)
+        return result
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self._end(context)
+            self._run.resume()
+            try:
+                self._txn.rollback()
+            except Exception as e:
+                self.report({'ERROR'}, t(self.error_key).format(err=str(e)))
+                return self._finish({'CANCELLED'})
+            self.report({'WARNING'}, t("info_modal_cancelled"))
+            return self._finish({'CANCELLED'})
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        self._run.resume()
+        deadline = time.perf_counter() + self.chunk_seconds
+        try:
+            while time.perf_counter() < deadline:
+                next(self._steps)
+                self._done += 1
+        except StopIteration:
+            self._end(context)
+            return self._finish(self._on_finish(self, self._txn.commit()))
+        except Exception as e:
+            self._end(context)
+            try:
+                self._txn.rollback()
+            except Exception as rollback_error:
+                e = rollback_error
+            self.report({'ERROR'}, t(self.error_key).format(err=str(e)))
+            return self._finish({'CANCELLED'})
+        self._run.pause()
+        context.window_manager.progress_update(self._done)
+        return {'RUNNING_MODAL'}
+
+class S4_OT_ConvertNamesModal(_ModalRenameMixin, bpy.types.Operator):
+    bl_idname = "s4.rename_to_xmirror_modal"
+    bl_label = "Convert (S4->Xmirror, with progress)"
+    bl_description = "Convert bone and vertex group names in chunks with a progress bar; Esc cancels and undoes the renames done so far"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    kind = "convert"
+    error_key = "error_conversion"
+
+    def _prepare(self, context, timer):
+        arm_obj = context.active_object
+        if not arm_obj or arm_obj.type != 'ARMATURE':
+            self.report({'ERROR'}, t("error_not_armature"))
+            return None
+        with timer.phase("map") as info:
+            mapping, stored = plan_conversion_map(arm_obj)
+            info["bones"] = len(mapping)
+        if not mapping and not stored:
+            self.report({'INFO'}, t("info_no_targets"))
+            return None
+        plan = plan_conversion(arm_obj, mapping, stored=stored, timer=timer)
+        if plan.is_empty:
+            self.report({'INFO'}, t("info_no_targets"))
+            return None
+        try:
+            prune_before_convert(plan, arm_obj, timer)
+        except Exception as e:
+            self.report({'ERROR'}, t("error_conversion").format(err=str(e)))
+            return None
+        return plan, lambda op, txn: report_convert_result(op, arm_obj, mapping, stored, txn)
+
+class S4_OT_RevertNamesModal(_ModalRenameMixin, bpy.types.Operator):
+    bl_idname = "s4.revert_names_modal"
+    bl_label = "Revert (Xmirror->S4, with progress)"
+    bl_description = "Revert bone and vertex group names in chunks with a progress bar; Esc cancels and undoes the renames done so far"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    kind = "revert"
+    error_key = "error_revert"
+
+    def _prepare(self, context, timer):
+        arm_obj = context.active_object
+        if not arm_obj or arm_obj.type != 'ARMATURE':
+            self.report({'ERROR'}, t("error_not_armature"))
+            return None
+        with timer.phase("load") as info:
+            mapping = load_mapping_from_armature(arm_obj)
+            info["bones"] = len(mapping) if mapping else 0
+        if not mapping:
+            self.report({'ERROR'}, t("error_no_mapping"))
+            return None
+        plan = plan_revert(arm_obj, mapping, timer=timer)
+
+        def on_finish(op, txn):
+            report_layouts(op, txn.plan)
+            op.report({'INFO'}, t("info_reverted").format(bones=len(mapping), vgs=txn.vgs_renamed))
+            return {'FINISHED'}
+        return plan, on_finish
+
+class S4_OT_ExportSimsNames(bpy.types.Operator):
+    bl_idname = "s4.export_sims_names"
+    bl_label = "Export with Sims 4 Names"
+    bl_description = "Save a copy of this file with the original Sims 4 bone and vertex group names for Sims 4 Studio. This file keeps its x-mirror names"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.blend", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            base = bpy.data.filepath or os.path.join(os.path.expanduser("~"), "untitled.blend")
+            self.filepath = output_path_for(base, CLI_DEFAULT_SUFFIX["revert"])
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        arm_objs = [obj for obj in bpy.data.objects if obj.type == 'ARMATURE' and MAP_PROP in obj]
+        if not arm_objs:
+            self.report({'ERROR'}, t("error_no_mapping"))
+            return {'CANCELLED'}
+        path = bpy.path.abspath(self.filepath)
+        prefs = get_addon_prefs()
+        limit = prefs is not None and prefs.limit_on_export
+        # Limited weights only go into the exported copy
+        meshes = {}
+        try:
+            if limit:
+                require_numpy()
+                for arm_obj in arm_objs:
+                    meshes.update((obj.as_pointer(), obj) for obj in get_deforming_meshes(arm_obj))
+            with object_mode(context), preserved_weights(meshes.values()):
+                totals = [limit_armature_influences(arm_obj) for arm_obj in arm_objs] if limit else []
+                count = export_with_sims_names(arm_objs, lambda: bpy.ops.wm.save_as_mainfile(filepath=path, copy=True))
+        except Exception as e:
+            self.report({'ERROR'}, t("error_export").format(err=str(e)))
+            return {'CANCELLED'}
+        for limit_totals in totals:
+            report_limit_totals(self, limit_totals)
+        self.report({'INFO'}, t("info_exported").format(path=path, count=count))
+        return {'FINISHED'}
+
+class S4_OT_BatchConvertNames(bpy.types.Operator):
+    bl_idname = "s4.batch_rename_to_xmirror"
+    bl_label = "Batch Convert (S4->Xmirror)"
+    bl_description = "Convert every armature in the chosen scope to x-mirror-friendly names"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: bpy.props.EnumProperty(name="Scope", items=BATCH_SCOPE_ITEMS, default="SELECTED")
+
+    def execute(self, context):
+        arm_objs = collect_armatures(context, self.scope)
+        if not arm_objs:
+            self.report({'ERROR'}, t("error_no_armatures"))
+            return {'CANCELLED'}
+        results = run_batch_rename(context, arm_objs, revert=False)
+        report_batch_results(self, results)
+        if not any(r["status"] == "DONE" for r in results):
+            return {'CANCELLED'}
+        if symmetry_check_enabled():
+            done = {r["name"] for r in results if r["status"] == "DONE"}
+            for arm_obj in arm_objs:
+                if arm_obj.name in done:
+                    run_symmetry_check(self, arm_obj)
+        return {'FINISHED'}
+
+class S4_OT_BatchRevertNames(bpy.types.Operator):
+    bl_idname = "s4.batch_revert_names"
+    bl_label = "Batch Revert (Xmirror->S4)"
+    bl_description = "Revert every converted armature in the chosen scope to its original names"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: bpy.props.EnumProperty(name="Scope", items=BATCH_SCOPE_ITEMS, default="SELECTED")
+
+    def execute(self, context):
+        arm_objs = collect_armatures(context, self.scope)
+        if not arm_objs:
+            self.report({'ERROR'}, t("error_no_armatures"))
+            return {'CANCELLED'}
+        results = run_batch_rename(context, arm_objs, revert=True)
+        report_batch_results(self, results)
+        if not any(r["status"] == "DONE" for r in results):
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class S4_OT_SymmetrizeWeights(bpy.types.Operator):
+    bl_idname = "s4.symmetrize_weights"
+    bl_label = "Symmetrize Weights"
+    bl_description = "Mirror vertex weights across X between the .L/.R groups of a converted rig (active armature's meshes, or the active mesh)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    direction: bpy.props.EnumProperty(name="Direction", items=SYMMETRIZE_DIRECTION_ITEMS, default='L_TO_R')
+    include_center: bpy.props.BoolProperty(
+        name="Center Groups",
+        description="Also mirror groups of center bones between the two halves of the mesh",
+        default=True,
+    )
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Maximum distance between a vertex and the mirrored position of its partner",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+    )
+
+    def execute(self, context):
+        arm_obj, meshes = weight_tool_targets(context)
+        if arm_obj is None:
+            self.report({'ERROR'}, t("error_weight_target"))
+            return {'CANCELLED'}
+        mapping = load_mapping_from_armature(arm_obj)
+        if not mapping:
+            self.report({'ERROR'}, t("error_no_mapping"))
+            return {'CANCELLED'}
+        pairs, centers, _one_sided = mirror_group_pairs(mapping)
+        if not self.include_center:
+            centers = []
+        changed = 0
+        unmatched = 0
+        try:
+            with object_mode(context):
+                for obj in meshes:
+                    c, u = symmetrize_mesh_weights(obj, pairs, centers, self.direction, self.tolerance)
+                    changed += c
+                    unmatched += u
+        except Exception as e:
+            self.report({'ERROR'}, t("error_weights").format(err=str(e)))
+            return {'CANCELLED'}
+        self.report({'INFO'}, t("info_symmetrized").format(meshes=len(meshes), weights=changed, unmatched=unmatched))
+        return {'FINISHED'}
+
+class S4_OT_LimitInfluences(bpy.types.Operator):
+    bl_idname = "s4.limit_influences"
+    bl_label = "Limit Influences"
+    bl_description = "Keep the strongest bone influences per vertex (4 for Sims 4) and normalize weights to sum to 1 on the meshes deformed by the active armature (or the active mesh)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_influences: bpy.props.IntProperty(
+        name="Max Influences",
+        description="Bone influences kept per vertex",
+        default=SIMS4_MAX_INFLUENCES,
+        min=1,
+        max=8,
+    )
+    mirror_consistent: bpy.props.BoolProperty(
+        name="Mirror Consistent",
+        description="Average each vertex with its X-mirror partner first so .L/.R sides keep matching influences",
+        default=False,
+    )
+    tolerance: bpy.props.FloatProperty(
+        name="Mirror Tolerance",
+        description="Maximum distance between a vertex and the mirrored position of its partner",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+    )
+
+    def execute(self, context):
+        arm_obj, meshes = weight_tool_targets(context)
+        if arm_obj is None:
+            self.report({'ERROR'}, t("error_weight_target"))
+            return {'CANCELLED'}
+        if self.mirror_consistent and not load_mapping_from_armature(arm_obj):
+            self.report({'ERROR'}, t("error_no_mapping"))
+            return {'CANCELLED'}
+        try:
+            with object_mode(context):
+                totals = limit_armature_influences(arm_obj, meshes, self.max_influences, self.mirror_consistent, self.tolerance)
+        except Exception as e:
+            self.report({'ERROR'}, t("error_weights").format(err=str(e)))
+            return {'CANCELLED'}
+        report_limit_totals(self, totals, self.max_influences)
+        return {'FINISHED'}
+
+def report_limit_totals(op, totals, max_influences=SIMS4_MAX_INFLUENCES):
+    op.report({'INFO'}, t("info_limited").format(max=max_influences, **totals))
+    if totals["unweighted"]:
+        op.report({'WARNING'}, t("warn_unweighted").format(count=totals["unweighted"]))
+
+class S4_OT_TransferWeights(bpy.types.Operator):
+    bl_idname = "s4.transfer_weights"
+    bl_label = "Transfer Weights from Reference"
+    bl_description = "Copy weights from the active reference mesh (e.g. the base body) onto the selected meshes deformed by a converted armature, interpolated at the nearest surface point"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    target_scope: bpy.props.EnumProperty(name="Targets", items=TRANSFER_SCOPE_ITEMS, default='SELECTED')
+    max_distance: bpy.props.FloatProperty(
+        name="Max Distance",
+        description="Leave vertices farther than this from the reference untouched (0: no limit)",
+        default=0.0,
+        min=0.0,
+        subtype='DISTANCE',
+    )
+    replace: bpy.props.BoolProperty(
+        name="Replace",
+        description="Clear the other bone weights of every vertex that receives weights",
+        default=True,
+    )
+    limit: bpy.props.BoolProperty(
+        name="Limit to 4 Influences",
+        description="Limit and normalize the transferred weights for Sims 4",
+        default=True,
+    )
+    mirror: bpy.props.BoolProperty(
+        name="Mirror Symmetric",
+        description="Make the transferred weights symmetric across X between .L/.R groups",
+        default=False,
+    )
+    tolerance: bpy.props.FloatProperty(
+        name="Mirror Tolerance",
+        description="Maximum distance between a vertex and the mirrored position of its partner",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+    )
+
+    def _targets(self, context, reference):
+        meshes = [obj for obj in context.selected_objects if obj.type == 'MESH' and obj is not reference]
+        if self.target_scope == 'ARMATURE':
+            seen = {obj.as_pointer() for obj in meshes}
+            seen.add(reference.as_pointer())
+            armatures = {deforming_armature(obj) for obj in meshes + [reference]} - {None}
+            for arm_obj in armatures:
+                for obj in get_deforming_meshes(arm_obj):
+                    if obj.as_pointer() not in seen:
+                        seen.add(obj.as_pointer())
+                        meshes.append(obj)
+        return meshes
+
+    def execute(self, context):
+        reference = context.active_object
+        targets = self._targets(context, reference) if reference is not None and reference.type == 'MESH' else []
+        if not targets:
+            self.report({'ERROR'}, t("error_transfer_reference"))
+            return {'CANCELLED'}
+        done = transferred = missed = skipped = 0
+        try:
+            with object_mode(context):
+                surface = get_reference_surface(reference)
+                for obj in targets:
+                    arm_obj = deforming_armature(obj)
+                    mapping = load_mapping_from_armature(arm_obj) if arm_obj is not None else None
+                    if not mapping:
+                        skipped += 1
+                        continue
+                    hits, misses = transfer_weights_from_reference(surface, obj, arm_obj, mapping, self.max_distance, self.replace)
+                    transferred += hits
+                    missed += misses
+                    done += 1
+                    pairs, centers, _one_sided = mirror_group_pairs(mapping)
+                    if self.mirror:
+                        symmetrize_mesh_weights(obj, pairs, centers, 'AVERAGE', self.tolerance)
+                    if self.limit:
+                        limit_mesh_influences(obj, deform_bone_names(arm_obj), SIMS4_MAX_INFLUENCES, pairs, self.mirror, self.tolerance)
+        except Exception as e:
+            self.report({'ERROR'}, t("error_weights").format(err=str(e)))
+            return {'CANCELLED'}
+        if skipped:
+            self.report({'WARNING'}, t("warn_transfer_skipped").format(count=skipped))
+        if not done:
+            return {'CANCELLED'}
+        self.report({'INFO'}, t("info_transferred").format(meshes=done, vertices=transferred, missed=missed))
+        return {'FINISHED'}
+
+class S4_OT_PruneEmptyGroups(bpy.types.Operator):
+    bl_idname = "s4.prune_empty_vertex_groups"
+    bl_label = "Remove Empty Vertex Groups"
+    bl_description = "Remove bone vertex groups without any weight from the meshes deformed by the active armature (or the active mesh). Groups Sims 4 Studio needs are kept"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    list_only: bpy.props.BoolProperty(
+        name="List Only",
+        description="Report the empty groups without removing them",
+        default=False,
+    )
+
+    def execute(self, context):
+        arm_obj, meshes = weight_tool_targets(context)
+        if arm_obj is None:
+            self.report({'ERROR'}, t("error_weight_target"))
+            return {'CANCELLED'}
+        try:
+            with object_mode(context):
+                results = prune_empty_vertex_groups(arm_obj, meshes, remove=not self.list_only)
+        except Exception as e:
+            self.report({'ERROR'}, t("error_weights").format(err=str(e)))
+            return {'CANCELLED'}
+        affected = [(obj, names) for obj, names in results if names]
+        for obj, names in affected:
+            self.report({'INFO'}, t("info_pruned_mesh").format(name=obj.name, count=len(names), groups=", ".join(names)))
+        total = sum(len(names) for _obj, names in affected)
+        key = "info_empty_found" if self.list_only else "info_pruned"
+        self.report({'INFO'}, t(key).format(groups=total, meshes=len(affected)))
+        return {'FINISHED'}
+
+class S4_OT_ValidateSymmetry(bpy.types.Operator):
+    bl_idname = "s4.validate_symmetry"
+    bl_label = "Check Symmetry"
+    bl_description = "Check that every .L bone has a .R partner mirrored across X and that center bones sit on X=0"
+
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Maximum distance between a bone and its mirrored partner",
+        default=SYMMETRY_TOLERANCE,
+        min=0.0,
+        precision=4,
+    )
+
+    def execute(self, context):
+        arm_obj = context.active_object
+        if not arm_obj or arm_obj.type != 'ARMATURE':
+            self.report({'ERROR'}, t("error_not_armature"))
+            return {'CANCELLED'}
+        if not load_mapping_from_armature(arm_obj):
+            self.report({'ERROR'}, t("error_no_mapping"))
+            return {'CANCELLED'}
+        try:
+            report = run_symmetry_check(self, arm_obj, self.tolerance)
+        except Exception as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if report.ok:
+            self.report({'INFO'}, report.summary())
+        else:
+            for line in report.issue_lines(limit=20):
+                self.report({'WARNING'}, line)
+        return {'FINISHED'}
+
+_RIG_STATE_ICONS = {
+    'ORIGINAL': 'ARMATURE_DATA',
+    'PARTIAL': 'INFO',
+    'CONVERTED': 'CHECKMARK',
+    'NONE': 'QUESTION',
+    'ERROR': 'ERROR',
+}
+
+def draw_rig_status(layout, status):
+    if status.state == 'ERROR':
+        layout.label(text=t("status_error").format(err=status.collisions[0]), icon='ERROR')
+        return
+    key = {
+        'ORIGINAL': "status_original",
+        'PARTIAL': "status_partial",
+        'CONVERTED': "status_converted",
+        'NONE': "status_none",
+    }[status.state]
+    layout.label(text=t(key).format(pending=status.bones_to_convert, converted=status.bones_converted), icon=_RIG_STATE_ICONS[status.state])
+    layout.label(text=t("status_meshes").format(meshes=status.meshes))
+    if status.collisions:
+        layout.label(text=t("status_collisions").format(count=len(status.collisions)), icon='ERROR')
+        for message in status.collisions[:3]:
+            layout.label(text=message)
+
+class S4_PT_Panel(bpy.types.Panel):
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "S4 Rename"
+    bl_label = "S4 Rename"
+
+    def draw(self, context):
+        layout = self.layout
+        # Localized panel title
+        layout.label(text=t("panel_title"))
+        col = layout.column(align=True)
+        arm_obj = context.active_object
+        status = get_rig_status(arm_obj) if arm_obj and arm_obj.type == 'ARMATURE' else None
+        if status is None:
+            col.label(text=t("active_required"))
+        else:
+            draw_rig_status(col.box(), status)
+        # Single Convert / Revert buttons (localized); chunked variants with progress by default
+        prefs = get_addon_prefs()
+        use_modal = prefs is None or prefs.use_modal_operators
+        row = col.row()
+        row.enabled = status is None or status.can_convert or status.state == 'ERROR'
+        row.operator("s4.rename_to_xmirror_modal" if use_modal else "s4.rename_to_xmirror", text=t("convert_button"), icon='SNAP_ON')
+        row = col.row()
+        row.enabled = status is None or status.can_revert or status.state == 'ERROR'
+        row.operator("s4.revert_names_modal" if use_modal else "s4.revert_names", text=t("revert_button"), icon='LOOP_BACK')
+        row = col.row()
+        row.enabled = status is None or status.can_revert
+        row.operator("s4.export_sims_names", text=t("export_button"), icon='EXPORT')
+        col.separator()
+        col.operator_menu_enum("s4.batch_rename_to_xmirror", "scope", text=t("batch_convert_button"), icon='SNAP_ON')
+        col.operator_menu_enum("s4.batch_revert_names", "scope", text=t("batch_revert_button"), icon='LOOP_BACK')
+        col.separator()
+        col.operator_menu_enum("s4.symmetrize_weights", "direction", text=t("symmetrize_button"), icon='MOD_MIRROR')
+        col.operator("s4.transfer_weights", text=t("transfer_button"), icon='MOD_DATA_TRANSFER')
+        col.operator("s4.limit_influences", text=t("limit_button"), icon='MOD_VERTEX_WEIGHT')
+        col.operator("s4.prune_empty_vertex_groups", text=t("prune_button"), icon='TRASH')
+        col.operator("s4.validate_symmetry", text=t("validate_button"), icon='CHECKMARK')
+        report = get_symmetry_report(arm_obj) if status is not None else None
+        if report is not None:
+            box = col.box()
+            box.label(text=report.summary(), icon='CHECKMARK' if report.ok else 'ERROR')
+            for line in report.issue_lines(limit=5):
+                box.label(text=line)
+        col.separator()
+        col.label(text=t("processing"))
+        col.label(text=t("remove_b_prefix"))
+        col.label(text=t("convert_side"))
+        col.label(text=t("center_keep"))
+
+class S4_AddonPreferences(bpy.types.AddonPreferences):
+    bl_idname = __name__
+    language: bpy.props.EnumProperty(
+        name="Language",
+        items=(
+            ("AUTO", "Auto", "Use Blender language preference"),
+            ("EN", "English", "Force English UI"),
+            ("JA", "日本語", "Force Japanese UI"),
+            ("ES", "Español", "Force Spanish UI"),
+            ("FR", "Français", "Force French UI"),
+            ("DE", "Deutsch", "Force German UI"),
+            ("ZH", "中文", "Force Chinese (Simplified) UI"),
+            ("PT", "Português", "Force Portuguese UI"),
+            ("RU", "Русский", "Force Russian UI"),
+            ("KO", "한국어", "Force Korean UI"),
+            ("IT", "Italiano", "Force Italian UI"),
+        ),
+        default="AUTO",
+        update=invalidate_language_cache,
+    )
+    rule_set: bpy.props.EnumProperty(
+        name="Naming Rules",
+        items=[(rs.key, rs.label, rs.description) for rs in RULE_SETS.values()],
+        default=DEFAULT_RULE_SET,
+        update=invalidate_rig_status,
+    )
+    use_modal_operators: bpy.props.BoolProperty(
+        name="Show Progress",
+        description="Panel buttons convert/revert in chunks with a progress bar and can be cancelled with Esc",
+        default=True,
+    )
+    validate_symmetry: bpy.props.BoolProperty(
+        name="Check Symmetry After Convert",
+        description="Validate .L/.R bone pairs and center bones after every Convert and show the result in the panel",
+        default=True,
+    )
+    limit_on_export: bpy.props.BoolProperty(
+        name="Limit Influences on Export",
+        description="Limit every vertex to 4 bone influences and normalize weights in the copy saved by Export with Sims 4 Names. This file keeps its weights",
+        default=False,
+    )
+    prune_before_convert: bpy.props.BoolProperty(
+        name="Remove Empty Groups on Convert",
+        description="Remove bone vertex groups without any weight before converting (they are not recreated by Revert)",
+        default=False,
+    )
+    keep_vertex_groups: bpy.props.StringProperty(
+        name="Always Keep",
+        description="Comma-separated vertex group names never removed as empty",
+        default="",
+    )
+    use_rig_cache: bpy.props.BoolProperty(
+        name="Cache Known Rigs",
+        description="Reuse the mapping of rigs converted before (matched by a fingerprint of their bone names)",
+        default=True,
+    )
+    profile_timings: bpy.props.BoolProperty(
+        name="Report Phase Timings",
+        description="Time each phase of Convert/Revert and show it in the Info report",
+        default=False,
+    )
+    profile_cprofile: bpy.props.BoolProperty(
+        name="Capture cProfile",
+        description="Run Convert/Revert under cProfile and dump the stats to a file",
+        default=False,
+    )
+    profile_dump_path: bpy.props.StringProperty(
+        name="Profile Output",
+        description="cProfile stats file (empty: system temp directory)",
+        subtype='FILE_PATH',
+        default="",
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text=t("pref_label"))
+        row = layout.row()
+        row.prop(self, "language", text=t("pref_language"))
+        row = layout.row()
+        row.prop(self, "rule_set", text=t("pref_rule_set"))
+        col = layout.column()
+        col.prop(self, "use_modal_operators", text=t("pref_modal"))
+        col.prop(self, "validate_symmetry", text=t("pref_validate_symmetry"))
+        col.prop(self, "limit_on_export", text=t("pref_limit_export"))
+        col.prop(self, "prune_before_convert", text=t("pref_prune"))
+        col.prop(self, "keep_vertex_groups", text=t("pref_keep_groups"))
+        col.prop(self, "use_rig_cache", text=t("pref_rig_cache"))
+        col.prop(self, "profile_timings", text=t("pref_profile_timings"))
+        col.prop(self, "profile_cprofile", text=t("pref_profile_cprofile"))
+        sub = col.row()
+        sub.active = self.profile_cprofile
+        sub.prop(self, "profile_dump_path", text=t("pref_profile_path"))
+        layout.label(text=t("lang_auto"))
+        # Show sample language names
+        layout.label(text=t("lang_en"))
+        layout.label(text=t("lang_ja"))
+
+classes = (
+    S4_OT_ConvertNames,
+    S4_OT_RevertNames,
+    S4_OT_ConvertNamesModal,
+    S4_OT_RevertNamesModal,
+    S4_OT_ExportSimsNames,
+    S4_OT_BatchConvertNames,
+    S4_OT_BatchRevertNames,
+    S4_OT_SymmetrizeWeights,
+    S4_OT_LimitInfluences,
+    S4_OT_TransferWeights,
+    S4_OT_PruneEmptyGroups,
+    S4_OT_ValidateSymmetry,
+    S4_PT_Panel,
+    S4_AddonPreferences,
+)
+
+# ---------------------------------------------------------------------------
+# Headless batch CLI
+#
+#   blender -b --python sim4_xmirror_renamer.py -- convert path/to/dir "cas/*.blend"
+#
+# The orchestrator expands the inputs and keeps one background Blender per
+# core busy (each job is its own process; the pool only schedules them).
+# Every worker opens one file, converts/reverts all armatures in it, saves a
+# copy with the output suffix and prints one CLI_RESULT_PREFIX JSON line.
+# ---------------------------------------------------------------------------
+
+CLI_RESULT_PREFIX = "S4RENAME_RESULT "
+CLI_DEFAULT_SUFFIX = {"convert": "_xmirror", "revert": "_s4"}
+
+def collect_blend_files(inputs, recursive=False):
+    files = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*.blend") if recursive else os.path.join(item, "*.blend")
+            matches = sorted(glob.glob(pattern, recursive=recursive))
+        else:
+            matches = sorted(glob.glob(item, recursive=recursive))
+        for path in matches:
+            path = os.path.abspath(path)
+            if path.endswith(".blend") and path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files
+
+def output_path_for(path, suffix):
+    root, ext = os.path.splitext(path)
+    return root + suffix + ext
+
+def blender_subprocess_worker(path, mode, suffix, blender=None):
+    blender = blender or bpy.app.binary_path
+    cmd = [
+        blender, "-b", "--factory-startup", path,
+        "--python", os.path.abspath(__file__),
+        "--", "--worker", mode, "--suffix", suffix,
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith(CLI_RESULT_PREFIX):
+            return json.loads(line[len(CLI_RESULT_PREFIX):])
+    err = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+    return {
+        "file": path,
+        "status": "FAILED",
+        "message": f"Blender exited with code {proc.returncode}: " + " | ".join(err),
+    }
+
+def run_batch_files(files, mode, suffix, jobs=None, worker=None):
+    """
+    Run worker(path, mode, suffix) for every file with up to `jobs` in flight
+    (default: one per core). Results come back in input order with the wall
+    time of each job in "seconds". worker defaults to blender_subprocess_worker.
+    """
+    worker = worker or blender_subprocess_worker
+    jobs = jobs or os.cpu_count() or 1
+
+    def run_one(path):
+        start = time.perf_counter()
+        try:
+            result = worker(path, mode, suffix)
+        except Exception as e:
+            result = {"file": path, "status": "FAILED", "message": str(e)}
+        result.setdefault("file", path)
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(run_one, files))
+
+def process_open_file(mode, suffix):
+    """Worker side: convert/revert every armature in the loaded .blend and save a copy."""
+    path = bpy.data.filepath
+    arm_objs = [obj for obj in bpy.data.objects if obj.type == 'ARMATURE']
+    results = run_batch_rename(bpy.context, arm_objs, revert=(mode == "revert"))
+    out_path = output_path_for(path, suffix)
+    changed = any(r["status"] == "DONE" for r in results)
+    failed = any(r["status"] == "FAILED" for r in results)
+    if changed:
+        bpy.ops.wm.save_as_mainfile(filepath=out_path, copy=True)
+    return {
+        "file": path,
+        "output": out_path if changed else None,
+        "status": "FAILED" if failed else ("DONE" if changed else "SKIPPED"),
+        "armatures": results,
+    }
+
+def _build_cli_parser():
+    parser = argparse.ArgumentParser(
+        prog="blender -b --python sim4_xmirror_renamer.py --",
+        description="Convert or revert Sims 4 bone/vertex group names in many .blend files.",
+    )
+    parser.add_argument("mode", choices=("convert", "revert"))
+    parser.add_argument("inputs", nargs="*", help="Directories or glob patterns of .blend files")
+    parser.add_argument("--suffix", default=None, help="Suffix for saved copies (default: _xmirror / _s4)")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel Blender processes (default: CPU count)")
+    parser.add_argument("--recursive", action="store_true", help="Search directories recursively")
+    parser.add_argument("--blender", default=None, help="Blender executable for workers (default: this Blender)")
+    parser.add_argument("--report", default=None, help="Write the JSON summary to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+def cli_main(argv):
+    args = _build_cli_parser().parse_args(argv)
+    suffix = args.suffix if args.suffix is not None else CLI_DEFAULT_SUFFIX[args.mode]
+
+    if args.worker:
+        try:
+            result = process_open_file(args.mode, suffix)
+        except Exception as e:
+            result = {"file": bpy.data.filepath, "status": "FAILED", "message": str(e)}
+        print(CLI_RESULT_PREFIX + json.dumps(result), flush=True)
+        return 0 if result["status"] != "FAILED" else 1
+
+    files = [f for f in collect_blend_files(args.inputs, args.recursive) if not f.endswith(suffix + ".blend")]
+    if not files:
+        print("No .blend files matched.", file=sys.stderr)
+        return 2
+
+    def worker(path, mode, sfx):
+        return blender_subprocess_worker(path, mode, sfx, blender=args.blender)
+
+    results = run_batch_files(files, args.mode, suffix, jobs=args.jobs, worker=worker)
+    summary = {
+        "mode": args.mode,
+        "suffix": suffix,
+        "files": results,
+        "done": sum(1 for r in results if r["status"] == "DONE"),
+        "skipped": sum(1 for r in results if r["status"] == "SKIPPED"),
+        "failed": sum(1 for r in results if r["status"] == "FAILED"),
+    }
+    text = json.dumps(summary, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 1 if summary["failed"] else 0
 
 def register():
     for c in classes:
         bpy.utils.register_class(c)
+    for attr, handler in _HANDLERS:
+        handlers = getattr(bpy.app.handlers, attr)
+        if handler not in handlers:
+            handlers.append(handler)
+    _MESH_INDEX.invalidate()
+    subscribe_language_changes()
+    subscribe_rig_status_changes()
+    invalidate_language_cache()
 
 def unregister():
+    bpy.msgbus.clear_by_owner(_MSGBUS_OWNER)
+    bpy.msgbus.clear_by_owner(_STATUS_MSGBUS_OWNER)
+    for attr, handler in _HANDLERS:
+        handlers = getattr(bpy.app.handlers, attr)
+        if handler in handlers:
+            handlers.remove(handler)
     for c in reversed(classes):
         bpy.utils.unregister_class(c)
 
 if __name__ == "__main__":
+    cli_argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if cli_argv:
+        sys.exit(cli_main(cli_argv))
     register()
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Runs the addon against the bpy/mathutils stand-ins in benchmarks/, so the
+tests need no Blender:
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import bench_renamer  # noqa: E402  (installs fake_bpy and fake_mathutils)
+
+
+@pytest.fixture
+def build_scene():
+    """bench_renamer.build_scene with fresh caches; returns [(armature, [meshes])]."""
+    def build(rigs=1, meshes_per_rig=2, props_per_rig=0):
+        for engine in bench_renamer.renamer._NAMING_ENGINES.values():
+            engine.clear_cache()
+        return bench_renamer.build_scene(rigs, meshes_per_rig, props_per_rig)
+    return build
+
+
+@pytest.fixture
+def prefs(monkeypatch):
+    """Addon preferences at their defaults, returned by get_addon_prefs() for the test."""
+    renamer = bench_renamer.renamer
+    # The stand-in's property factories return each property's default
+    values = types.SimpleNamespace(**renamer.S4_AddonPreferences.__annotations__)
+    monkeypatch.setattr(renamer, "get_addon_prefs", lambda: values)
+    return values
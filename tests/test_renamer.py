@@ -0,0 +1,529 @@
+import json
+import string
+import types
+
+import pytest
+
+import fake_bpy
+import sim4_xmirror_renamer as renamer
+
+
+def names_of(arm_obj, meshes):
+    return arm_obj.data.bones.keys(), [obj.vertex_groups.keys() for obj in meshes]
+
+
+def convert(arm_obj):
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    return renamer.convert_armature(arm_obj, mapping, stored=stored)
+
+
+def revert(arm_obj):
+    return renamer.revert_armature(arm_obj, renamer.load_mapping_from_armature(arm_obj))
+
+
+def test_convert_revert_round_trip(build_scene):
+    (arm_obj, meshes), = build_scene()
+    original = names_of(arm_obj, meshes)
+    convert(arm_obj)
+    assert "Hand.L" in arm_obj.data.bones
+    assert "Hand.L" in meshes[0].vertex_groups
+    assert renamer.load_mapping_from_armature(arm_obj)["b__L_Hand__"] == "Hand.L"
+    revert(arm_obj)
+    assert names_of(arm_obj, meshes) == original
+    assert renamer.MAP_PROP not in arm_obj
+
+
+def test_failed_transaction_rolls_back(build_scene):
+    (arm_obj, meshes), = build_scene()
+    original = names_of(arm_obj, meshes)
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    plan = renamer.plan_conversion(arm_obj, mapping, stored=stored)
+    # Blender uniquifies the second pass's name: the transaction must undo everything
+    arm_obj.data.bones.new("Hand.L")
+    with pytest.raises(RuntimeError):
+        renamer.apply_rename_plan(plan)
+    assert names_of(arm_obj, meshes) == (original[0] + ["Hand.L"], original[1])
+    assert renamer.MAP_PROP not in arm_obj
+
+
+def test_collision_is_reported_before_anything_is_renamed(build_scene):
+    (arm_obj, meshes), = build_scene()
+    meshes[1].vertex_groups.new("Hand.L")
+    original = names_of(arm_obj, meshes)
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    plan = renamer.plan_conversion(arm_obj, mapping, stored=stored)
+    assert any("Hand.L" in error for error in plan.errors)
+    with pytest.raises(RuntimeError):
+        renamer.apply_rename_plan(plan)
+    assert names_of(arm_obj, meshes) == original
+
+
+def test_reused_revert_plan_rechecks_bone_collisions(build_scene):
+    (arm_obj, _meshes), = build_scene()
+    convert(arm_obj)
+    arm_obj.data.bones.new("b__L_Hand__")
+    plan = renamer.plan_revert(arm_obj, renamer.load_mapping_from_armature(arm_obj))
+    assert any("b__L_Hand__" in error for error in plan.errors)
+
+
+def test_incremental_convert(build_scene):
+    (arm_obj, meshes), = build_scene()
+    convert(arm_obj)
+    arm_obj.data.bones.new("b__L_Finger9__")
+    meshes[0].vertex_groups.new("b__L_Finger9__")
+
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    assert mapping == {"b__L_Finger9__": "Finger9.L"}
+    renamer.convert_armature(arm_obj, mapping, stored=stored)
+    assert "Finger9.L" in arm_obj.data.bones
+    assert "Finger9.L" in meshes[0].vertex_groups
+    stored = renamer.load_mapping_from_armature(arm_obj)
+    assert stored["b__L_Finger9__"] == "Finger9.L"
+    assert stored["b__L_Hand__"] == "Hand.L"
+
+    revert(arm_obj)
+    assert "b__L_Finger9__" in arm_obj.data.bones
+    assert "b__L_Hand__" in arm_obj.data.bones
+
+
+def test_convert_on_converted_rig_keeps_the_applied_plan(build_scene):
+    (arm_obj, _meshes), = build_scene()
+    fake_bpy.context.view_layer.objects.active = arm_obj
+    convert(arm_obj)
+    plan = renamer._APPLIED_PLANS[arm_obj.as_pointer()]
+    op = renamer.S4_OT_ConvertNames()
+    assert op.execute(fake_bpy.context) == {'CANCELLED'}
+    assert renamer._APPLIED_PLANS[arm_obj.as_pointer()] is plan
+
+
+class StandInWindowManager:
+    def progress_begin(self, low, high):
+        pass
+
+    def progress_update(self, value):
+        pass
+
+    def progress_end(self):
+        pass
+
+    def event_timer_add(self, step, window=None):
+        return object()
+
+    def event_timer_remove(self, timer):
+        pass
+
+    def modal_handler_add(self, op):
+        pass
+
+
+def run_modal(op, arm_obj, events):
+    context = types.SimpleNamespace(active_object=arm_obj, window=None, window_manager=StandInWindowManager())
+    op.chunk_seconds = 1e-5  # a few steps per tick
+    result = op.invoke(context, None)
+    for event_type in events:
+        if result != {'RUNNING_MODAL'}:
+            break
+        result = op.modal(context, types.SimpleNamespace(type=event_type))
+    return result
+
+
+def test_modal_convert_publishes_timings_and_profile(build_scene, prefs, tmp_path):
+    (arm_obj, meshes), = build_scene()
+    prefs.profile_timings = True
+    prefs.profile_cprofile = True
+    prefs.profile_dump_path = str(tmp_path / "convert.prof")
+    renamer.LAST_RUN_STATS.clear()
+
+    op = renamer.S4_OT_ConvertNamesModal()
+    assert run_modal(op, arm_obj, ['TIMER'] * 1000) == {'FINISHED'}
+    assert "Hand.L" in arm_obj.data.bones
+    stats = renamer.get_last_run_stats("convert")
+    phases = [phase["name"] for phase in stats["phases"]]
+    assert phases[0] == "map"
+    assert {"scan", "plan", "bones", "vgroups", "refs", "store"} <= set(phases)
+    assert stats["profile_path"] == prefs.profile_dump_path
+    assert (tmp_path / "convert.prof").exists()
+
+    op = renamer.S4_OT_RevertNamesModal()
+    assert run_modal(op, arm_obj, ['TIMER', 'TIMER', 'ESC']) == {'CANCELLED'}
+    assert "Hand.L" in arm_obj.data.bones
+    assert renamer.get_last_run_stats("revert")["label"] == "revert"
+
+
+def test_legacy_json_mapping_is_read(build_scene):
+    (arm_obj, meshes), = build_scene()
+    original = names_of(arm_obj, meshes)
+    convert(arm_obj)
+    mapping = renamer.load_mapping_from_armature(arm_obj)
+    # Files saved by older versions hold the mapping as one JSON string
+    arm_obj[renamer.MAP_PROP] = json.dumps(mapping)
+    renamer.invalidate_mapping_cache()
+    renamer._APPLIED_PLANS.clear()
+    assert renamer.load_mapping_from_armature(arm_obj) == mapping
+    revert(arm_obj)
+    assert names_of(arm_obj, meshes) == original
+
+
+def test_unknown_mapping_version_is_ignored(build_scene):
+    (arm_obj, _meshes), = build_scene()
+    arm_obj[renamer.MAP_PROP] = {"version": renamer.MAP_FORMAT_VERSION + 1, "src": "", "dst": ""}
+    assert renamer.load_mapping_from_armature(arm_obj) is None
+
+
+def test_references_follow_convert_and_revert(build_scene):
+    (arm_obj, _meshes), (other, other_meshes) = build_scene(rigs=2)
+    action = fake_bpy.data.actions.new("walk")
+    fcurve = action.new_fcurve('pose.bones["b__L_Hand__"].location', group_name="b__L_Hand__")
+    con = other_meshes[0].constraints.new('COPY_LOCATION')
+    con.target = arm_obj
+    con.subtarget = "b__L_Hand__"
+
+    convert(arm_obj)
+    assert fcurve.data_path == 'pose.bones["Hand.L"].location'
+    assert con.subtarget == "Hand.L"
+    revert(arm_obj)
+    assert fcurve.data_path == 'pose.bones["b__L_Hand__"].location'
+    assert con.subtarget == "b__L_Hand__"
+
+
+def test_shared_reference_index_stays_current(build_scene):
+    (arm_obj, meshes), = build_scene()
+    con = meshes[0].constraints.new('COPY_LOCATION')
+    con.target = arm_obj
+    con.subtarget = "b__L_Hand__"
+    # Like a batch run: one index for several transactions, one of them rolled back
+    references = renamer.BoneReferenceIndex.build()
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    plan = renamer.plan_conversion(arm_obj, mapping, stored=stored)
+    txn = renamer.RenameTransaction(plan, references=references)
+    for _ in txn.steps():
+        pass
+    assert con.subtarget == "Hand.L"
+    txn.rollback()
+    assert con.subtarget == "b__L_Hand__"
+
+    renamer.convert_armature(arm_obj, mapping, stored=stored, references=references)
+    assert con.subtarget == "Hand.L"
+    renamer.revert_armature(arm_obj, renamer.load_mapping_from_armature(arm_obj), references=references)
+    assert con.subtarget == "b__L_Hand__"
+
+
+def test_export_restores_xmirror_names(build_scene):
+    (arm_obj, meshes), = build_scene()
+    convert(arm_obj)
+    converted = names_of(arm_obj, meshes)
+    seen = []
+    renamer.export_with_sims_names([arm_obj], lambda: seen.append(names_of(arm_obj, meshes)))
+    assert "b__L_Hand__" in seen[0][0]
+    assert names_of(arm_obj, meshes) == converted
+
+    def failing_export():
+        raise OSError("disk full")
+    with pytest.raises(OSError):
+        renamer.export_with_sims_names([arm_obj], failing_export)
+    assert names_of(arm_obj, meshes) == converted
+
+
+def test_pruning_is_rolled_back_with_the_transaction(build_scene, prefs):
+    pytest.importorskip("numpy")
+    (arm_obj, meshes), = build_scene()
+    prefs.prune_before_convert = True
+    for obj in meshes:
+        obj.data.from_pydata([(0.0, 0.0, float(i)) for i in range(4)])
+        obj.vertex_groups["b__L_Hand__"].add([0, 1], 1.0, 'REPLACE')
+    groups = set(meshes[0].vertex_groups.keys())
+
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    plan = renamer.plan_conversion(arm_obj, mapping, stored=stored)
+    assert renamer.prune_before_convert(plan, arm_obj) > 0
+    arm_obj.data.bones.new("Hand.L")
+    with pytest.raises(RuntimeError):
+        renamer.apply_rename_plan(plan)
+    assert set(meshes[0].vertex_groups.keys()) == groups
+
+    arm_obj.data.bones.remove(arm_obj.data.bones["Hand.L"])
+    plan = renamer.plan_conversion(arm_obj, mapping, stored=stored)
+    renamer.prune_before_convert(plan, arm_obj)
+    renamer.apply_rename_plan(plan)
+    assert meshes[0].vertex_groups.keys() == ["ROOT_bind", "Hand.L"]
+
+
+def test_batch_files_orchestrator(tmp_path):
+    for name in ("b.blend", "a.blend", "notes.txt"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "c.blend").write_text("")
+    files = renamer.collect_blend_files([str(tmp_path)], recursive=True)
+    assert [p.rsplit("/", 1)[-1] for p in files] == ["a.blend", "b.blend", "c.blend"]
+    assert renamer.output_path_for("/x/rig.blend", "_s4") == "/x/rig_s4.blend"
+
+    calls = []
+
+    def worker(path, mode, suffix):
+        calls.append((path, mode, suffix))
+        if path.endswith("b.blend"):
+            raise RuntimeError("crashed")
+        return {"status": "DONE", "output": renamer.output_path_for(path, suffix)}
+
+    results = renamer.run_batch_files(files, "convert", "_xmirror", jobs=2, worker=worker)
+    assert [r["file"] for r in results] == files
+    assert [r["status"] for r in results] == ["DONE", "FAILED", "DONE"]
+    assert results[1]["message"] == "crashed"
+    assert all("seconds" in r for r in results)
+    assert sorted(calls) == sorted((f, "convert", "_xmirror") for f in files)
+
+
+def test_rig_cache_saves_merge_with_other_processes(tmp_path, monkeypatch):
+    path = tmp_path / renamer.RIG_CACHE_FILE
+    monkeypatch.setattr(renamer, "_rig_cache_path", lambda: str(path))
+    monkeypatch.setattr(renamer, "_rig_disk_cache", None)
+    renamer.remember_rig_mapping("first", {"b__L_Hand__": "Hand.L"})
+    # A second worker that loaded the cache before "first" was saved
+    monkeypatch.setattr(renamer, "_rig_disk_cache", renamer.OrderedDict())
+    renamer.remember_rig_mapping("second", {"b__R_Hand__": "Hand.R"})
+
+    monkeypatch.setattr(renamer, "_rig_disk_cache", None)
+    assert list(renamer._load_rig_disk_cache()) == ["first", "second"]
+    assert [p.name for p in tmp_path.iterdir()] == [renamer.RIG_CACHE_FILE]
+    renamer.clear_rig_cache()
+    monkeypatch.setattr(renamer, "_rig_disk_cache", None)
+    assert not renamer._load_rig_disk_cache()
+
+
+def test_limit_influences_is_sparse_exact_and_idempotent(build_scene):
+    np = pytest.importorskip("numpy")
+    (arm_obj, (mesh, _other)), = build_scene()
+    mesh.data.from_pydata([(0.1 * i, 0.0, 0.0) for i in range(20)])
+    names = [g.name for g in mesh.vertex_groups][:10]
+    for i in range(20):
+        for k, name in enumerate(names[: 2 + i % 8]):
+            mesh.vertex_groups[name].add([i], 0.1 + 0.013 * k, 'REPLACE')
+    deform = renamer.deform_bone_names(arm_obj)
+
+    result = renamer.limit_mesh_influences(mesh, deform, 4)
+    weights = renamer.read_weight_matrix(mesh)
+    assert result["limited"] > 0
+    assert ((weights > 0).sum(axis=1) <= 4).all()
+    assert np.allclose(weights.sum(axis=1), 1.0, atol=1e-6)
+    assert np.allclose(weights * 255.0, np.rint(weights * 255.0), atol=1e-4)
+    assert renamer.limit_mesh_influences(mesh, deform, 4)["weights"] == 0
+
+
+def test_rule_sets_convert_and_reverse():
+    sims4 = renamer.get_naming_engine("SIMS4")
+    names = ["b__L_Hand__", "b__R_UpperArm__", "b__Spine0__", "Upper_L_Arm", "Hand.L"]
+    mapping = sims4.convert_many(names)
+    assert mapping == {
+        "b__L_Hand__": "Hand.L",
+        "b__R_UpperArm__": "UpperArm.R",
+        "b__Spine0__": "Spine0",
+        "Upper_L_Arm": "Upper_Arm.L",
+    }
+    assert renamer.get_naming_engine("SIMS3").convert_many(names) == mapping
+    reversed_names = sims4.reverse_many(["Hand.L", "UpperArm.R", "Spine0"])
+    assert reversed_names == {"Hand.L": "b__L_Hand__", "UpperArm.R": "b__R_UpperArm__", "Spine0": "b__Spine0__"}
+
+    generic = renamer.get_naming_engine("GENERIC")
+    assert generic.convert_many(["Left_Arm", "Leg_Right", "hand_r", "l_foot", "Spine", "Arm.L"]) == {
+        "Left_Arm": "Arm.L",
+        "Leg_Right": "Leg.R",
+        "hand_r": "hand.R",
+        "l_foot": "foot.L",
+    }
+    assert generic.reverse_many(["Arm.L", "hand.R", "Spine"]) == {"Arm.L": "Arm_L", "hand.R": "hand_R"}
+    assert renamer.get_naming_engine("NO_SUCH_SET") is sims4
+    assert renamer.RULE_SETS["GENERIC"].signature != renamer.RULE_SETS["SIMS4"].signature
+
+
+def test_rig_fingerprint_hit_skips_bone_checks(build_scene, monkeypatch):
+    monkeypatch.setattr(renamer, "_rig_disk_cache", renamer.OrderedDict())
+    (arm_obj, meshes), = build_scene()
+    original = names_of(arm_obj, meshes)
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    assert mapping.fingerprint and not mapping.prevalidated
+    renamer.convert_armature(arm_obj, mapping, stored=stored)
+    assert renamer._load_rig_disk_cache()[mapping.fingerprint] == dict(mapping)
+    revert(arm_obj)
+
+    checked = []
+    real_checks = renamer._bone_target_errors
+    monkeypatch.setattr(renamer, "_bone_target_errors", lambda *args: checked.append(args) or real_checks(*args))
+    hit, stored = renamer.plan_conversion_map(arm_obj)
+    assert hit.prevalidated and hit == mapping
+    plan = renamer.plan_conversion(arm_obj, hit, stored=stored)
+    assert not checked and not plan.errors
+    renamer.apply_rename_plan(plan)
+    revert(arm_obj)
+    assert names_of(arm_obj, meshes) == original
+
+    # Another bone set is another fingerprint, so it is checked again
+    arm_obj.data.bones.new("b__L_Extra__")
+    miss, stored = renamer.plan_conversion_map(arm_obj)
+    assert not miss.prevalidated
+    renamer.plan_conversion(arm_obj, miss, stored=stored)
+    assert checked
+
+    label_fingerprint = renamer.register_known_rig("Test rig", arm_obj.data.bones.keys())
+    try:
+        known, _stored = renamer.plan_conversion_map(arm_obj)
+        assert known.prevalidated and known.label == "Test rig"
+    finally:
+        del renamer.KNOWN_RIGS[label_fingerprint]
+
+
+def test_symmetrize_copies_exact_quantized_mirrors(build_scene):
+    np = pytest.importorskip("numpy")
+    (arm_obj, (mesh, _other)), = build_scene()
+    half = [(0.1 + 0.01 * i, 0.02 * i, 0.0) for i in range(30)]
+    mesh.data.from_pydata(half + [(-x, y, z) for x, y, z in half] + [(0.0, 5.0, 0.0), (3.0, 9.0, 9.0)])
+    groups = mesh.vertex_groups
+    for i in range(30):
+        groups["b__L_Hand__"].add([i], 0.123456 + 0.02 * i, 'REPLACE')
+    groups["b__R_Hand__"].add([45], 0.9, 'REPLACE')
+    convert(arm_obj)
+    pairs, centers, _one_sided = renamer.mirror_group_pairs(renamer.load_mapping_from_armature(arm_obj))
+
+    changed, unmatched = renamer.symmetrize_mesh_weights(mesh, pairs, centers, direction='L_TO_R')
+    weights = renamer.read_weight_matrix(mesh)
+    left, right = groups["Hand.L"].index, groups["Hand.R"].index
+    assert unmatched == 1
+    assert changed > 30
+    assert np.array_equal(weights[30:60, right], weights[:30, left])
+    assert np.allclose(weights[:30, left] * 255.0, np.rint(weights[:30, left] * 255.0), atol=1e-4)
+    assert np.abs(weights[:30, left] - (0.123456 + 0.02 * np.arange(30))).max() <= 0.5 / 255.0 + 1e-6
+    assert renamer.symmetrize_mesh_weights(mesh, pairs, centers, direction='L_TO_R')[0] == 0
+
+    renamer.symmetrize_mesh_weights(mesh, pairs, centers, direction='AVERAGE')
+    weights = renamer.read_weight_matrix(mesh)
+    assert np.array_equal(weights[30:60, left], weights[:30, right])
+
+
+def test_symmetry_validator_reports_outliers(build_scene):
+    pytest.importorskip("numpy")
+    (arm_obj, _meshes), = build_scene()
+    for i, bone in enumerate(arm_obj.data.bones):
+        x = 0.1 + 0.01 * i
+        if bone.name.startswith("b__L_"):
+            bone.head_local, bone.tail_local = (x, 0.0, 1.0), (x, 0.0, 2.0)
+        elif bone.name.startswith("b__R_"):
+            mirrored = arm_obj.data.bones["b__L_" + bone.name[5:]].head_local[0]
+            bone.head_local, bone.tail_local = (-mirrored, 0.0, 1.0), (-mirrored, 0.0, 2.0)
+        else:
+            bone.head_local, bone.tail_local = (0.0, 0.0, 1.0), (0.0, 0.0, 2.0)
+    convert(arm_obj)
+    report = renamer.validate_rig_symmetry(arm_obj)
+    assert report.ok and report.pairs == 52 and report.centers == 28
+
+    arm_obj.data.bones["Hand.R"].head_local = (-0.5, 0.0, 1.0)
+    arm_obj.data.bones["Neck"].tail_local = (0.01, 0.0, 2.0)
+    arm_obj.data.bones["Calf.R"].head_local = (-1.0, 0.0, 1.0)
+    arm_obj.data.bones.remove(arm_obj.data.bones["Toe.R"])
+    report = renamer.validate_rig_symmetry(arm_obj)
+    assert report.missing == ["Toe.L"]
+    assert [pair[:2] for pair in report.asymmetric] == [("Calf.L", "Calf.R"), ("Hand.L", "Hand.R")]
+    assert report.off_center == [("Neck", pytest.approx(0.01))]
+    assert len(report.issue_lines()) == 4
+
+
+def test_rig_status_is_cached_until_the_rig_changes(build_scene):
+    (arm_obj, meshes), = build_scene()
+    renamer._RIG_STATUS.clear()
+    status = renamer.get_rig_status(arm_obj)
+    assert status.state == 'ORIGINAL' and status.bones_to_convert == 132 and status.meshes == 2
+    assert renamer.get_rig_status(arm_obj) is status
+
+    convert(arm_obj)
+    status = renamer.get_rig_status(arm_obj)
+    assert status.state == 'CONVERTED' and status.can_revert and not status.can_convert
+
+    arm_obj.data.bones.new("b__L_Finger9__")
+    assert renamer.get_rig_status(arm_obj) is status
+    # Moving a mesh keeps the status; editing it drops it
+    update = types.SimpleNamespace(id=meshes[0], is_updated_geometry=False, is_updated_transform=True)
+    renamer._on_depsgraph_update_post(None, types.SimpleNamespace(updates=[update]))
+    assert renamer.get_rig_status(arm_obj) is status
+    update.is_updated_geometry = True
+    renamer._on_depsgraph_update_post(None, types.SimpleNamespace(updates=[update]))
+    status = renamer.get_rig_status(arm_obj)
+    assert status.state == 'PARTIAL' and status.bones_to_convert == 1
+
+    meshes[1].vertex_groups.new("b__L_Finger9__")
+    meshes[1].vertex_groups.new("Finger9.L")
+    renamer.invalidate_rig_status_for([meshes[1]])
+    assert renamer.get_rig_status(arm_obj).collisions
+
+
+def test_layouts_are_planned_once_per_distinct_layout(build_scene):
+    (arm_obj, meshes), (other, _other_meshes) = build_scene(rigs=2, meshes_per_rig=4)
+    meshes[3].vertex_groups.new("Extra")
+    mapping, stored = renamer.plan_conversion_map(arm_obj)
+    plan = renamer.plan_conversion(arm_obj, mapping, stored=stored)
+    assert plan.layout_count == 2
+    assert len(plan.mesh_layouts) == 4
+    assert plan.vg_count == 4 * 132
+
+    context = types.SimpleNamespace(view_layer=fake_bpy.context.view_layer)
+    results = renamer.run_batch_rename(context, [arm_obj, other])
+    assert [(r["status"], r["meshes"], r["layouts"]) for r in results] == [("DONE", 4, 2), ("DONE", 4, 1)]
+    assert all(obj.vertex_groups[3].name == "Spine0" for obj in meshes)
+
+
+def test_transfer_weights_from_reference(build_scene):
+    np = pytest.importorskip("numpy")
+    (arm_obj, (target, _other)), = build_scene()
+    convert(arm_obj)
+    body = fake_bpy.data.objects.new("body", fake_bpy.data.meshes.new("body"))
+    body.data.from_pydata([(-1, 0, 0), (0, 0, 0), (1, 0, 0), (-1, 1, 0), (0, 1, 0), (1, 1, 0)], [], [(0, 1, 4, 3), (1, 2, 5, 4)])
+    # Sims 4 names on the reference, x-mirror names on the rig
+    body.vertex_groups.new("b__L_Thigh__").add([0, 3], 1.0, 'REPLACE')
+    body.vertex_groups.new("b__R_Thigh__").add([2, 5], 1.0, 'REPLACE')
+    body.vertex_groups.new("b__Pelvis__").add([1, 4], 1.0, 'REPLACE')
+    target.data.from_pydata([(-0.5, 0.5, 0.1), (0.5, 0.5, 0.1), (0.25, 0.2, 0.0), (5.0, 5.0, 5.0)])
+    for group in list(target.vertex_groups):
+        target.vertex_groups.remove(group)
+
+    surface = renamer.get_reference_surface(body)
+    mapping = renamer.load_mapping_from_armature(arm_obj)
+    assert renamer.transfer_weights_from_reference(surface, target, arm_obj, mapping, max_distance=1.0) == (3, 1)
+    weights = renamer.read_weight_matrix(target)
+    column = {name: target.vertex_groups[name].index for name in ("Thigh.L", "Thigh.R", "Pelvis")}
+    assert weights[0, column["Thigh.L"]] == pytest.approx(0.5, abs=1 / 255)
+    assert weights[0, column["Pelvis"]] == pytest.approx(0.5, abs=1 / 255)
+    assert weights[1, column["Thigh.R"]] == pytest.approx(0.5, abs=1 / 255)
+    assert weights[2, column["Thigh.R"]] == pytest.approx(0.25, abs=1 / 255)
+    assert not weights[3].any()
+    assert np.allclose(weights[:3].sum(axis=1), 1.0, atol=2 / 255)
+
+    # Weights are read fresh, the surface is only rebuilt when the geometry moves
+    assert renamer.get_reference_surface(body) is surface
+    body.data.vertices[0].co = (-1.0, 0.0, 0.5)
+    assert renamer.get_reference_surface(body) is not surface
+
+
+def test_language_is_resolved_once_until_invalidated(monkeypatch):
+    view = fake_bpy.context.preferences.view
+    monkeypatch.setattr(view, "language", "ja_JP")
+    monkeypatch.setattr(renamer, "TEXTS", {})
+    renamer.invalidate_language_cache()
+    try:
+        assert renamer.t("pref_label") == renamer._texts_ja()["pref_label"]
+        assert set(renamer.TEXTS) == {"en", "ja"}
+        view.language = "de_DE"
+        assert renamer.t("pref_label") == renamer._texts_ja()["pref_label"]
+        renamer.invalidate_language_cache()
+        assert renamer.t("pref_label") == renamer._texts_de()["pref_label"]
+        assert renamer.t("no_such_key") == "no_such_key"
+    finally:
+        monkeypatch.undo()
+        renamer.invalidate_language_cache()
+
+
+@pytest.mark.parametrize("lang", sorted(renamer._TEXT_LOADERS))
+def test_translation_tables_are_complete(lang):
+    def fields(text):
+        return sorted((name, spec) for _literal, name, spec, _conv in string.Formatter().parse(text) if name is not None)
+    english = renamer._texts_en()
+    table = renamer._TEXT_LOADERS[lang]()
+    assert set(table) == set(english)
+    for key, text in english.items():
+        assert fields(table[key]) == fields(text), key